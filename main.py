@@ -1,15 +1,28 @@
 import argparse
 import logging
 import os
+import sys
 import uvicorn
 from pathlib import Path
+from typing import List, Optional, TextIO
 
-from src.config import API_HOST, API_PORT
-from src.storage.models import init_db
-from src.crawler.firecrawl_service import FirecrawlService
-from src.crawler.link_processor import LinkProcessor
+from src.config import API_HOST, API_PORT, CRAWLER_BACKEND, SEEN_SET_BACKEND, BATCH_CONCURRENCY, BATCH_DOMAIN_DELAY, FIRECRAWL_REQUESTS_PER_MINUTE, LINK_WORKERS, DOCUMENT_PROBE_ENABLED, PRECLASSIFIER_PATH, OPENAI_BATCH_SIZE, BULK_POLL_INTERVAL, SCORING_MAX_CALLS, SCORING_MAX_TOKENS, SCORING_MAX_SECONDS
+from src.storage.models import engine, init_db
+from src.storage.search_index import rebuild_search_index
+from src.crawler.base_crawler import BaseCrawler
+from src.crawler.crawler_factory import create_crawler, CRAWLER_BACKENDS
+from src.crawler.parallel_processor import create_link_processor
+from src.crawler.document_probe import DocumentProbe
+from src.crawler.seen_set import create_seen_set, SEEN_SET_BACKENDS
+from src.ai.async_openai_service import AsyncOpenAIService
+from src.ai.bulk_scoring import BulkScorer
 from src.ai.openai_service import OpenAIService
+from src.ai.preclassifier import LinkPreclassifier, SCORE_FIELDS
+from src.ai.scoring_budget import ScoringBudget, create_scoring_budget
 from src.storage.repository import LinkRepository
+from src.crawler.pipeline import CrawlPipeline
+from src.crawler.batch_crawler import BatchCrawler
+from src.utils.rate_limiter import TokenBucket
 
 # Configure logging
 logging.basicConfig(
@@ -23,67 +36,51 @@ def ensure_directories():
     Path('logs').mkdir(exist_ok=True)
 
 
-def crawl_website(url: str, limit: int = 10):
+def crawl_website(url: str, limit: int = 10, bypass_cache: bool = False, incremental: bool = True,
+                  backend: str = CRAWLER_BACKEND, seen_set: str = SEEN_SET_BACKEND, workers: int = LINK_WORKERS,
+                  probe_documents: bool = DOCUMENT_PROBE_ENABLED, budget: Optional[ScoringBudget] = None):
     """
     Crawl a website and store high-value links
     
     Args:
         url: URL to crawl
         limit: Maximum number of pages to crawl
+        bypass_cache: Ignore cached FireCrawl responses
+        incremental: Skip pages that have not changed since the previous crawl
+        backend: Crawler backend ("firecrawl" or "http")
+        seen_set: Processed-URL set backend ("memory", "bloom" or "database")
+        workers: Processes used to normalize and score links (1 processes them in-process)
+        probe_documents: Send HEAD requests to find documents behind extension-less links
+        budget: Cap on the LLM calls, tokens and time spent scoring (None for no limit)
     """
     logger.info(f"Starting crawl for {url} with limit {limit}")
     
     # Initialize services
-    crawler = FirecrawlService()
-    processor = LinkProcessor()
-    ai_service = OpenAIService()
+    crawler = create_crawler(backend, bypass_cache=bypass_cache)
+    processor = create_link_processor(seen_set=create_seen_set(seen_set), workers=workers)
+    ai_service = AsyncOpenAIService()
     repo = LinkRepository()
     
     try:
-        # Get or create website record
-        website = repo.get_or_create_website(url)
+        # Crawl, score and store links page by page
+        probe = DocumentProbe() if probe_documents else None
+        pipeline = CrawlPipeline(crawler, processor, ai_service, repo, incremental=incremental, probe=probe,
+                                 budget=budget)
+        summary = pipeline.run(url, limit=limit)
         
-        # Crawl website
-        pages = crawler.crawl_website(url, limit=limit)
-        
-        if not pages:
-            logger.warning(f"No pages crawled for URL: {url}")
+        if not summary['pages_crawled']:
             return
         
-        logger.info(f"Crawled {len(pages)} pages")
-        
-        # Process links from crawled pages
-        all_links = []
-        for page in pages:
-            # Each page has markdown, html, and metadata
-            # Extract links from the HTML content or use the metadata
-            links = []
-            
-            # Firecrawl may already extract links for us
-            if 'links' in page:
-                links = [{'url': link, 'source_url': page.get('metadata', {}).get('sourceURL', ''), 
-                          'page_title': page.get('metadata', {}).get('title', '')} 
-                         for link in page.get('links', []) if link]
-            else:
-                # Extract links from page metadata
-                extracted_links = [{'url': page.get('metadata', {}).get('sourceURL', ''),
-                                   'source_url': url,
-                                   'page_title': page.get('metadata', {}).get('title', '')}]
-                links.extend(extracted_links)
-            
-            # Process links
-            processed_links = processor.process_links(links, url)
-            all_links.extend(processed_links)
-            
-        logger.info(f"Extracted {len(all_links)} links")
+        logger.info(f"Crawled {summary['pages_crawled']} pages ({summary['pages_unchanged']} unchanged, "
+                    f"{summary['pages_incomplete']} with unscored links left for the next crawl)")
+        logger.info(f"Extracted {summary['links_found']} links")
+        logger.info(f"Stored {summary['links_stored']} links in database")
+        if 'scoring_budget' in summary:
+            stats = summary['scoring_budget']
+            logger.info(f"Scoring budget: {stats['calls']} calls, {stats['tokens']} tokens, {stats['seconds']}s"
+                        f"{' (exhausted, remaining links kept their heuristic score)' if stats['exhausted'] else ''}")
         
-        # Analyze links with OpenAI
-        enriched_links = ai_service.batch_analyze_links(all_links)
-        
-        # Store links in database
-        stored_links = repo.add_links(enriched_links, website)
-        
-        logger.info(f"Stored {len(stored_links)} links in database")
+        log_cache_stats(crawler, ai_service)
         
         # Show top 5 high-value links
         top_links = repo.get_links_by_relevance(min_relevance=0.7, limit=5)
@@ -98,9 +95,206 @@ def crawl_website(url: str, limit: int = 10):
     except Exception as e:
         logger.error(f"Error during crawl: {str(e)}")
     finally:
+        processor.close()
         repo.close()
 
 
+def read_urls(source: TextIO) -> List[str]:
+    """
+    Read URLs to crawl, one per line
+    
+    Args:
+        source: File object to read from
+        
+    Returns:
+        List of unique URLs in input order, skipping blank and comment lines
+    """
+    urls = []
+    seen = set()
+    for line in source:
+        url = line.strip()
+        if not url or url.startswith('#') or url in seen:
+            continue
+        seen.add(url)
+        urls.append(url)
+    return urls
+
+
+def crawl_batch(source: str, limit: int = 10, concurrency: int = BATCH_CONCURRENCY,
+                domain_delay: float = BATCH_DOMAIN_DELAY, api_rpm: float = FIRECRAWL_REQUESTS_PER_MINUTE,
+                bypass_cache: bool = False, incremental: bool = True, backend: str = CRAWLER_BACKEND,
+                seen_set: str = SEEN_SET_BACKEND, workers: int = LINK_WORKERS,
+                probe_documents: bool = DOCUMENT_PROBE_ENABLED, budget: Optional[ScoringBudget] = None):
+    """
+    Crawl many websites concurrently and log a per-site summary
+    
+    Args:
+        source: Path of a file with one URL per line, or '-' for stdin
+        limit: Maximum number of pages to crawl per site
+        concurrency: Maximum number of sites crawled at the same time
+        domain_delay: Minimum seconds between crawls of the same domain
+        api_rpm: Maximum FireCrawl API requests per minute across all sites
+        bypass_cache: Ignore cached FireCrawl responses
+        incremental: Skip pages that have not changed since the previous crawl
+        backend: Crawler backend ("firecrawl" or "http")
+        seen_set: Processed-URL set backend shared by all sites ("memory", "bloom" or "database")
+        workers: Processes used to normalize and score links, shared by all sites
+        probe_documents: Send HEAD requests to find documents behind extension-less links
+        budget: Cap on the LLM calls, tokens and time spent scoring each site (None for no limit)
+    """
+    if source == '-':
+        urls = read_urls(sys.stdin)
+    else:
+        with open(source) as f:
+            urls = read_urls(f)
+            
+    if not urls:
+        logger.warning("No URLs to crawl")
+        return
+        
+    logger.info(f"Starting batch crawl of {len(urls)} sites with concurrency {concurrency}")
+    
+    # Initialize shared services
+    crawler = create_crawler(backend, rate_limiter=TokenBucket.per_minute(api_rpm), bypass_cache=bypass_cache)
+    ai_service = AsyncOpenAIService()
+    
+    shared_seen_set = create_seen_set(seen_set)
+    
+    batch = BatchCrawler(crawler, ai_service, concurrency=concurrency, domain_delay=domain_delay,
+                         incremental=incremental, seen_set=shared_seen_set, workers=workers,
+                         probe=DocumentProbe() if probe_documents else None, budget=budget)
+    try:
+        results = batch.run(urls, limit=limit)
+    finally:
+        shared_seen_set.close()
+    
+    # Show per-site summary
+    logger.info("Batch crawl summary:")
+    for result in results:
+        line = (f"  - {result['url']}: {result['status']}, {result['pages_crawled']} pages "
+                f"({result['pages_unchanged']} unchanged), "
+                f"{result['links_stored']} links, {result['duration']}s")
+        if result.get('scoring_budget', {}).get('exhausted'):
+            line += " (scoring budget exhausted)"
+        if result.get('error'):
+            line += f" ({result['error']})"
+        logger.info(line)
+        
+    succeeded = sum(1 for result in results if result['status'] == 'ok')
+    logger.info(f"Crawled {succeeded}/{len(results)} sites successfully")
+    log_cache_stats(crawler, ai_service)
+
+
+def log_cache_stats(crawler: BaseCrawler, ai_service: AsyncOpenAIService):
+    """Log FireCrawl response cache, relevance cache, pre-classifier, clustering and OpenAI call statistics"""
+    if crawler.cache is not None:
+        stats = crawler.cache.stats()
+        logger.info(f"FireCrawl cache: {stats['hits']} hits, {stats['misses']} misses, "
+                    f"{stats['size_bytes'] / 1024 / 1024:.1f} MB on disk")
+    if ai_service.cache is not None:
+        stats = ai_service.cache.stats()
+        logger.info(f"Relevance cache: {stats['hits']} hits, {stats['misses']} misses "
+                    f"({stats['hit_rate']:.0%} hit rate), {stats['entries']} entries")
+    if ai_service.preclassifier is not None:
+        stats = ai_service.preclassifier.stats()
+        logger.info(f"Pre-classifier: {stats['decided']} links decided locally, {stats['uncertain']} sent to the LLM "
+                    f"({stats['llm_calls_saved']:.0%} of LLM scoring saved)")
+    if ai_service.clusterer is not None:
+        stats = ai_service.clusterer.stats()
+        logger.info(f"Link clustering: {stats['propagated']} links scored from a representative, "
+                    f"{stats['rejected']} scored individually after representatives disagreed")
+    if ai_service.metrics is not None and ai_service.metrics.calls:
+        stats = ai_service.metrics.stats()
+        logger.info(f"OpenAI: {stats['calls']} calls for {stats['links']} links, "
+                    f"{stats['prompt_tokens']} prompt + {stats['completion_tokens']} completion tokens "
+                    f"(${stats['cost']:.4f}), {stats['avg_latency_ms']:.0f} ms average latency, "
+                    f"{stats['retries']} retries, {stats['parse_failures']} parse failures, {stats['errors']} errors")
+
+
+def train_classifier(epochs: int = 200, limit: Optional[int] = None, min_links: int = 200):
+    """
+    Train the link pre-classifier on links already scored by the LLM
+    
+    Args:
+        epochs: Training passes over the data
+        limit: Maximum number of scored links to train on
+        min_links: Minimum number of scored links needed to train
+    """
+    repository = LinkRepository()
+    try:
+        links = repository.get_scored_links(limit=limit)
+        if len(links) < min_links:
+            logger.error(f"Only {len(links)} LLM-scored links in the database, at least {min_links} needed")
+            return
+        
+        records = [{'url': link.url, 'page_title': link.page_title or '', 'is_document': link.is_document}
+                   for link in links]
+        targets = [[getattr(link, field) or 0.0 for field in SCORE_FIELDS] for link in links]
+    finally:
+        repository.close()
+    
+    preclassifier = LinkPreclassifier()
+    report = preclassifier.fit(records, targets, epochs=epochs)
+    preclassifier.save()
+    
+    logger.info(f"Trained pre-classifier on {report['train_links']} links in {report['seconds']}s")
+    if report['validation_links']:
+        logger.info(f"Holdout ({report['validation_links']} links): loss {report['validation_loss']}, "
+                    f"{report['coverage']:.0%} decided locally, {report['agreement']:.0%} agreement with the LLM")
+    logger.info(f"Saved pre-classifier to {PRECLASSIFIER_PATH}")
+
+
+def rescore_bulk(website_id: Optional[int] = None, batch_size: int = OPENAI_BATCH_SIZE,
+                 poll_interval: float = BULK_POLL_INTERVAL, restart: bool = False):
+    """
+    Rescore stored links through the OpenAI Batch API
+    
+    Args:
+        website_id: Only rescore links of this website
+        batch_size: Links scored per request
+        poll_interval: Seconds between batch status checks
+        restart: Discard an unfinished run instead of resuming it
+    """
+    repository = LinkRepository()
+    try:
+        scorer = BulkScorer(OpenAIService(), repository, batch_size=batch_size, poll_interval=poll_interval)
+        summary = scorer.run(website_id=website_id, restart=restart)
+        logger.info(f"Bulk rescoring finished: {summary['links_scored']}/{summary['links']} links rescored "
+                    f"in {summary['jobs']} batch jobs ({summary['requests']} requests), "
+                    f"{summary['links_failed']} kept their previous scores (metrics crawl ID {summary['run_id']})")
+    finally:
+        repository.close()
+
+
+def check_indexes() -> bool:
+    """
+    Check that each link listing query is answered from an index
+    
+    Returns:
+        True if no query scans or sorts the whole links table
+    """
+    repository = LinkRepository()
+    try:
+        plans = repository.explain_link_queries()
+    except ValueError as e:
+        logger.error(str(e))
+        return False
+    finally:
+        repository.close()
+    
+    for name, result in plans.items():
+        logger.info(f"{name}: {'OK' if result['indexed'] else 'FULL SCAN'} ({'; '.join(result['plan'])})")
+    return all(result['indexed'] for result in plans.values())
+
+
+def rebuild_index():
+    """Rebuild the full-text link search index from the links table"""
+    if rebuild_search_index(engine):
+        logger.info("Rebuilt link search index")
+    else:
+        logger.error("Link search index needs SQLite with FTS5; search uses LIKE")
+
+
 def start_api():
     """Start the FastAPI server"""
     logger.info(f"Starting API server on {API_HOST}:{API_PORT}")
@@ -131,12 +325,75 @@ if __name__ == "__main__":
     crawl_parser = subparsers.add_parser("crawl", help="Crawl a website")
     crawl_parser.add_argument("url", help="URL to crawl")
     crawl_parser.add_argument("--limit", type=int, default=10, help="Maximum number of pages to crawl")
+    crawl_parser.add_argument("--no-cache", action="store_true", help="Ignore cached FireCrawl responses")
+    crawl_parser.add_argument("--full", action="store_true", help="Reprocess pages even if they have not changed")
+    crawl_parser.add_argument("--backend", choices=CRAWLER_BACKENDS, default=CRAWLER_BACKEND, help="Crawler backend")
+    crawl_parser.add_argument("--seen-set", choices=SEEN_SET_BACKENDS, default=SEEN_SET_BACKEND, help="Processed-URL set backend")
+    crawl_parser.add_argument("--workers", type=int, default=LINK_WORKERS, help="Processes used for link processing")
+    crawl_parser.add_argument("--probe-documents", action=argparse.BooleanOptionalAction, default=DOCUMENT_PROBE_ENABLED, help="Probe extension-less links for documents")
+    crawl_parser.add_argument("--max-llm-calls", type=int, default=SCORING_MAX_CALLS, help="Maximum OpenAI scoring calls (0 for no limit)")
+    crawl_parser.add_argument("--max-llm-tokens", type=int, default=SCORING_MAX_TOKENS, help="Maximum OpenAI scoring tokens (0 for no limit)")
+    crawl_parser.add_argument("--max-scoring-seconds", type=float, default=SCORING_MAX_SECONDS, help="Stop scoring this many seconds after scoring starts (0 for no limit)")
+    
+    # Batch crawl command
+    batch_parser = subparsers.add_parser("crawl-batch", help="Crawl many websites concurrently")
+    batch_parser.add_argument("source", nargs="?", default="-", help="File with one URL per line ('-' for stdin)")
+    batch_parser.add_argument("--limit", type=int, default=10, help="Maximum number of pages to crawl per site")
+    batch_parser.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY, help="Maximum sites crawled at once")
+    batch_parser.add_argument("--domain-delay", type=float, default=BATCH_DOMAIN_DELAY, help="Seconds between crawls of the same domain")
+    batch_parser.add_argument("--api-rpm", type=float, default=FIRECRAWL_REQUESTS_PER_MINUTE, help="Maximum FireCrawl API requests per minute")
+    batch_parser.add_argument("--no-cache", action="store_true", help="Ignore cached FireCrawl responses")
+    batch_parser.add_argument("--full", action="store_true", help="Reprocess pages even if they have not changed")
+    batch_parser.add_argument("--backend", choices=CRAWLER_BACKENDS, default=CRAWLER_BACKEND, help="Crawler backend")
+    batch_parser.add_argument("--seen-set", choices=SEEN_SET_BACKENDS, default=SEEN_SET_BACKEND, help="Processed-URL set backend")
+    batch_parser.add_argument("--workers", type=int, default=LINK_WORKERS, help="Processes used for link processing")
+    batch_parser.add_argument("--probe-documents", action=argparse.BooleanOptionalAction, default=DOCUMENT_PROBE_ENABLED, help="Probe extension-less links for documents")
+    batch_parser.add_argument("--max-llm-calls", type=int, default=SCORING_MAX_CALLS, help="Maximum OpenAI scoring calls per site (0 for no limit)")
+    batch_parser.add_argument("--max-llm-tokens", type=int, default=SCORING_MAX_TOKENS, help="Maximum OpenAI scoring tokens per site (0 for no limit)")
+    batch_parser.add_argument("--max-scoring-seconds", type=float, default=SCORING_MAX_SECONDS, help="Stop scoring a site this many seconds after its scoring starts (0 for no limit)")
+    
+    # Train pre-classifier command
+    train_parser = subparsers.add_parser("train-classifier", help="Train the link pre-classifier on LLM-scored links")
+    train_parser.add_argument("--epochs", type=int, default=200, help="Training passes over the data")
+    train_parser.add_argument("--limit", type=int, default=None, help="Maximum number of scored links to train on")
+    train_parser.add_argument("--min-links", type=int, default=200, help="Minimum number of scored links needed to train")
+    
+    # Bulk rescoring command
+    bulk_parser = subparsers.add_parser("rescore-bulk", help="Rescore stored links through the OpenAI Batch API")
+    bulk_parser.add_argument("--website-id", type=int, default=None, help="Only rescore links of this website")
+    bulk_parser.add_argument("--batch-size", type=int, default=OPENAI_BATCH_SIZE, help="Links scored per request")
+    bulk_parser.add_argument("--poll-interval", type=float, default=BULK_POLL_INTERVAL, help="Seconds between batch status checks")
+    bulk_parser.add_argument("--restart", action="store_true", help="Discard an unfinished run instead of resuming it")
+    
+    # Index check command
+    subparsers.add_parser("check-indexes", help="Check that link queries use indexes (SQLite)")
+    
+    # Search index rebuild command
+    subparsers.add_parser("rebuild-search-index", help="Rebuild the full-text link search index (SQLite)")
     
     args = parser.parse_args()
     
     if args.command == "api":
         start_api()
     elif args.command == "crawl":
-        crawl_website(args.url, args.limit)
+        crawl_website(args.url, args.limit, bypass_cache=args.no_cache, incremental=not args.full,
+                      backend=args.backend, seen_set=args.seen_set, workers=args.workers,
+                      probe_documents=args.probe_documents,
+                      budget=create_scoring_budget(args.max_llm_calls, args.max_llm_tokens, args.max_scoring_seconds))
+    elif args.command == "crawl-batch":
+        crawl_batch(args.source, limit=args.limit, concurrency=args.concurrency, domain_delay=args.domain_delay,
+                    api_rpm=args.api_rpm, bypass_cache=args.no_cache, incremental=not args.full,
+                    backend=args.backend, seen_set=args.seen_set, workers=args.workers,
+                    probe_documents=args.probe_documents,
+                    budget=create_scoring_budget(args.max_llm_calls, args.max_llm_tokens, args.max_scoring_seconds))
+    elif args.command == "train-classifier":
+        train_classifier(epochs=args.epochs, limit=args.limit, min_links=args.min_links)
+    elif args.command == "rescore-bulk":
+        rescore_bulk(website_id=args.website_id, batch_size=args.batch_size,
+                     poll_interval=args.poll_interval, restart=args.restart)
+    elif args.command == "check-indexes":
+        sys.exit(0 if check_indexes() else 1)
+    elif args.command == "rebuild-search-index":
+        rebuild_index()
     else:
         parser.print_help()
\ No newline at end of file
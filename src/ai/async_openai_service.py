@@ -0,0 +1,315 @@
+import asyncio
+import json
+import logging
+import random
+import time
+from operator import attrgetter
+from typing import Any, Awaitable, Dict, List, Optional, Tuple, Union
+
+import openai
+from openai import AsyncOpenAI
+
+from src.ai.openai_service import OpenAIService, SYSTEM_PROMPT
+from src.ai.scoring_budget import ScoringBudget, BudgetExhaustedError, budget_context, prioritize
+from src.config import (
+    OPENAI_API_KEY, OPENAI_MODEL, OPENAI_BASE_URL, OPENAI_BATCH_SIZE, OPENAI_CONCURRENCY, OPENAI_REQUESTS_PER_MINUTE,
+    OPENAI_TOKENS_PER_MINUTE, OPENAI_MAX_RETRIES, OPENAI_RETRY_BASE_DELAY, OPENAI_RETRY_MAX_DELAY
+)
+from src.crawler.link_record import LinkRecord
+from src.utils.async_utils import run_sync
+from src.utils.rate_limiter import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses worth retrying besides 429 and 5xx
+RETRYABLE_STATUSES = {408, 409}
+
+
+async def gather_or_cancel(*aws: Awaitable) -> List[Any]:
+    """
+    Run awaitables concurrently, cancelling the rest if one fails or the caller is cancelled
+    
+    Args:
+        *aws: Awaitables to run
+    
+    Returns:
+        Results in input order
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+class AsyncOpenAIService(OpenAIService):
+    """OpenAI service that scores links concurrently within the account's rate limits"""
+    
+    def __init__(self, api_key: str = OPENAI_API_KEY, model: str = OPENAI_MODEL,
+                 base_url: Optional[str] = OPENAI_BASE_URL, concurrency: int = OPENAI_CONCURRENCY, requests_per_minute: float = OPENAI_REQUESTS_PER_MINUTE,
+                 tokens_per_minute: float = OPENAI_TOKENS_PER_MINUTE, max_retries: int = OPENAI_MAX_RETRIES):
+        """
+        Initialize async OpenAI service
+        
+        Args:
+            api_key: OpenAI API key
+            model: Chat model used for scoring
+            base_url: OpenAI-compatible API endpoint (None for the OpenAI API)
+            concurrency: Maximum number of chat completions in flight per call
+            requests_per_minute: Request budget, shared by every call on this service
+            tokens_per_minute: Token budget, shared by every call on this service
+            max_retries: Retries on rate limits, server errors and connection errors
+        """
+        super().__init__(api_key=api_key, model=model, base_url=base_url)
+        self.api_key = api_key
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.request_limiter = TokenBucket.per_minute(requests_per_minute)
+        self.token_limiter = TokenBucket.per_minute(tokens_per_minute)
+    
+    def batch_analyze_links(self, links: List[Union[LinkRecord, Dict]], batch_size: int = OPENAI_BATCH_SIZE,
+                            budget: Optional[ScoringBudget] = None) -> List[LinkRecord]:
+        """
+        Analyze a batch of links for relevance, running the async engine to completion
+        
+        Args:
+            links: List of link records (dictionaries are converted)
+            batch_size: Number of links to analyze in a single request
+            budget: Scoring budget of the crawl, or None for no limit
+        
+        Returns:
+            List of link records with relevance data filled in
+        """
+        return run_sync(self.abatch_analyze_links(links, batch_size=batch_size, budget=budget))
+    
+    async def abatch_analyze_links(self, links: List[Union[LinkRecord, Dict]], batch_size: int = OPENAI_BATCH_SIZE,
+                                   budget: Optional[ScoringBudget] = None) -> List[LinkRecord]:
+        """
+        Analyze links for relevance with concurrent, rate-limited requests
+        
+        Batches are scored concurrently up to `concurrency` requests at a time,
+        most promising links first; items a batch did not score are retried
+        with single-link requests. Requests not yet started when the budget
+        runs out are skipped, leaving their links with the heuristic score.
+        Cancelling the call cancels every request still in flight.
+        
+        Args:
+            links: List of link records (dictionaries are converted)
+            batch_size: Number of links to analyze in a single request
+            budget: Scoring budget of the crawl, or None for no limit
+        
+        Returns:
+            List of link records with relevance data filled in
+        """
+        links = [LinkRecord.coerce(link) for link in links]
+        candidates = self._triage(await asyncio.to_thread(self._apply_cached, self._select_candidates(links)))
+        candidates, clusters = self._plan_clusters(candidates)
+        
+        if candidates:
+            scored = []
+            semaphore = asyncio.Semaphore(self.concurrency)
+            with budget_context(budget):
+                async with AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, max_retries=0) as client:
+                    await self._ascore_links(client, semaphore, candidates, batch_size, scored)
+                    # Score members of clusters whose representatives disagreed
+                    await self._ascore_links(client, semaphore, self._propagate_clusters(clusters, scored),
+                                             batch_size, scored)
+            await asyncio.to_thread(self.cache_results, scored)
+            await asyncio.to_thread(self.flush_metrics)
+        
+        # Sort links by overall relevance
+        return sorted(links, key=attrgetter('overall_relevance'), reverse=True)
+    
+    async def _ascore_links(self, client: AsyncOpenAI, semaphore: asyncio.Semaphore, links: List[LinkRecord],
+                            batch_size: int, scored: List[Tuple[LinkRecord, Dict]]) -> None:
+        """
+        Score links in place, `batch_size` per request, with batches running concurrently
+        
+        Batches are started highest initial value first, so the semaphore
+        lets the most promising links through before the budget runs out.
+        
+        Args:
+            client: Async OpenAI client
+            semaphore: Cap on requests in flight
+            links: Link records to score
+            batch_size: Number of links to analyze in a single request
+            scored: Successfully scored links, appended to
+        """
+        links = prioritize(links)
+        await gather_or_cancel(*(
+            self._score_batch(client, semaphore, links[i:i+batch_size], scored)
+            for i in range(0, len(links), batch_size)
+        ))
+    
+    async def _score_batch(self, client: AsyncOpenAI, semaphore: asyncio.Semaphore,
+                           batch: List[LinkRecord], scored: List[Tuple[LinkRecord, Dict]]) -> None:
+        """
+        Score one batch of links in place
+        
+        Args:
+            client: Async OpenAI client
+            semaphore: Cap on requests in flight
+            batch: Link records to score
+            scored: Successfully scored links, appended to
+        """
+        results: List[Optional[Dict]] = [None] * len(batch)
+        # Unscored links get their own request: single links always, batches only after a good response
+        answered = len(batch) == 1
+        if len(batch) > 1:
+            try:
+                response_text, call = await self._complete(client, semaphore, self.batch_prompt(batch),
+                                                           self.batch_max_tokens(len(batch)), len(batch))
+            except BudgetExhaustedError:
+                pass
+            except Exception as e:
+                logger.error(f"Error analyzing batch of {len(batch)} links: {str(e)}")
+            else:
+                try:
+                    results = self.parse_batch_response(response_text, len(batch))
+                    answered = True
+                except Exception as e:
+                    logger.error(f"Error parsing batch of {len(batch)} links: {str(e)}")
+                self._record_call(len(batch), parse_failures=results.count(None), **call)
+        
+        # Fall back to single-link requests for items the batch response did not score;
+        # after a failed request each link would most likely fail the same way
+        missing = [] if not answered or self._budget_exhausted() else [
+            link for link, relevance_data in zip(batch, results) if relevance_data is None
+        ]
+        singles = dict(zip(map(id, missing), await gather_or_cancel(
+            *(self._score_single(client, semaphore, link) for link in missing)
+        )))
+        
+        for link, relevance_data in zip(batch, results):
+            self._apply_result(link, relevance_data if relevance_data is not None else singles.get(id(link)), scored)
+    
+    async def _score_single(self, client: AsyncOpenAI, semaphore: asyncio.Semaphore,
+                            link: LinkRecord) -> Optional[Dict]:
+        """
+        Score one link with its own request
+        
+        Args:
+            client: Async OpenAI client
+            semaphore: Cap on requests in flight
+            link: Link record
+        
+        Returns:
+            Validated relevance data, or None if every attempt or the response failed
+        """
+        try:
+            response_text, call = await self._complete(client, semaphore, self._link_prompt(link), 500, 1)
+        except BudgetExhaustedError:
+            return None
+        except Exception as e:
+            logger.error(f"Error analyzing link {link.url}: {str(e)}")
+            return None
+        
+        try:
+            relevance_data = self._validate_relevance(json.loads(response_text))
+        except Exception as e:
+            logger.error(f"Error parsing analysis of link {link.url}: {str(e)}")
+            relevance_data = None
+        else:
+            if relevance_data is None:
+                logger.error(f"Invalid relevance data for link {link.url}")
+        self._record_call(1, parse_failures=int(relevance_data is None), **call)
+        return relevance_data
+    
+    async def _complete(self, client: AsyncOpenAI, semaphore: asyncio.Semaphore,
+                        user_prompt: str, max_tokens: int, links: int) -> Tuple[str, Dict[str, Any]]:
+        """
+        Run one chat completion within the rate limits, retrying transient failures
+        
+        Tokens are reserved from an estimate of the prompt size plus the
+        completion limit, and corrected with the reported usage afterwards.
+        A call that fails for good is recorded here; the caller records a
+        successful one once it has parsed the response.
+        
+        Args:
+            client: Async OpenAI client
+            semaphore: Cap on requests in flight
+            user_prompt: User message
+            max_tokens: Completion token limit
+            links: Number of links scored by the call
+        
+        Returns:
+            Tuple of (response content, latency/usage/retries for _record_call)
+        
+        Raises:
+            openai.OpenAIError: If the request fails for good
+            BudgetExhaustedError: If the scoring budget ran out before the request was sent
+        """
+        estimated_tokens = (len(SYSTEM_PROMPT) + len(user_prompt)) // 4 + max_tokens
+        
+        for attempt in range(self.max_retries + 1):
+            await self.request_limiter.acquire_async()
+            await self.token_limiter.acquire_async(estimated_tokens)
+            
+            try:
+                async with semaphore:
+                    if self._budget_exhausted():
+                        self.token_limiter.adjust(-estimated_tokens)
+                        raise BudgetExhaustedError()
+                    started = time.monotonic()
+                    response = await client.chat.completions.create(
+                        model=self.model,
+                        response_format={"type": "json_object"},
+                        messages=[
+                            {"role": "system", "content": SYSTEM_PROMPT},
+                            {"role": "user", "content": user_prompt}
+                        ],
+                        max_tokens=max_tokens
+                    )
+            except openai.OpenAIError as e:
+                # Rejected requests do not count against the token budget
+                self.token_limiter.adjust(-estimated_tokens)
+                if attempt == self.max_retries or not self._is_retryable(e):
+                    self._record_call(links, time.monotonic() - started, retries=attempt, error=e)
+                    raise
+                delay = self._retry_delay(attempt, e)
+                logger.warning(f"OpenAI request failed ({type(e).__name__}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            
+            latency = time.monotonic() - started
+            usage = getattr(response, 'usage', None)
+            if usage is not None:
+                self.token_limiter.adjust(usage.total_tokens - estimated_tokens)
+            return response.choices[0].message.content, {'latency': latency, 'usage': usage, 'retries': attempt}
+    
+    def _is_retryable(self, error: Exception) -> bool:
+        """Check whether a failed request may succeed when retried"""
+        if isinstance(error, openai.RateLimitError):
+            # An exhausted quota does not recover by waiting
+            return getattr(error, 'code', None) != 'insufficient_quota'
+        if isinstance(error, (openai.APIConnectionError, openai.InternalServerError)):
+            return True
+        return isinstance(error, openai.APIStatusError) and error.status_code in RETRYABLE_STATUSES
+    
+    def _retry_delay(self, attempt: int, error: Exception) -> float:
+        """
+        Seconds to wait before retrying a failed request
+        
+        Honors the server's Retry-After header; otherwise uses exponential
+        backoff with jitter so concurrent requests do not retry in lockstep.
+        
+        Args:
+            attempt: Zero-based number of the failed attempt
+            error: Error raised by the failed attempt
+        
+        Returns:
+            Delay in seconds
+        """
+        response = getattr(error, 'response', None)
+        retry_after = response.headers.get('retry-after') if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), OPENAI_RETRY_MAX_DELAY)
+            except ValueError:
+                pass
+        
+        delay = min(OPENAI_RETRY_BASE_DELAY * (2 ** attempt), OPENAI_RETRY_MAX_DELAY)
+        return random.uniform(delay / 2, delay)
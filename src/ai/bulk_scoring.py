@@ -0,0 +1,385 @@
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from src.ai.llm_metrics import crawl_context, new_crawl_id
+from src.ai.openai_service import OpenAIService
+from src.config import (
+    OPENAI_BATCH_SIZE, BULK_SCORING_DIR, BULK_MAX_REQUESTS_PER_JOB, BULK_POLL_INTERVAL, BULK_COMMIT_LINES,
+    BULK_COST_FACTOR
+)
+from src.storage.models import Link
+from src.storage.repository import LinkRepository
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FILE = 'checkpoint.json'
+
+# Batch statuses after which a job makes no more progress
+TERMINAL_STATUSES = {'completed', 'failed', 'expired', 'cancelled'}
+
+
+class BulkScorer:
+    """
+    Rescore stored links through the OpenAI Batch API
+    
+    Requests are written to JSONL files, uploaded and submitted as batch
+    jobs, and the results are streamed back into the database once the jobs
+    finish. Progress is checkpointed after every step, so an interrupted run
+    picks up where it stopped instead of resubmitting (and paying for) work.
+    Results also go to the service's relevance cache, and each request is
+    recorded in its call metrics under the run's ID.
+    """
+    
+    def __init__(self, service: OpenAIService, repo: LinkRepository, work_dir: str = BULK_SCORING_DIR,
+                 batch_size: int = OPENAI_BATCH_SIZE, max_requests_per_job: int = BULK_MAX_REQUESTS_PER_JOB,
+                 poll_interval: float = BULK_POLL_INTERVAL, commit_lines: int = BULK_COMMIT_LINES):
+        """
+        Initialize bulk scorer
+        
+        Args:
+            service: OpenAI service whose client, model and prompts are used
+            repo: Link repository
+            work_dir: Directory for request files and the checkpoint
+            batch_size: Links scored per request
+            max_requests_per_job: Requests per batch job
+            poll_interval: Seconds between batch status checks
+            commit_lines: Result lines applied between checkpoints
+        """
+        self.service = service
+        self.client = service.client
+        self.repo = repo
+        self.work_dir = work_dir
+        self.batch_size = batch_size
+        self.max_requests_per_job = max_requests_per_job
+        self.poll_interval = poll_interval
+        self.commit_lines = commit_lines
+        self.checkpoint_path = os.path.join(work_dir, CHECKPOINT_FILE)
+    
+    def run(self, website_id: Optional[int] = None, restart: bool = False) -> Dict[str, Any]:
+        """
+        Rescore stored links, resuming an unfinished run unless told to restart
+        
+        Args:
+            website_id: Only rescore links of this website
+            restart: Discard an unfinished run and start over
+        
+        Returns:
+            Summary with job, request and link counts
+        """
+        checkpoint = self._load_checkpoint()
+        if checkpoint is not None and (restart or self._is_finished(checkpoint)):
+            if not self._is_finished(checkpoint):
+                self._cancel(checkpoint)
+            checkpoint = None
+        
+        if checkpoint is None:
+            checkpoint = {'run_id': new_crawl_id(), 'website_id': website_id, 'batch_size': self.batch_size,
+                          'model': self.service.model, 'last_link_id': 0, 'prepared': False, 'jobs': []}
+            self._save_checkpoint(checkpoint)
+        else:
+            logger.info(f"Resuming bulk scoring run with {len(checkpoint['jobs'])} jobs")
+            if checkpoint['website_id'] != website_id:
+                logger.warning(f"Resumed run covers website {checkpoint['website_id']}; "
+                               f"pass restart to rescore website {website_id} instead")
+        
+        self.prepare(checkpoint)
+        self.submit(checkpoint)
+        self.wait(checkpoint)
+        with crawl_context(checkpoint.get('run_id'), checkpoint['website_id']):
+            self.collect(checkpoint)
+        
+        return {
+            'run_id': checkpoint.get('run_id'),
+            'jobs': len(checkpoint['jobs']),
+            'requests': sum(job['requests'] for job in checkpoint['jobs']),
+            'links': sum(job['links'] for job in checkpoint['jobs']),
+            'links_scored': sum(job['scored'] for job in checkpoint['jobs']),
+            'links_failed': sum(job['links'] - job['scored'] for job in checkpoint['jobs'])
+        }
+    
+    def prepare(self, checkpoint: Dict[str, Any]) -> None:
+        """
+        Write request files for every stored link not yet in a job
+        
+        Args:
+            checkpoint: Run checkpoint, updated and saved as each file is completed
+        """
+        if checkpoint['prepared']:
+            return
+        
+        os.makedirs(self.work_dir, exist_ok=True)
+        requests = self._iter_requests(checkpoint['website_id'], checkpoint['last_link_id'],
+                                       checkpoint['batch_size'], checkpoint['model'])
+        
+        exhausted = False
+        while not exhausted:
+            index = len(checkpoint['jobs'])
+            input_path = os.path.join(self.work_dir, f"requests-{index:04d}.jsonl")
+            job = {'input_path': input_path, 'requests': 0, 'links': 0, 'status': 'prepared',
+                   'file_id': None, 'batch_id': None, 'output_file_id': None, 'error_file_id': None,
+                   'lines_applied': 0, 'scored': 0}
+            
+            # A file left half-written by an interrupted run is rewritten from the last checkpoint
+            last_link_id = checkpoint['last_link_id']
+            with open(input_path, 'w', encoding='utf-8') as f:
+                for request, link_ids in requests:
+                    f.write(json.dumps(request) + '\n')
+                    job['requests'] += 1
+                    job['links'] += len(link_ids)
+                    last_link_id = link_ids[-1]
+                    if job['requests'] >= self.max_requests_per_job:
+                        break
+                else:
+                    exhausted = True
+            
+            if job['requests']:
+                checkpoint['jobs'].append(job)
+                checkpoint['last_link_id'] = last_link_id
+                logger.info(f"Prepared {input_path}: {job['requests']} requests for {job['links']} links")
+            else:
+                os.remove(input_path)
+            checkpoint['prepared'] = exhausted
+            self._save_checkpoint(checkpoint)
+    
+    def submit(self, checkpoint: Dict[str, Any]) -> None:
+        """
+        Upload prepared request files and create their batch jobs
+        
+        Args:
+            checkpoint: Run checkpoint, updated and saved after each upload and submission
+        """
+        for job in checkpoint['jobs']:
+            if job['file_id'] is None:
+                with open(job['input_path'], 'rb') as f:
+                    job['file_id'] = self.client.files.create(file=f, purpose='batch').id
+                self._save_checkpoint(checkpoint)
+            
+            if job['batch_id'] is None:
+                batch = self.client.batches.create(
+                    input_file_id=job['file_id'],
+                    endpoint='/v1/chat/completions',
+                    completion_window='24h',
+                    metadata={'purpose': 'link rescoring'}
+                )
+                job['batch_id'] = batch.id
+                job['status'] = batch.status
+                self._save_checkpoint(checkpoint)
+                logger.info(f"Submitted batch {batch.id} with {job['requests']} requests")
+    
+    def wait(self, checkpoint: Dict[str, Any]) -> None:
+        """
+        Poll submitted jobs until every one has finished
+        
+        Args:
+            checkpoint: Run checkpoint, updated and saved with each status change
+        """
+        while True:
+            pending = [job for job in checkpoint['jobs']
+                       if job['status'] not in TERMINAL_STATUSES and job['status'] != 'applied']
+            if not pending:
+                return
+            
+            for job in pending:
+                batch = self.client.batches.retrieve(job['batch_id'])
+                if batch.status != job['status']:
+                    counts = batch.request_counts
+                    progress = f" ({counts.completed}/{counts.total} done, {counts.failed} failed)" if counts else ""
+                    logger.info(f"Batch {batch.id}: {batch.status}{progress}")
+                job['status'] = batch.status
+                job['output_file_id'] = batch.output_file_id
+                job['error_file_id'] = batch.error_file_id
+            self._save_checkpoint(checkpoint)
+            
+            if any(job['status'] not in TERMINAL_STATUSES for job in pending):
+                time.sleep(self.poll_interval)
+    
+    def collect(self, checkpoint: Dict[str, Any]) -> None:
+        """
+        Stream finished jobs' results into the database
+        
+        Expired and cancelled jobs still return the results they completed;
+        links whose request failed keep their stored scores.
+        
+        Args:
+            checkpoint: Run checkpoint, updated and saved every `commit_lines` result lines
+        """
+        for job in checkpoint['jobs']:
+            if job['status'] == 'applied':
+                continue
+            
+            if job['output_file_id']:
+                self._apply_results(job, checkpoint)
+            if job['error_file_id']:
+                errors = 0
+                for line in self._iter_lines(job['error_file_id']):
+                    self._record_failed_request(line, checkpoint['model'])
+                    errors += 1
+                self.service.flush_metrics()
+                logger.warning(f"Batch {job['batch_id']}: {errors} requests failed")
+            if job['status'] == 'failed':
+                logger.error(f"Batch {job['batch_id']} failed; its links keep their stored scores")
+            
+            job['status'] = 'applied'
+            self._save_checkpoint(checkpoint)
+            logger.info(f"Batch {job['batch_id']}: rescored {job['scored']}/{job['links']} links")
+    
+    def _apply_results(self, job: Dict[str, Any], checkpoint: Dict[str, Any]) -> None:
+        """Apply one job's result lines, skipping lines applied before an interruption"""
+        scores: Dict[int, Dict] = {}
+        lines = 0
+        for line_number, line in enumerate(self._iter_lines(job['output_file_id'])):
+            if line_number < job['lines_applied']:
+                continue
+            
+            scores.update(self._parse_result(line, checkpoint['model']))
+            lines += 1
+            if lines >= self.commit_lines:
+                job['scored'] += self._store_scores(scores, checkpoint['model'])
+                job['lines_applied'] = line_number + 1
+                self._save_checkpoint(checkpoint)
+                scores, lines = {}, 0
+        
+        if lines:
+            job['scored'] += self._store_scores(scores, checkpoint['model'])
+            job['lines_applied'] += lines
+            self._save_checkpoint(checkpoint)
+    
+    def _store_scores(self, scores: Dict[int, Dict], model: str) -> int:
+        """
+        Store relevance data in the database and the relevance cache, and write the recorded calls
+        
+        Args:
+            scores: Relevance data by link ID
+            model: Model the run scored with
+        
+        Returns:
+            Number of links updated
+        """
+        updated = self.repo.update_link_scores(scores)
+        # Cache keys include the model, so results of a run resumed under another model are not cached
+        if self.service.cache is not None and scores and model == self.service.model:
+            self.service.cache_results([(self._link_fields(link), scores[link.id])
+                                        for link in self.repo.get_links_by_ids(list(scores))])
+        self.service.flush_metrics()
+        return updated
+    
+    def _record_call(self, model: str, links: int, usage: Any = None, parse_failures: int = 0,
+                     error: Optional[BaseException] = None) -> None:
+        """Record one batch request in the call metrics; the Batch API reports no latency, so it counts as 0"""
+        if self.service.metrics is not None:
+            self.service.metrics.record(model, links, 0.0, usage=usage, parse_failures=parse_failures, error=error,
+                                        cost_factor=BULK_COST_FACTOR)
+    
+    def _record_failed_request(self, line: str, model: str) -> None:
+        """Record a line of a batch error file as a failed call"""
+        try:
+            result = json.loads(line)
+            links = len(result['custom_id'].split('-', 1)[1].split(','))
+        except (ValueError, KeyError, IndexError, AttributeError):
+            return
+        error = result.get('error') or {}
+        self._record_call(model, links, error=RuntimeError(error.get('message') or 'Batch request failed'))
+    
+    def _parse_result(self, line: str, model: str) -> Dict[int, Dict]:
+        """
+        Parse one result line into relevance data by link ID, recording the request
+        
+        Args:
+            line: JSONL line of a batch output file
+            model: Model the run scored with
+        
+        Returns:
+            Validated relevance data for each link the request scored
+        """
+        try:
+            result = json.loads(line)
+            link_ids = [int(link_id) for link_id in result['custom_id'].split('-', 1)[1].split(',')]
+        except (ValueError, KeyError, IndexError) as e:
+            logger.error(f"Invalid batch result line: {str(e)}")
+            return {}
+        
+        response = result.get('response') or {}
+        if response.get('status_code') != 200:
+            logger.warning(f"Request {result['custom_id']} failed with status {response.get('status_code')}")
+            self._record_call(model, len(link_ids),
+                              error=RuntimeError(f"Batch request failed with status {response.get('status_code')}"))
+            return {}
+        
+        usage = (response.get('body') or {}).get('usage')
+        try:
+            content = response['body']['choices'][0]['message']['content']
+            results = self.service.parse_batch_response(content, len(link_ids))
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            logger.error(f"Error parsing result of request {result['custom_id']}: {str(e)}")
+            self._record_call(model, len(link_ids), usage, parse_failures=len(link_ids))
+            return {}
+        
+        self._record_call(model, len(link_ids), usage, parse_failures=results.count(None))
+        return {link_id: data for link_id, data in zip(link_ids, results) if data is not None}
+    
+    def _iter_requests(self, website_id: Optional[int], after_id: int, batch_size: int,
+                       model: str) -> Iterator[Tuple[Dict[str, Any], List[int]]]:
+        """
+        Build batch requests for stored links after a given ID
+        
+        Yields:
+            Tuples of (batch request line, IDs of the links it scores)
+        """
+        for chunk in self.repo.iter_links(website_id=website_id, after_id=after_id):
+            for i in range(0, len(chunk), batch_size):
+                links = chunk[i:i+batch_size]
+                link_ids = [link.id for link in links]
+                body = self.service.batch_request([self._link_fields(link) for link in links])
+                # A resumed run keeps the model it started with
+                body['model'] = model
+                yield {
+                    'custom_id': f"links-{','.join(map(str, link_ids))}",
+                    'method': 'POST',
+                    'url': '/v1/chat/completions',
+                    'body': body
+                }, link_ids
+    
+    @staticmethod
+    def _link_fields(link: Link) -> Dict[str, Any]:
+        """Fields of a stored link that the prompt and the cache key are built from"""
+        return {'url': link.url, 'page_title': link.page_title or '', 'is_document': link.is_document}
+    
+    def _iter_lines(self, file_id: str) -> Iterator[str]:
+        """Stream the non-empty lines of an API file without loading it whole"""
+        with self.client.files.with_streaming_response.content(file_id) as response:
+            for line in response.iter_lines():
+                if line.strip():
+                    yield line
+    
+    def _cancel(self, checkpoint: Dict[str, Any]) -> None:
+        """Cancel the still-running jobs of a run being discarded"""
+        for job in checkpoint['jobs']:
+            if job['batch_id'] and job['status'] not in TERMINAL_STATUSES and job['status'] != 'applied':
+                try:
+                    self.client.batches.cancel(job['batch_id'])
+                    logger.info(f"Cancelled batch {job['batch_id']}")
+                except Exception as e:
+                    logger.error(f"Error cancelling batch {job['batch_id']}: {str(e)}")
+    
+    def _is_finished(self, checkpoint: Dict[str, Any]) -> bool:
+        """Check whether a run has applied every job"""
+        return checkpoint['prepared'] and all(job['status'] == 'applied' for job in checkpoint['jobs'])
+    
+    def _load_checkpoint(self) -> Optional[Dict[str, Any]]:
+        """Load the checkpoint of the previous run, if any"""
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+    
+    def _save_checkpoint(self, checkpoint: Dict[str, Any]) -> None:
+        """Write the checkpoint atomically so an interruption never leaves it half-written"""
+        os.makedirs(self.work_dir, exist_ok=True)
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(checkpoint, f, indent=2)
+        os.replace(tmp_path, self.checkpoint_path)
@@ -0,0 +1,176 @@
+import logging
+import threading
+import uuid
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
+
+from src.config import OPENAI_INPUT_COST_PER_MILLION, OPENAI_OUTPUT_COST_PER_MILLION
+from src.storage.models import LLMCall
+
+if TYPE_CHECKING:
+    from src.storage.write_queue import DatabaseWriter
+
+logger = logging.getLogger(__name__)
+
+# (crawl ID, website ID) that calls made in the current context are attributed to
+_current_crawl: ContextVar[Tuple[Optional[str], Optional[int]]] = ContextVar('current_crawl', default=(None, None))
+
+
+def new_crawl_id() -> str:
+    """Generate an ID identifying one crawl of a website"""
+    return uuid.uuid4().hex
+
+
+@contextmanager
+def crawl_context(crawl_id: Optional[str], website_id: Optional[int] = None) -> Iterator[None]:
+    """
+    Attribute OpenAI calls made inside the block to a crawl and website
+    
+    The context follows the code into asyncio tasks, asyncio.to_thread and
+    run_sync, so services shared between concurrent crawls record each call
+    against the right one.
+    
+    Args:
+        crawl_id: Crawl ID
+        website_id: Website ID
+    """
+    token = _current_crawl.set((crawl_id, website_id))
+    try:
+        yield
+    finally:
+        _current_crawl.reset(token)
+
+
+class LLMMetricsRecorder:
+    """Record token usage, cost, latency and failures of chat completions"""
+    
+    def __init__(self, input_cost_per_million: float = OPENAI_INPUT_COST_PER_MILLION,
+                 output_cost_per_million: float = OPENAI_OUTPUT_COST_PER_MILLION,
+                 writer: Optional['DatabaseWriter'] = None):
+        """
+        Initialize recorder
+        
+        Args:
+            input_cost_per_million: USD per million prompt tokens
+            output_cost_per_million: USD per million completion tokens
+            writer: Thread running the writes (the process-wide writer if None)
+        """
+        self.input_cost_per_million = input_cost_per_million
+        self.output_cost_per_million = output_cost_per_million
+        self.writer = writer
+        
+        self.calls = 0
+        self.links = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost = 0.0
+        self.latency_ms = 0.0
+        self.retries = 0
+        self.parse_failures = 0
+        self.errors = 0
+        
+        self._pending: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+    
+    def record(self, model: str, links: int, latency: float, usage: Any = None, retries: int = 0,
+               parse_failures: int = 0, error: Optional[BaseException] = None, cost_factor: float = 1.0) -> None:
+        """
+        Record one chat completion
+        
+        Calls are buffered and written to the llm_calls table by flush().
+        
+        Args:
+            model: Chat model used
+            links: Number of links scored by the call
+            latency: Seconds the request took
+            usage: Usage reported in the response (object or, from a Batch API result, dict), if any
+            retries: Attempts that failed before this one
+            parse_failures: Links whose result could not be parsed or validated
+            error: Error the call failed with for good, if any
+            cost_factor: Multiplier on the token prices (BULK_COST_FACTOR for Batch API requests)
+        """
+        if isinstance(usage, dict):
+            prompt_tokens = usage.get('prompt_tokens') or 0
+            completion_tokens = usage.get('completion_tokens') or 0
+        else:
+            prompt_tokens = getattr(usage, 'prompt_tokens', 0) or 0
+            completion_tokens = getattr(usage, 'completion_tokens', 0) or 0
+        cost = cost_factor * (prompt_tokens * self.input_cost_per_million
+                              + completion_tokens * self.output_cost_per_million) / 1_000_000
+        crawl_id, website_id = _current_crawl.get()
+        
+        with self._lock:
+            self.calls += 1
+            self.links += links
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            self.cost += cost
+            self.latency_ms += latency * 1000
+            self.retries += retries
+            self.parse_failures += parse_failures
+            self.errors += error is not None
+            
+            self._pending.append({
+                'crawl_id': crawl_id,
+                'website_id': website_id,
+                'model': model,
+                'links': links,
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'cost': cost,
+                'latency_ms': round(latency * 1000, 1),
+                'retries': retries,
+                'parse_failures': parse_failures,
+                'error': f"{type(error).__name__}: {error}"[:255] if error is not None else None,
+                'created_at': datetime.utcnow()
+            })
+    
+    def flush(self) -> Optional[Future]:
+        """
+        Queue buffered calls for the database writer
+        
+        Returns:
+            Future resolving once the calls are written, or None if none were buffered
+        """
+        with self._lock:
+            rows, self._pending = self._pending, []
+        if not rows:
+            return None
+        
+        if self.writer is None:
+            from src.storage.write_queue import get_writer
+            self.writer = get_writer()
+        
+        def save(repo):
+            repo.session.bulk_insert_mappings(LLMCall, rows)
+            repo.session.commit()
+        
+        def report(done: Future) -> None:
+            if done.exception() is not None:
+                logger.error(f"Error saving {len(rows)} LLM call metrics: {str(done.exception())}")
+        
+        future = self.writer.submit(save)
+        future.add_done_callback(report)
+        return future
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get totals for the calls recorded by this recorder
+        
+        Returns:
+            Dictionary with call, link and token counts, cost, average latency and failure counts
+        """
+        return {
+            'calls': self.calls,
+            'links': self.links,
+            'prompt_tokens': self.prompt_tokens,
+            'completion_tokens': self.completion_tokens,
+            'cost': self.cost,
+            'avg_latency_ms': self.latency_ms / self.calls if self.calls else 0.0,
+            'retries': self.retries,
+            'parse_failures': self.parse_failures,
+            'errors': self.errors
+        }
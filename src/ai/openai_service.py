@@ -1,85 +1,136 @@
 import logging
+import hashlib
 import json
-from typing import Dict, List
+import time
+from operator import attrgetter
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import openai
 from openai import OpenAI
 
-from src.config import OPENAI_API_KEY, OPENAI_MODEL
+from src.config import (
+    OPENAI_API_KEY, OPENAI_MODEL, OPENAI_BASE_URL, OPENAI_BATCH_SIZE, RELEVANCE_CACHE_ENABLED,
+    PRECLASSIFIER_ENABLED, LLM_METRICS_ENABLED, LINK_CLUSTERING_ENABLED
+)
+from src.ai.llm_metrics import LLMMetricsRecorder
+from src.ai.preclassifier import LinkPreclassifier
+from src.ai.relevance_cache import RelevanceCache
+from src.ai.scoring_budget import (
+    ScoringBudget, BUDGET_EXHAUSTED_RATIONALE, budget_context, active_budget, prioritize
+)
+from src.crawler.link_clusterer import LinkClusterer, LinkCluster
+from src.crawler.link_record import LinkRecord, ANALYSIS_ERROR_RATIONALE, UNSCORED_RATIONALES
 
 logger = logging.getLogger(__name__)
 
+# Prompts shared by single-link and batched analysis
+SYSTEM_PROMPT = """
+You are an AI assistant that analyzes website links to identify high-value content related to:
+1. Contact information (especially for finance directors, government officials)
+2. Financial documents (ACFR, Annual Comprehensive Financial Reports, budgets, financial statements)
+3. Government reports and official documents
+
+Analyze the provided URL and page title to determine relevance.
+"""
+
+SCORING_INSTRUCTIONS = """
+Rate on a scale of 0.0 to 1.0:
+1. contact_relevance: How likely this contains contact information
+2. financial_relevance: How likely this contains financial documents/information
+3. official_relevance: How likely this contains government/official documents
+
+Add these fields:
+- overall_relevance: Overall score (maximum of the three scores)
+- primary_category: One of ["contact", "financial", "official", "other"]
+- rationale: Brief explanation of your reasoning (max 100 characters)
+"""
+
+LINK_PROMPT = """
+Please analyze this link and provide a JSON response with these fields:
+
+Link information:
+- URL: {url}
+- Page title: {page_title}
+- Is document: {is_document}
+{instructions}
+Return ONLY valid JSON, nothing else.
+"""
+
+BATCH_PROMPT = """
+Please analyze each of these {count} links. Provide a JSON response of the form
+{{"results": [{{"index": <link index>, ...fields}}, ...]}} with one entry per link.
+
+Links:
+{links}
+
+For each link:
+{instructions}
+Return ONLY valid JSON, nothing else.
+"""
+
+CATEGORIES = ("contact", "financial", "official", "other")
+SCORE_FIELDS = ("contact_relevance", "financial_relevance", "official_relevance")
+
+# Identifies the prompt templates; cached scores from other prompts are never reused
+PROMPT_HASH = hashlib.sha256(
+    "\0".join([SYSTEM_PROMPT, SCORING_INSTRUCTIONS, LINK_PROMPT, BATCH_PROMPT]).encode('utf-8')
+).hexdigest()[:16]
+
 class OpenAIService:
     """Service for interacting with OpenAI API to analyze link relevance"""
     
-    def __init__(self, api_key: str = OPENAI_API_KEY, model: str = OPENAI_MODEL):
-        """Initialize OpenAI client"""
-        self.client = OpenAI(api_key=api_key)
+    def __init__(self, api_key: str = OPENAI_API_KEY, model: str = OPENAI_MODEL,
+                 base_url: Optional[str] = OPENAI_BASE_URL, cache: Optional[RelevanceCache] = None,
+                 preclassifier: Optional[LinkPreclassifier] = None,
+                 metrics: Optional[LLMMetricsRecorder] = None, clusterer: Optional[LinkClusterer] = None):
+        """
+        Initialize OpenAI client
+        
+        Args:
+            api_key: OpenAI API key
+            model: Chat model used for scoring
+            base_url: OpenAI-compatible API endpoint (None for the OpenAI API)
+            cache: Relevance cache (defaults to an SQLite cache if RELEVANCE_CACHE_ENABLED)
+            preclassifier: Local model deciding confident links without the LLM
+                           (defaults to the trained model, if PRECLASSIFIER_ENABLED and one exists)
+            metrics: Recorder for per-call token usage, latency and failures
+                     (defaults to one writing to the database, if LLM_METRICS_ENABLED)
+            clusterer: Scores look-alike links through a few representatives
+                       (defaults to a URL-template clusterer, if LINK_CLUSTERING_ENABLED)
+        """
+        self.client = OpenAI(api_key=api_key, base_url=base_url)
+        self.base_url = base_url
         self.model = model
+        self.cache = cache if cache is not None else (RelevanceCache() if RELEVANCE_CACHE_ENABLED else None)
+        if preclassifier is None and PRECLASSIFIER_ENABLED:
+            preclassifier = LinkPreclassifier.load_default()
+        self.preclassifier = preclassifier
+        self.metrics = metrics if metrics is not None else (LLMMetricsRecorder() if LLM_METRICS_ENABLED else None)
+        self.clusterer = clusterer if clusterer is not None else (LinkClusterer() if LINK_CLUSTERING_ENABLED else None)
         logger.info(f"OpenAI service initialized with model: {model}")
         
-    def analyze_link_relevance(self, link_data: Dict) -> Dict:
+    def analyze_link_relevance(self, link_data: Union[LinkRecord, Dict]) -> Dict:
         """
         Analyze a link's relevance for finding contacts and financial documents
         
         Args:
-            link_data: Dictionary containing link information
+            link_data: Link record or dictionary containing link information
             
         Returns:
             Dictionary with relevance scores and categories
         """
         try:
-            # Extract relevant information for analysis
-            url = link_data.get('url', '')
-            page_title = link_data.get('page_title', '')
-            is_document = link_data.get('is_document', False)
-            
-            # Craft prompt for OpenAI
-            system_prompt = """
-            You are an AI assistant that analyzes website links to identify high-value content related to:
-            1. Contact information (especially for finance directors, government officials)
-            2. Financial documents (ACFR, Annual Comprehensive Financial Reports, budgets, financial statements)
-            3. Government reports and official documents
-            
-            Analyze the provided URL and page title to determine relevance.
-            """
-            
-            user_prompt = f"""
-            Please analyze this link and provide a JSON response with these fields:
-            
-            Link information:
-            - URL: {url}
-            - Page title: {page_title}
-            - Is document: {is_document}
-            
-            Rate on a scale of 0.0 to 1.0:
-            1. contact_relevance: How likely this contains contact information
-            2. financial_relevance: How likely this contains financial documents/information
-            3. official_relevance: How likely this contains government/official documents
-            
-            Add these fields:
-            - overall_relevance: Overall score (maximum of the three scores)
-            - primary_category: One of ["contact", "financial", "official", "other"]
-            - rationale: Brief explanation of your reasoning (max 100 characters)
-            
-            Return ONLY valid JSON, nothing else.
-            """
-            
-            # Call OpenAI API
-            response = self.client.chat.completions.create(
-                model=self.model,
-                response_format={"type": "json_object"},
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                max_tokens=500
-            )
-            
-            # Parse response
-            response_text = response.choices[0].message.content
-            relevance_data = json.loads(response_text)
+            cache_key = self._cache_key(link_data)
+            if cache_key is not None:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    return cached
+                    
+            relevance_data = self._request_link_relevance(link_data)
             
+            if cache_key is not None and self._validate_relevance(relevance_data) is not None:
+                self.cache.set(cache_key, relevance_data)
+                
             return relevance_data
         except Exception as e:
             logger.error(f"Error analyzing link relevance: {str(e)}")
@@ -90,62 +141,450 @@ class OpenAIService:
                 "official_relevance": 0.0,
                 "overall_relevance": 0.0,
                 "primary_category": "other",
-                "rationale": "Error during analysis"
+                "rationale": ANALYSIS_ERROR_RATIONALE
             }
+        finally:
+            self.flush_metrics()
+            
+    def _request_link_relevance(self, link_data: Union[LinkRecord, Dict]) -> Dict:
+        """
+        Ask the model for one link's relevance, raising on failure
+        
+        Args:
+            link_data: Link record or dictionary containing link information
+            
+        Returns:
+            Relevance data as returned by the model
+        """
+        # Craft prompt for OpenAI
+        user_prompt = self._link_prompt(link_data)
+        
+        # Call OpenAI API
+        started = time.monotonic()
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                response_format={"type": "json_object"},
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": user_prompt}
+                ],
+                max_tokens=500
+            )
+        except Exception as e:
+            self._record_call(1, time.monotonic() - started, error=e)
+            raise
+        latency = time.monotonic() - started
+        
+        # Parse response
+        response_text = response.choices[0].message.content
+        try:
+            relevance_data = json.loads(response_text)
+        except ValueError:
+            self._record_call(1, latency, response.usage, parse_failures=1)
+            raise
+        self._record_call(1, latency, response.usage,
+                          parse_failures=int(self._validate_relevance(relevance_data) is None))
+        return relevance_data
+        
+    def analyze_links_batch(self, links: List[Union[LinkRecord, Dict]]) -> List[Optional[Dict]]:
+        """
+        Analyze several links in a single chat completion
+        
+        The system prompt and scoring instructions are sent once for the whole
+        batch, and each link's result is validated on its own.
+        
+        Args:
+            links: Link records or dictionaries to analyze
+            
+        Returns:
+            Relevance data per link, in input order; None for links whose
+            result was missing or invalid (including when the request failed)
+        """
+        results = self._request_batch(links)
+        return results if results is not None else [None] * len(links)
+        
+    def _request_batch(self, links: List[Union[LinkRecord, Dict]]) -> Optional[List[Optional[Dict]]]:
+        """
+        Analyze several links in a single chat completion
+        
+        Args:
+            links: Link records or dictionaries to analyze
+            
+        Returns:
+            Relevance data per link, in input order, with None for items missing
+            or invalid in the response; None if the request or response failed as a whole
+        """
+        if not links:
+            return []
+            
+        started = time.monotonic()
+        response = None
+        try:
+            response = self.client.chat.completions.create(**self.batch_request(links))
+            latency = time.monotonic() - started
+            results = self.parse_batch_response(response.choices[0].message.content, len(links))
+        except Exception as e:
+            logger.error(f"Error analyzing batch of {len(links)} links: {str(e)}")
+            if response is None:
+                self._record_call(len(links), time.monotonic() - started, error=e)
+            else:
+                self._record_call(len(links), latency, response.usage, parse_failures=len(links))
+            return None
+            
+        self._record_call(len(links), latency, response.usage, parse_failures=results.count(None))
+        return results
+            
+    def _link_prompt(self, link: Union[LinkRecord, Dict]) -> str:
+        """Build the user prompt for analyzing one link"""
+        return LINK_PROMPT.format(
+            url=link.get('url', ''),
+            page_title=link.get('page_title', ''),
+            is_document=link.get('is_document', False),
+            instructions=SCORING_INSTRUCTIONS
+        )
+        
+    def batch_request(self, links: List[Union[LinkRecord, Dict]]) -> Dict[str, Any]:
+        """
+        Build the chat completion parameters for analyzing several links
+        
+        The same parameters make up the body of a Batch API request line.
+        
+        Args:
+            links: Link records or dictionaries to analyze
+            
+        Returns:
+            Keyword arguments for chat.completions.create
+        """
+        return {
+            "model": self.model,
+            "response_format": {"type": "json_object"},
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": self.batch_prompt(links)}
+            ],
+            "max_tokens": self.batch_max_tokens(len(links))
+        }
+        
+    def batch_prompt(self, links: List[Union[LinkRecord, Dict]]) -> str:
+        """Build the user prompt for analyzing several links, numbered by index"""
+        link_lines = "\n".join(
+            f"[{index}] URL: {link.get('url', '')} | Page title: {link.get('page_title', '')} | "
+            f"Is document: {link.get('is_document', False)}"
+            for index, link in enumerate(links)
+        )
+        return BATCH_PROMPT.format(count=len(links), links=link_lines, instructions=SCORING_INSTRUCTIONS)
+        
+    def batch_max_tokens(self, count: int) -> int:
+        """Completion token limit for a batch of `count` links"""
+        return 100 + 150 * count
+        
+    def parse_batch_response(self, response_text: str, count: int) -> List[Optional[Dict]]:
+        """
+        Parse a batched response into validated relevance data per link
+        
+        Args:
+            response_text: JSON response content
+            count: Number of links in the batch
+            
+        Returns:
+            Relevance data per link index; None for missing or invalid items
+        
+        Raises:
+            ValueError: If the response is not valid JSON
+        """
+        items = json.loads(response_text).get('results')
+        
+        results: List[Optional[Dict]] = [None] * count
+        if not isinstance(items, list):
+            logger.warning("Batch analysis response has no results list")
+            return results
+            
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            index = item.get('index')
+            if isinstance(index, int) and 0 <= index < count and results[index] is None:
+                results[index] = self._validate_relevance(item)
+                
+        return results
+        
+    def _validate_relevance(self, item: Dict[str, Any]) -> Optional[Dict]:
+        """
+        Validate and normalize one link's relevance data
+        
+        Args:
+            item: Relevance data as returned by the model
+            
+        Returns:
+            Normalized relevance data, or None if a score is missing or not a number
+        """
+        scores = {}
+        for field in SCORE_FIELDS:
+            value = item.get(field)
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                return None
+            scores[field] = min(max(float(value), 0.0), 1.0)
+            
+        overall = item.get('overall_relevance')
+        if isinstance(overall, bool) or not isinstance(overall, (int, float)):
+            overall = max(scores.values())
             
-    def batch_analyze_links(self, links: List[Dict], batch_size: int = 5) -> List[Dict]:
+        category = item.get('primary_category')
+        if category not in CATEGORIES:
+            category = "other"
+            
+        return {
+            **scores,
+            "overall_relevance": min(max(float(overall), 0.0), 1.0),
+            "primary_category": category,
+            "rationale": str(item.get('rationale', ''))[:100]
+        }
+        
+    def batch_analyze_links(self, links: List[Union[LinkRecord, Dict]], batch_size: int = OPENAI_BATCH_SIZE,
+                            budget: Optional[ScoringBudget] = None) -> List[LinkRecord]:
         """
         Analyze a batch of links for relevance
         
+        Links worth analyzing are looked up in the relevance cache first, and
+        links the pre-classifier is confident about are decided locally.
+        Families of links sharing a URL template are scored through a few
+        representatives. The rest are scored `batch_size` at a time in one
+        chat completion each, most promising first, and links whose batched
+        result is invalid are retried with a single-link call. Once the
+        budget runs out, the remaining links keep their heuristic score.
+        
         Args:
-            links: List of link dictionaries
-            batch_size: Number of links to analyze in a single batch
+            links: List of link records (dictionaries are converted)
+            batch_size: Number of links to analyze in a single request
+            budget: Scoring budget of the crawl, or None for no limit
             
         Returns:
-            List of links with added relevance data
+            List of link records with relevance data filled in
         """
-        enriched_links = []
+        links = [LinkRecord.coerce(link) for link in links]
+        candidates = self._triage(self._apply_cached(self._select_candidates(links)))
+        candidates, clusters = self._plan_clusters(candidates)
+        scored = []
         
-        # Process links in batches
+        with budget_context(budget):
+            self._score_links(candidates, batch_size, scored)
+            # Score members of clusters whose representatives disagreed
+            self._score_links(self._propagate_clusters(clusters, scored), batch_size, scored)
+            
+        self.cache_results(scored)
+        self.flush_metrics()
+        
+        # Sort links by overall relevance
+        enriched_links = sorted(links, key=attrgetter('overall_relevance'), reverse=True)
+        
+        return enriched_links
+        
+    def _score_links(self, links: List[LinkRecord], batch_size: int,
+                     scored: List[Tuple[LinkRecord, Dict]]) -> None:
+        """
+        Score links in place, `batch_size` per request, highest initial value first
+        
+        Args:
+            links: Link records to score
+            batch_size: Number of links to analyze in a single request
+            scored: Successfully scored links, appended to
+        """
+        links = prioritize(links)
         for i in range(0, len(links), batch_size):
+            if self._budget_exhausted():
+                # Leave the rest with their heuristic score
+                for link in links[i:]:
+                    self._apply_result(link, None, scored)
+                return
+                
             batch = links[i:i+batch_size]
+            results = self._request_batch(batch) if len(batch) > 1 else [None]
+            if results is None:
+                # The request failed: retrying each link would most likely fail the same way
+                for link in batch:
+                    self._apply_result(link, None, scored)
+                continue
+                
+            for link, relevance_data in zip(batch, results):
+                # Fall back to a single-link call for items the batch response left out or garbled
+                if relevance_data is None and not self._budget_exhausted():
+                    relevance_data = self._analyze_single(link)
+                self._apply_result(link, relevance_data, scored)
+                
+    def _plan_clusters(self, candidates: List[LinkRecord]) -> Tuple[List[LinkRecord], List[LinkCluster]]:
+        """
+        Group look-alike links so only their representatives are scored
+        
+        Args:
+            candidates: Link records to analyze
+            
+        Returns:
+            Tuple of (link records to score, clusters waiting for their representatives)
+        """
+        if self.clusterer is None or not candidates:
+            return candidates, []
+        return self.clusterer.plan(candidates)
+        
+    def _propagate_clusters(self, clusters: List[LinkCluster],
+                            scored: List[Tuple[LinkRecord, Dict]]) -> List[LinkRecord]:
+        """
+        Give cluster members their representatives' scores where the representatives agree
+        
+        Args:
+            clusters: Clusters returned by _plan_clusters
+            scored: Successfully scored links
+            
+        Returns:
+            Members that still need scoring of their own
+        """
+        if not clusters:
+            return []
+        return self.clusterer.propagate(clusters, {id(link): relevance_data for link, relevance_data in scored})
+        
+    def _select_candidates(self, links: List[LinkRecord]) -> List[LinkRecord]:
+        """
+        Pick the links worth AI analysis, filling in scores for the rest
+        
+        Args:
+            links: Link records, low-value ones updated in place
             
+        Returns:
+            Link records to analyze
+        """
+        candidates = []
+        for link in links:
             # Only analyze links with sufficient initial value
             # to save on API costs - using a lower threshold now
-            for link in batch:
-                initial_value = link.get('initial_value', 0.0)
-                
-                # If initial value is high enough, use AI for detailed analysis
-                # Lower threshold from 0.5 to 0.4 to analyze more links
-                if initial_value >= 0.4:
-                    try:
-                        relevance_data = self.analyze_link_relevance(link)
-                        link.update(relevance_data)
-                    except Exception as e:
-                        logger.error(f"Error analyzing link {link.get('url')}: {str(e)}")
-                        # Provide default values on error, but maintain the initial value
-                        link.update({
-                            "contact_relevance": 0.0,
-                            "financial_relevance": 0.0,
-                            "official_relevance": 0.0,
-                            "overall_relevance": initial_value,  # Use initial value instead of 0
-                            "primary_category": "other",
-                            "rationale": f"Error during analysis: {str(e)}"
-                        })
-                else:
-                    # For low initial value links, skip AI analysis
-                    link.update({
-                        "contact_relevance": 0.0,
-                        "financial_relevance": 0.0,
-                        "official_relevance": 0.0,
-                        "overall_relevance": initial_value,
-                        "primary_category": "other",
-                        "rationale": "Low initial value assessment"
-                    })
-                
-                enriched_links.append(link)
+            # Lower threshold from 0.5 to 0.4 to analyze more links
+            if link.initial_value >= 0.4:
+                candidates.append(link)
+            else:
+                # For low initial value links, skip AI analysis
+                link.update(self._default_relevance(link.initial_value, "Low initial value assessment"))
+        return candidates
+        
+    def _default_relevance(self, overall_relevance: float, rationale: str) -> Dict:
+        """Relevance data for a link that was not scored by the model"""
+        return {
+            "contact_relevance": 0.0,
+            "financial_relevance": 0.0,
+            "official_relevance": 0.0,
+            "overall_relevance": overall_relevance,
+            "primary_category": "other",
+            "rationale": rationale
+        }
+        
+    def _analyze_single(self, link: LinkRecord) -> Optional[Dict]:
+        """
+        Analyze one link with its own request
+        
+        Args:
+            link: Link record
+            
+        Returns:
+            Validated relevance data, or None if the call or the response failed
+        """
+        try:
+            relevance_data = self._validate_relevance(self._request_link_relevance(link))
+            if relevance_data is None:
+                logger.error(f"Invalid relevance data for link {link.url}")
+            return relevance_data
+        except Exception as e:
+            logger.error(f"Error analyzing link {link.url}: {str(e)}")
+            return None
+            
+    def _apply_result(self, link: LinkRecord, relevance_data: Optional[Dict],
+                      scored: List[Tuple[LinkRecord, Dict]]) -> None:
+        """
+        Store a scoring result on its link, collecting successes for the cache
+        
+        Args:
+            link: Link record, updated in place
+            relevance_data: Validated relevance data, or None if scoring failed
+            scored: Successfully scored links, appended to
+        """
+        if relevance_data is None:
+            # Provide default values on error or once the budget ran out, but maintain the initial value
+            rationale = BUDGET_EXHAUSTED_RATIONALE if self._budget_exhausted() else ANALYSIS_ERROR_RATIONALE
+            link.update(self._default_relevance(link.initial_value, rationale))
+        else:
+            link.update(relevance_data)
+            scored.append((link, relevance_data))
+            
+    def _record_call(self, links: int, latency: float, usage: Any = None, retries: int = 0,
+                     parse_failures: int = 0, error: Optional[BaseException] = None) -> None:
+        """Record one chat completion's usage, latency and failures, and charge it to the active budget"""
+        budget = active_budget()
+        if budget is not None:
+            budget.charge(tokens=getattr(usage, 'total_tokens', 0) or 0)
+        if self.metrics is not None:
+            self.metrics.record(self.model, links, latency, usage=usage, retries=retries,
+                                parse_failures=parse_failures, error=error)
+            
+    def _budget_exhausted(self) -> bool:
+        """Check whether the budget of the current scoring call has run out"""
+        budget = active_budget()
+        return budget is not None and budget.exhausted()
+        
+    def flush_metrics(self) -> None:
+        """Write recorded call metrics to the database"""
+        if self.metrics is not None:
+            self.metrics.flush()
+            
+    def _cache_key(self, link: Union[LinkRecord, Dict]) -> Optional[str]:
+        """Build the relevance cache key for a link, or None if caching is disabled"""
+        if self.cache is None:
+            return None
+        return self.cache.make_key(self.model, PROMPT_HASH, link.get('url', ''),
+                                   link.get('page_title', ''), link.get('is_document', False))
+        
+    def _apply_cached(self, candidates: List[LinkRecord]) -> List[LinkRecord]:
+        """
+        Fill in cached relevance data
+        
+        Args:
+            candidates: Link records to analyze, cache hits updated in place
+            
+        Returns:
+            Link records that still need to be analyzed
+        """
+        if self.cache is None or not candidates:
+            return candidates
+            
+        keys = [self._cache_key(link) for link in candidates]
+        cached = self.cache.get_many(keys)
+        
+        misses = []
+        for link, key in zip(candidates, keys):
+            if key in cached:
+                link.update(cached[key])
+            else:
+                misses.append(link)
                 
-        # Sort links by overall relevance
-        enriched_links.sort(key=lambda x: x.get('overall_relevance', 0.0), reverse=True)
+        if cached:
+            logger.info(f"Relevance cache: {len(candidates) - len(misses)} of {len(candidates)} links already scored")
+        return misses
+        
+    def _triage(self, candidates: List[LinkRecord]) -> List[LinkRecord]:
+        """
+        Decide links the pre-classifier is confident about
+        
+        Args:
+            candidates: Link records to analyze, confident ones updated in place
+            
+        Returns:
+            Link records that still need the LLM
+        """
+        if self.preclassifier is None or not candidates:
+            return candidates
+            
+        decided, uncertain = self.preclassifier.triage(candidates)
+        for link, relevance_data in decided:
+            link.update(relevance_data)
+        return uncertain
         
-        return enriched_links
\ No newline at end of file
+    def cache_results(self, scored: List[Tuple[Union[LinkRecord, Dict], Dict]]) -> None:
+        """Store successfully scored links in the relevance cache"""
+        if self.cache is not None and scored:
+            self.cache.set_many((self._cache_key(link), relevance_data) for link, relevance_data in scored)
\ No newline at end of file
@@ -0,0 +1,312 @@
+import logging
+import os
+import re
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from src.config import (
+    PRECLASSIFIER_PATH, PRECLASSIFIER_FEATURES, PRECLASSIFIER_ACCEPT_THRESHOLD, PRECLASSIFIER_REJECT_THRESHOLD
+)
+from src.crawler.link_record import LinkRecord
+
+logger = logging.getLogger(__name__)
+
+# Relevance outputs, in column order
+CATEGORIES = ('contact', 'financial', 'official')
+SCORE_FIELDS = tuple(f"{category}_relevance" for category in CATEGORIES)
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+def link_features(url: str, page_title: str = '', is_document: bool = False) -> List[str]:
+    """
+    Extract the features of a link for hashing
+    
+    Args:
+        url: Link URL
+        page_title: Title of the page the link was found on
+        is_document: Whether the link points to a document
+    
+    Returns:
+        Feature names: URL word unigrams and bigrams, title words, extension,
+        top-level domain, path depth and the document flag
+    """
+    parts = urlsplit(url.lower())
+    words = TOKEN_PATTERN.findall(f"{parts.path} {parts.query}")
+    
+    features = [f"u:{word}" for word in words]
+    features.extend(f"b:{first}_{second}" for first, second in zip(words, words[1:]))
+    features.extend(f"t:{word}" for word in TOKEN_PATTERN.findall((page_title or '').lower()))
+    
+    _, ext = os.path.splitext(parts.path)
+    if ext:
+        features.append(f"ext:{ext}")
+    features.append(f"tld:{parts.netloc.rsplit('.', 1)[-1]}")
+    features.append(f"depth:{min(parts.path.count('/'), 6)}")
+    if is_document:
+        features.append("doc")
+    
+    return features
+
+
+class LinkPreclassifier:
+    """
+    Logistic model over hashed link features predicting contact, financial
+    and official relevance, used to decide confident links without the LLM
+    """
+    
+    def __init__(self, n_features: int = PRECLASSIFIER_FEATURES,
+                 accept_threshold: float = PRECLASSIFIER_ACCEPT_THRESHOLD,
+                 reject_threshold: float = PRECLASSIFIER_REJECT_THRESHOLD,
+                 weights: Optional[np.ndarray] = None, bias: Optional[np.ndarray] = None):
+        """
+        Initialize pre-classifier
+        
+        Args:
+            n_features: Size of the hashed feature space
+            accept_threshold: Predicted overall relevance at or above which a link is decided locally
+            reject_threshold: Predicted overall relevance at or below which a link is decided locally
+            weights: Trained weights of shape (n_features, 3)
+            bias: Trained bias of shape (3,)
+        """
+        self.n_features = n_features
+        self.accept_threshold = accept_threshold
+        self.reject_threshold = reject_threshold
+        self.weights = weights if weights is not None else np.zeros((n_features, len(CATEGORIES)), dtype=np.float32)
+        self.bias = bias if bias is not None else np.zeros(len(CATEGORIES), dtype=np.float32)
+        
+        self.decided = 0
+        self.uncertain = 0
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def load(cls, path: str = PRECLASSIFIER_PATH, **kwargs: Any) -> 'LinkPreclassifier':
+        """
+        Load a trained pre-classifier
+        
+        Args:
+            path: Model file written by save()
+            **kwargs: Threshold overrides
+        
+        Returns:
+            LinkPreclassifier instance
+        """
+        with np.load(path) as data:
+            weights = data['weights']
+            return cls(n_features=weights.shape[0], weights=weights, bias=data['bias'], **kwargs)
+    
+    @classmethod
+    def load_default(cls) -> Optional['LinkPreclassifier']:
+        """Load the pre-classifier from PRECLASSIFIER_PATH, or return None if none was trained"""
+        if not os.path.exists(PRECLASSIFIER_PATH):
+            return None
+        try:
+            preclassifier = cls.load(PRECLASSIFIER_PATH)
+        except (OSError, KeyError, ValueError) as e:
+            logger.error(f"Error loading pre-classifier from {PRECLASSIFIER_PATH}: {str(e)}")
+            return None
+        logger.info(f"Loaded link pre-classifier from {PRECLASSIFIER_PATH}")
+        return preclassifier
+    
+    def save(self, path: str = PRECLASSIFIER_PATH) -> None:
+        """
+        Save the trained weights
+        
+        Args:
+            path: Model file (.npz)
+        """
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            np.savez_compressed(f, weights=self.weights, bias=self.bias)
+    
+    def vectorize(self, links: Sequence[Union[LinkRecord, Dict]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Hash link features into a sparse matrix in coordinate form
+        
+        Each feature is hashed to a column with a hash-derived sign, and rows
+        are scaled to unit length.
+        
+        Args:
+            links: Link records or dictionaries
+        
+        Returns:
+            Tuple of (row indices, column indices, values)
+        """
+        rows, columns, values = [], [], []
+        mask = self.n_features - 1 if self.n_features & (self.n_features - 1) == 0 else None
+        
+        for row, link in enumerate(links):
+            features = link_features(link.get('url', ''), link.get('page_title', ''),
+                                     link.get('is_document', False))
+            scale = 1.0 / np.sqrt(len(features))
+            for feature in features:
+                digest = zlib.crc32(feature.encode('utf-8'))
+                rows.append(row)
+                columns.append(digest & mask if mask is not None else digest % self.n_features)
+                values.append(scale if digest & 0x80000000 else -scale)
+        
+        return (np.asarray(rows, dtype=np.int64), np.asarray(columns, dtype=np.int64),
+                np.asarray(values, dtype=np.float32))
+    
+    def predict(self, links: Sequence[Union[LinkRecord, Dict]]) -> np.ndarray:
+        """
+        Predict relevance for a batch of links
+        
+        Args:
+            links: Link records or dictionaries
+        
+        Returns:
+            Array of shape (len(links), 3) with contact, financial and official relevance
+        """
+        if not links:
+            return np.zeros((0, len(CATEGORIES)), dtype=np.float32)
+        return self._forward(*self.vectorize(links), len(links), self.weights, self.bias)
+    
+    def triage(self, links: Sequence[LinkRecord]) -> Tuple[List[Tuple[LinkRecord, Dict]], List[LinkRecord]]:
+        """
+        Split links into confidently predicted ones and ones that need the LLM
+        
+        Args:
+            links: Link records
+        
+        Returns:
+            Tuple of ((link, relevance data) pairs decided locally, uncertain links)
+        """
+        if not links:
+            return [], []
+        
+        predictions = self.predict(links)
+        overall = predictions.max(axis=1)
+        confident = (overall >= self.accept_threshold) | (overall <= self.reject_threshold)
+        
+        decided, uncertain = [], []
+        for link, scores, relevance, is_confident in zip(links, predictions.tolist(), overall.tolist(), confident):
+            if not is_confident:
+                uncertain.append(link)
+                continue
+            high = relevance >= self.accept_threshold
+            decided.append((link, {
+                **dict(zip(SCORE_FIELDS, scores)),
+                "overall_relevance": relevance,
+                "primary_category": CATEGORIES[int(np.argmax(scores))] if high else "other",
+                "rationale": f"Pre-classifier: confident {'high' if high else 'low'} relevance"
+            }))
+        
+        with self._lock:
+            self.decided += len(decided)
+            self.uncertain += len(uncertain)
+        
+        return decided, uncertain
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get triage statistics
+        
+        Returns:
+            Dictionary with decided/uncertain counts and the fraction of LLM scoring saved
+        """
+        total = self.decided + self.uncertain
+        return {
+            'decided': self.decided,
+            'uncertain': self.uncertain,
+            'llm_calls_saved': self.decided / total if total else 0.0
+        }
+    
+    def fit(self, links: Sequence[Union[LinkRecord, Dict]], targets: np.ndarray, epochs: int = 200,
+            learning_rate: float = 0.05, l2: float = 1e-6, validation_split: float = 0.1,
+            seed: int = 0) -> Dict[str, Any]:
+        """
+        Train on links already scored by the LLM
+        
+        Full-batch Adam on the cross-entropy between predictions and the
+        LLM's scores, with a held-out split to measure how often confident
+        local decisions agree with the LLM.
+        
+        Args:
+            links: Link records or dictionaries
+            targets: LLM scores of shape (len(links), 3), in [0, 1]
+            epochs: Training passes over the data
+            learning_rate: Adam step size
+            l2: L2 regularization strength
+            validation_split: Fraction of links held out for evaluation
+            seed: Random seed for the split
+        
+        Returns:
+            Training report with sample counts, validation loss, coverage
+            (fraction of held-out links decided locally) and agreement
+            (fraction of those decisions on the same side of 0.5 as the LLM)
+        """
+        started = time.monotonic()
+        targets = np.clip(np.asarray(targets, dtype=np.float32), 0.0, 1.0)
+        
+        order = np.random.default_rng(seed).permutation(len(links))
+        n_validation = int(len(links) * validation_split)
+        validation, train = order[:n_validation], order[n_validation:]
+        
+        train_links = [links[i] for i in train]
+        train_targets = targets[train]
+        rows, columns, values = self.vectorize(train_links)
+        n = len(train_links)
+        
+        weights = np.zeros((self.n_features, len(CATEGORIES)), dtype=np.float32)
+        bias = np.zeros(len(CATEGORIES), dtype=np.float32)
+        moments = [np.zeros_like(weights), np.zeros_like(weights), np.zeros_like(bias), np.zeros_like(bias)]
+        beta1, beta2, eps = 0.9, 0.999, 1e-8
+        
+        for step in range(1, epochs + 1):
+            error = (self._forward(rows, columns, values, n, weights, bias) - train_targets) / n
+            grad_weights = np.stack([
+                np.bincount(columns, weights=values * error[rows, k], minlength=self.n_features)
+                for k in range(len(CATEGORIES))
+            ], axis=1).astype(np.float32) + l2 * weights
+            grad_bias = error.sum(axis=0)
+            
+            for param, grad, m, v in ((weights, grad_weights, moments[0], moments[1]),
+                                      (bias, grad_bias, moments[2], moments[3])):
+                m *= beta1
+                m += (1 - beta1) * grad
+                v *= beta2
+                v += (1 - beta2) * grad * grad
+                param -= learning_rate * (m / (1 - beta1 ** step)) / (np.sqrt(v / (1 - beta2 ** step)) + eps)
+        
+        self.weights, self.bias = weights, bias
+        
+        report = {
+            'train_links': n,
+            'validation_links': n_validation,
+            'seconds': round(time.monotonic() - started, 1)
+        }
+        if n_validation:
+            report.update(self._evaluate([links[i] for i in validation], targets[validation]))
+        return report
+    
+    def _evaluate(self, links: List[Union[LinkRecord, Dict]], targets: np.ndarray) -> Dict[str, float]:
+        """Measure loss, coverage and agreement with the LLM on held-out links"""
+        predictions = self.predict(links)
+        clipped = np.clip(predictions, 1e-6, 1 - 1e-6)
+        loss = -np.mean(targets * np.log(clipped) + (1 - targets) * np.log(1 - clipped))
+        
+        overall = predictions.max(axis=1)
+        confident = (overall >= self.accept_threshold) | (overall <= self.reject_threshold)
+        agree = (overall >= 0.5) == (targets.max(axis=1) >= 0.5)
+        
+        return {
+            'validation_loss': round(float(loss), 4),
+            'coverage': round(float(confident.mean()), 4),
+            'agreement': round(float(agree[confident].mean()), 4) if confident.any() else 0.0
+        }
+    
+    def _forward(self, rows: np.ndarray, columns: np.ndarray, values: np.ndarray, n: int,
+                 weights: np.ndarray, bias: np.ndarray) -> np.ndarray:
+        """Compute predicted probabilities for a hashed sparse batch"""
+        logits = np.stack([
+            np.bincount(rows, weights=values * weights[columns, k], minlength=n)
+            for k in range(len(CATEGORIES))
+        ], axis=1) + bias
+        return 1.0 / (1.0 + np.exp(-logits))
@@ -0,0 +1,205 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from src.config import RELEVANCE_CACHE_PATH, RELEVANCE_CACHE_TTL, RELEVANCE_CACHE_MAX_ENTRIES
+
+logger = logging.getLogger(__name__)
+
+# SQLite limits the number of bound parameters per statement
+_QUERY_CHUNK = 500
+
+
+class RelevanceCache:
+    """SQLite cache of link relevance scores with TTL and LRU eviction"""
+    
+    def __init__(self, path: str = RELEVANCE_CACHE_PATH, ttl: float = RELEVANCE_CACHE_TTL,
+                 max_entries: int = RELEVANCE_CACHE_MAX_ENTRIES):
+        """
+        Open or create the cache database
+        
+        Args:
+            path: SQLite database file
+            ttl: Seconds an entry stays valid
+            max_entries: Number of entries above which the least recently used are evicted
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS relevance_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_relevance_cache_accessed ON relevance_cache (accessed_at)")
+        self._conn.commit()
+        self._entries = self._conn.execute("SELECT COUNT(*) FROM relevance_cache").fetchone()[0]
+    
+    def make_key(self, model: str, prompt_hash: str, url: str, page_title: str, is_document: bool) -> str:
+        """
+        Build a cache key for a link scored by a given model and prompt
+        
+        Changing the model or the prompt changes every key, so stale scores
+        are never returned and age out through eviction.
+        
+        Args:
+            model: Chat model name
+            prompt_hash: Hash of the prompt templates
+            url: Normalized link URL
+            page_title: Title of the page the link was found on
+            is_document: Whether the link points to a document
+        
+        Returns:
+            Hex digest identifying the scoring request
+        """
+        request = json.dumps([model, prompt_hash, url, page_title or '', bool(is_document)])
+        return hashlib.sha256(request.encode('utf-8')).hexdigest()
+    
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Dict]:
+        """
+        Get cached relevance data for many keys
+        
+        Args:
+            keys: Cache keys
+        
+        Returns:
+            Dictionary mapping each key found (and not expired) to its relevance data
+        """
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        
+        now = time.time()
+        found = {}
+        with self._lock:
+            try:
+                for i in range(0, len(keys), _QUERY_CHUNK):
+                    chunk = keys[i:i+_QUERY_CHUNK]
+                    rows = self._conn.execute(
+                        f"SELECT key, value FROM relevance_cache WHERE created_at >= ? "
+                        f"AND key IN ({','.join('?' * len(chunk))})",
+                        [now - self.ttl, *chunk]
+                    ).fetchall()
+                    found.update((key, json.loads(value)) for key, value in rows)
+                    
+                # Touch hits so eviction treats them as recently used
+                if found:
+                    self._conn.executemany("UPDATE relevance_cache SET accessed_at = ? WHERE key = ?",
+                                           [(now, key) for key in found])
+                    self._conn.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Error reading relevance cache: {str(e)}")
+                
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        
+        return found
+    
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Get cached relevance data
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            Relevance data, or None if missing or expired
+        """
+        return self.get_many([key]).get(key)
+    
+    def set_many(self, items: Iterable[Tuple[str, Dict]]) -> None:
+        """
+        Store relevance data for many keys
+        
+        Args:
+            items: (key, relevance data) pairs
+        """
+        now = time.time()
+        rows = [(key, json.dumps(value), now, now) for key, value in items]
+        if not rows:
+            return
+        
+        with self._lock:
+            try:
+                added = 0
+                for i in range(0, len(rows), _QUERY_CHUNK):
+                    chunk = rows[i:i+_QUERY_CHUNK]
+                    keys = [row[0] for row in chunk]
+                    existing = self._conn.execute(
+                        f"SELECT COUNT(*) FROM relevance_cache WHERE key IN ({','.join('?' * len(keys))})", keys
+                    ).fetchone()[0]
+                    self._conn.executemany("INSERT OR REPLACE INTO relevance_cache VALUES (?, ?, ?, ?)", chunk)
+                    added += len(set(keys)) - existing
+                self._conn.commit()
+                self._entries += added
+                
+                if self._entries > self.max_entries:
+                    self._evict()
+            except sqlite3.Error as e:
+                logger.error(f"Error writing relevance cache: {str(e)}")
+                self._conn.rollback()
+    
+    def set(self, key: str, value: Dict) -> None:
+        """
+        Store relevance data
+        
+        Args:
+            key: Cache key
+            value: JSON-serializable relevance data
+        """
+        self.set_many([(key, value)])
+    
+    def clear(self) -> None:
+        """Remove all cache entries"""
+        with self._lock:
+            self._conn.execute("DELETE FROM relevance_cache")
+            self._conn.commit()
+            self._entries = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+        
+        Returns:
+            Dictionary with hit/miss counts, hit rate and number of entries
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': self._entries
+        }
+    
+    def close(self) -> None:
+        """Close the cache database"""
+        with self._lock:
+            self._conn.close()
+    
+    def _evict(self) -> None:
+        """Remove expired entries, then the least recently used until 90% of max_entries remain"""
+        self._conn.execute("DELETE FROM relevance_cache WHERE created_at < ?", (time.time() - self.ttl,))
+        count = self._conn.execute("SELECT COUNT(*) FROM relevance_cache").fetchone()[0]
+        
+        excess = count - int(self.max_entries * 0.9)
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM relevance_cache WHERE key IN "
+                "(SELECT key FROM relevance_cache ORDER BY accessed_at LIMIT ?)", (excess,)
+            )
+            logger.info(f"Evicted {excess} relevance cache entries")
+        
+        self._conn.commit()
+        self._entries = self._conn.execute("SELECT COUNT(*) FROM relevance_cache").fetchone()[0]
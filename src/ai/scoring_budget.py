@@ -0,0 +1,196 @@
+import heapq
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.config import SCORING_MAX_CALLS, SCORING_MAX_TOKENS, SCORING_MAX_SECONDS
+from src.crawler.link_record import LinkRecord, BUDGET_EXHAUSTED_RATIONALE
+
+
+class BudgetExhaustedError(Exception):
+    """Raised when a request is about to be made after the scoring budget ran out"""
+
+
+class ScoringBudget:
+    """
+    Cap on the LLM calls, tokens and wall time one crawl may spend on scoring
+    
+    The budget is shared by every scoring call of the crawl and its clock
+    starts with the first of them. Calls are charged as they complete, so
+    requests already in flight when the budget runs out may overshoot it
+    slightly.
+    """
+    
+    def __init__(self, max_calls: int = SCORING_MAX_CALLS, max_tokens: int = SCORING_MAX_TOKENS,
+                 max_seconds: float = SCORING_MAX_SECONDS):
+        """
+        Initialize budget
+        
+        Args:
+            max_calls: Maximum number of chat completions (0 for no limit)
+            max_tokens: Maximum number of prompt plus completion tokens (0 for no limit)
+            max_seconds: Maximum seconds after scoring starts (0 for no limit)
+        """
+        self.max_calls = max_calls
+        self.max_tokens = max_tokens
+        self.max_seconds = max_seconds
+        
+        self.calls = 0
+        self.tokens = 0
+        self.started: Optional[float] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def limited(self) -> bool:
+        """Whether any limit is set"""
+        return bool(self.max_calls or self.max_tokens or self.max_seconds)
+    
+    def fresh(self) -> 'ScoringBudget':
+        """Create an unused budget with the same limits, e.g. for the next crawl"""
+        return ScoringBudget(self.max_calls, self.max_tokens, self.max_seconds)
+    
+    def start(self) -> None:
+        """Start the wall-time clock, if not started yet"""
+        with self._lock:
+            if self.started is None:
+                self.started = time.monotonic()
+    
+    def charge(self, calls: int = 1, tokens: int = 0) -> None:
+        """
+        Charge completed calls to the budget
+        
+        Args:
+            calls: Number of chat completions made
+            tokens: Prompt plus completion tokens they used
+        """
+        with self._lock:
+            self.calls += calls
+            self.tokens += tokens
+    
+    def exhausted(self) -> bool:
+        """Check whether any limit has been reached"""
+        if self.max_calls and self.calls >= self.max_calls:
+            return True
+        if self.max_tokens and self.tokens >= self.max_tokens:
+            return True
+        return bool(self.max_seconds and self.started is not None
+                    and time.monotonic() - self.started >= self.max_seconds)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get budget usage
+        
+        Returns:
+            Dictionary with calls and tokens spent, seconds elapsed and whether the budget ran out
+        """
+        return {
+            'calls': self.calls,
+            'tokens': self.tokens,
+            'seconds': round(time.monotonic() - self.started, 1) if self.started is not None else 0.0,
+            'exhausted': self.exhausted()
+        }
+
+
+# Budget charged by the scoring calls made in the current context
+_active_budget: ContextVar[Optional[ScoringBudget]] = ContextVar('active_budget', default=None)
+
+
+@contextmanager
+def budget_context(budget: Optional[ScoringBudget]) -> Iterator[None]:
+    """
+    Charge the OpenAI calls made inside the block to a budget
+    
+    Args:
+        budget: Scoring budget, or None for no limit
+    """
+    if budget is not None:
+        budget.start()
+    token = _active_budget.set(budget)
+    try:
+        yield
+    finally:
+        _active_budget.reset(token)
+
+
+def active_budget() -> Optional[ScoringBudget]:
+    """Get the budget charged by calls in the current context, if any"""
+    return _active_budget.get()
+
+
+def create_scoring_budget(max_calls: int = SCORING_MAX_CALLS, max_tokens: int = SCORING_MAX_TOKENS,
+                          max_seconds: float = SCORING_MAX_SECONDS) -> Optional[ScoringBudget]:
+    """
+    Create a scoring budget, or None if no limit is set
+    
+    Args:
+        max_calls: Maximum number of chat completions (0 for no limit)
+        max_tokens: Maximum number of prompt plus completion tokens (0 for no limit)
+        max_seconds: Maximum seconds after scoring starts (0 for no limit)
+    
+    Returns:
+        ScoringBudget instance or None
+    """
+    budget = ScoringBudget(max_calls, max_tokens, max_seconds)
+    return budget if budget.limited else None
+
+
+def prioritize(links: List[LinkRecord]) -> List[LinkRecord]:
+    """
+    Order links by initial value, most promising first
+    
+    Uses a heap keyed on the heuristic score; links with equal scores keep
+    their crawl order.
+    
+    Args:
+        links: Link records
+    
+    Returns:
+        Link records in scoring order
+    """
+    heap = [(-link.initial_value, index, link) for index, link in enumerate(links)]
+    heapq.heapify(heap)
+    return [heapq.heappop(heap)[2] for _ in range(len(heap))]
+
+
+class ScoringQueue:
+    """
+    Links of a budgeted crawl waiting to be scored, most promising first
+    
+    A budgeted crawl queues the links of every page here and scores them
+    once the crawl is done, so the budget goes to the crawl's highest
+    initial values rather than to whichever pages arrived first.
+    """
+    
+    def __init__(self):
+        """Initialize an empty queue"""
+        self._heap: List[tuple] = []
+        self._pushed = 0
+    
+    def __len__(self) -> int:
+        """Number of queued links"""
+        return len(self._heap)
+    
+    def push(self, links: List[LinkRecord]) -> None:
+        """
+        Queue links for scoring
+        
+        Args:
+            links: Link records; links with equal scores keep their crawl order
+        """
+        for link in links:
+            heapq.heappush(self._heap, (-link.initial_value, self._pushed, link))
+            self._pushed += 1
+    
+    def pop(self, count: int) -> List[LinkRecord]:
+        """
+        Take the most promising queued links
+        
+        Args:
+            count: Maximum number of links to take
+        
+        Returns:
+            Link records, highest initial value first
+        """
+        return [heapq.heappop(self._heap)[2] for _ in range(min(count, len(self._heap)))]
@@ -3,7 +3,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from typing import List, Optional, Dict, Any
 import logging
 
-from src.api.models import LinkResponse, CrawlRequest, CrawlResponse, LinkFilter
+from src.api.models import LinkResponse, CrawlRequest, CrawlResponse, LinkFilter, LLMMetricsResponse
 from src.storage.repository import LinkRepository
 from src.storage.models import init_db
 
@@ -103,65 +103,40 @@ async def crawl_website(
     - **url**: URL to start crawling from
     - **limit**: Maximum number of pages to crawl
     """
-    from src.crawler.firecrawl_service import FirecrawlService
+    from src.crawler.crawler_factory import create_crawler
     from src.crawler.link_processor import LinkProcessor
-    from src.ai.openai_service import OpenAIService
+    from src.ai.async_openai_service import AsyncOpenAIService
+    from src.crawler.pipeline import CrawlPipeline
+    from src.ai.scoring_budget import create_scoring_budget
+    from src.storage.write_queue import get_writer
     
     try:
         # Initialize services
-        crawler = FirecrawlService()
+        crawler = create_crawler()
         processor = LinkProcessor()
-        ai_service = OpenAIService()
+        ai_service = AsyncOpenAIService()
         
-        # Get or create website record
-        website = repo.get_or_create_website(request.url)
+        # Crawl, score and store links page by page without blocking the event loop
+        pipeline = CrawlPipeline(crawler, processor, ai_service, repo, budget=create_scoring_budget(),
+                                 writer=get_writer())
+        summary = await pipeline.arun(str(request.url), limit=request.limit)
         
-        # Crawl website
-        pages = crawler.crawl_website(request.url, limit=request.limit)
-        
-        if not pages:
+        if not summary['pages_crawled']:
             logger.warning(f"No pages crawled for URL: {request.url}")
             return CrawlResponse(
                 success=False,
                 message="No pages crawled",
-                website_id=website.id,
-                links_found=0
+                website_id=summary['website_id'],
+                links_found=0,
+                crawl_id=summary['crawl_id']
             )
         
-        # Process links from crawled pages
-        all_links = []
-        for page in pages:
-            # Each page has markdown, html, and metadata
-            # Extract links from the HTML content or use the metadata
-            links = []
-            
-            # Firecrawl may already extract links for us
-            if 'links' in page:
-                links = [{'url': link, 'source_url': page.get('metadata', {}).get('sourceURL', ''), 
-                          'page_title': page.get('metadata', {}).get('title', '')} 
-                         for link in page.get('links', []) if link]
-            else:
-                # Extract links from page metadata
-                extracted_links = [{'url': page.get('metadata', {}).get('sourceURL', ''),
-                                  'source_url': request.url,
-                                  'page_title': page.get('metadata', {}).get('title', '')}]
-                links.extend(extracted_links)
-            
-            # Process links
-            processed_links = processor.process_links(links, request.url)
-            all_links.extend(processed_links)
-        
-        # Analyze links with OpenAI
-        enriched_links = ai_service.batch_analyze_links(all_links)
-        
-        # Store links in database
-        stored_links = repo.add_links(enriched_links, website)
-        
         return CrawlResponse(
             success=True,
-            message=f"Successfully crawled {len(pages)} pages and found {len(stored_links)} links",
-            website_id=website.id,
-            links_found=len(stored_links)
+            message=f"Successfully crawled {summary['pages_crawled']} pages and found {summary['links_stored']} links",
+            website_id=summary['website_id'],
+            links_found=summary['links_stored'],
+            crawl_id=summary['crawl_id']
         )
     except Exception as e:
         logger.error(f"Error crawling website {request.url}: {str(e)}")
@@ -230,6 +205,29 @@ async def get_stats(
         raise HTTPException(status_code=500, detail="Error retrieving stats")
 
 
+@app.get("/metrics/llm", response_model=List[LLMMetricsResponse], tags=["Statistics"])
+async def get_llm_metrics(
+    group_by: str = Query("crawl", pattern="^(crawl|website|model)$"),
+    crawl_id: Optional[str] = None,
+    website_id: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    repo: LinkRepository = Depends(get_repository)
+):
+    """
+    Get OpenAI token usage, cost, latency and failure counts
+    
+    - **group_by**: Aggregate per crawl, website or model
+    - **crawl_id**: Only include calls made by this crawl
+    - **website_id**: Only include calls made for this website
+    - **limit**: Maximum number of groups to return
+    """
+    try:
+        return repo.get_llm_metrics(group_by=group_by, crawl_id=crawl_id, website_id=website_id, limit=limit)
+    except Exception as e:
+        logger.error(f"Error retrieving LLM metrics: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error retrieving LLM metrics")
+
+
 @app.get("/health", tags=["Health"])
 async def health_check():
     """
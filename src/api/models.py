@@ -42,4 +42,26 @@ class CrawlResponse(BaseModel):
     success: bool
     message: str
     website_id: int
-    links_found: int
\ No newline at end of file
+    links_found: int
+    crawl_id: Optional[str] = None
+
+
+class LLMMetricsResponse(BaseModel):
+    """Model for aggregated OpenAI call metrics"""
+    crawl_id: Optional[str] = None
+    website_id: Optional[int] = None
+    model: Optional[str] = None
+    calls: int
+    links: int
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+    tokens_per_link: float
+    cost: float
+    avg_latency_ms: float
+    max_latency_ms: float
+    retries: int
+    parse_failures: int
+    errors: int
+    first_call: datetime
+    last_call: datetime
\ No newline at end of file
@@ -6,11 +6,72 @@ load_dotenv()
 
 # API Keys
 FIRECRAWL_API_KEY = os.getenv("FIRECRAWL_API_KEY")
+FIRECRAWL_API_URL = os.getenv("FIRECRAWL_API_URL", "https://api.firecrawl.dev")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")  # OpenAI-compatible endpoint (defaults to the OpenAI API)
+OPENAI_BATCH_SIZE = int(os.getenv("OPENAI_BATCH_SIZE", "10"))  # Links scored per chat completion
+OPENAI_CONCURRENCY = int(os.getenv("OPENAI_CONCURRENCY", "8"))  # Chat completions in flight at the same time
+OPENAI_REQUESTS_PER_MINUTE = float(os.getenv("OPENAI_REQUESTS_PER_MINUTE", "500"))  # Account request limit
+OPENAI_TOKENS_PER_MINUTE = float(os.getenv("OPENAI_TOKENS_PER_MINUTE", "200000"))  # Account token limit
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "5"))  # Retries on rate limits, server and connection errors
+OPENAI_RETRY_BASE_DELAY = float(os.getenv("OPENAI_RETRY_BASE_DELAY", "1"))  # First retry delay (seconds)
+OPENAI_RETRY_MAX_DELAY = float(os.getenv("OPENAI_RETRY_MAX_DELAY", "60"))  # Longest retry delay (seconds)
+
+# OpenAI call telemetry
+LLM_METRICS_ENABLED = os.getenv("LLM_METRICS_ENABLED", "true").lower() == "true"  # Record every chat completion
+OPENAI_INPUT_COST_PER_MILLION = float(os.getenv("OPENAI_INPUT_COST_PER_MILLION", "0.5"))  # USD per million prompt tokens
+OPENAI_OUTPUT_COST_PER_MILLION = float(os.getenv("OPENAI_OUTPUT_COST_PER_MILLION", "1.5"))  # USD per million completion tokens
+
+# Per-crawl scoring budget (0 for no limit); links left over keep their heuristic score
+SCORING_MAX_CALLS = int(os.getenv("SCORING_MAX_CALLS", "0"))  # Chat completions per crawl
+SCORING_MAX_TOKENS = int(os.getenv("SCORING_MAX_TOKENS", "0"))  # Prompt plus completion tokens per crawl
+SCORING_MAX_SECONDS = float(os.getenv("SCORING_MAX_SECONDS", "0"))  # Seconds after a crawl starts scoring
+SCORING_QUEUE_MAX_LINKS = int(os.getenv("SCORING_QUEUE_MAX_LINKS", "1000"))  # Links a budgeted crawl holds before scoring the best
+SCORING_FLUSH_SECONDS = float(os.getenv("SCORING_FLUSH_SECONDS", "30"))  # Longest a budgeted crawl goes without storing links
+
+# Offline bulk rescoring through the OpenAI Batch API
+BULK_SCORING_DIR = os.getenv("BULK_SCORING_DIR", ".cache/bulk")  # Request files and checkpoint
+BULK_MAX_REQUESTS_PER_JOB = int(os.getenv("BULK_MAX_REQUESTS_PER_JOB", "20000"))  # Requests per batch job (API limit 50000)
+BULK_POLL_INTERVAL = float(os.getenv("BULK_POLL_INTERVAL", "60"))  # Seconds between batch status checks
+BULK_COMMIT_LINES = int(os.getenv("BULK_COMMIT_LINES", "500"))  # Result lines applied per checkpoint
+BULK_COST_FACTOR = float(os.getenv("BULK_COST_FACTOR", "0.5"))  # Batch API price relative to regular requests
+
+# Local pre-classifier deciding confident links without the LLM
+PRECLASSIFIER_ENABLED = os.getenv("PRECLASSIFIER_ENABLED", "true").lower() == "true"  # Used once trained
+PRECLASSIFIER_PATH = os.getenv("PRECLASSIFIER_PATH", ".cache/preclassifier.npz")
+PRECLASSIFIER_FEATURES = int(os.getenv("PRECLASSIFIER_FEATURES", str(2 ** 18)))  # Hashed feature space size
+PRECLASSIFIER_ACCEPT_THRESHOLD = float(os.getenv("PRECLASSIFIER_ACCEPT_THRESHOLD", "0.9"))  # Predicted relevance accepted as is
+PRECLASSIFIER_REJECT_THRESHOLD = float(os.getenv("PRECLASSIFIER_REJECT_THRESHOLD", "0.1"))  # Predicted relevance rejected as is
+
+# URL-template clustering (scores a few representatives per family of look-alike links)
+LINK_CLUSTERING_ENABLED = os.getenv("LINK_CLUSTERING_ENABLED", "true").lower() == "true"
+LINK_CLUSTER_MIN_SIZE = int(os.getenv("LINK_CLUSTER_MIN_SIZE", "4"))  # Links sharing a template before only representatives are scored
+LINK_CLUSTER_REPRESENTATIVES = int(os.getenv("LINK_CLUSTER_REPRESENTATIVES", "2"))  # Links scored per cluster
+LINK_CLUSTER_MAX_SPREAD = float(os.getenv("LINK_CLUSTER_MAX_SPREAD", "0.2"))  # Largest disagreement between representatives that still propagates
+LINK_CLUSTER_CACHE_SIZE = int(os.getenv("LINK_CLUSTER_CACHE_SIZE", "10000"))  # Resolved templates remembered across calls
+
+# Link relevance cache (avoids rescoring links on recrawls)
+RELEVANCE_CACHE_ENABLED = os.getenv("RELEVANCE_CACHE_ENABLED", "true").lower() == "true"
+RELEVANCE_CACHE_PATH = os.getenv("RELEVANCE_CACHE_PATH", ".cache/relevance.db")
+RELEVANCE_CACHE_TTL = float(os.getenv("RELEVANCE_CACHE_TTL", str(30 * 86400)))  # Seconds a cached score stays valid
+RELEVANCE_CACHE_MAX_ENTRIES = int(os.getenv("RELEVANCE_CACHE_MAX_ENTRIES", "1000000"))  # Scores kept before LRU eviction
 
 # Database configuration
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./links.db")
+DB_UPSERT_CHUNK_SIZE = int(os.getenv("DB_UPSERT_CHUNK_SIZE", "500"))  # Links written per transaction by bulk upserts
+DB_WRITE_QUEUE_SIZE = int(os.getenv("DB_WRITE_QUEUE_SIZE", "100"))  # Writes waiting for the writer thread before submitters block
+
+# SQLite tuning, applied to every connection
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")  # WAL lets readers run alongside the writer
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")  # NORMAL is durable across crashes of the process in WAL mode
+SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))  # Milliseconds to wait for a lock before failing
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))  # Page cache per connection (negative: KiB)
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 ** 2)))  # Bytes of the database file memory-mapped
+
+SEARCH_CANDIDATES = int(os.getenv("SEARCH_CANDIDATES", "200"))  # Best text matches re-ranked by link relevance
+SEARCH_MAX_RANKED = int(os.getenv("SEARCH_MAX_RANKED", "20000"))  # Matches scored by bm25; broader queries are ranked by relevance alone
+SEARCH_RELEVANCE_WEIGHT = float(os.getenv("SEARCH_RELEVANCE_WEIGHT", "1.0"))  # Boost of a fully relevant link over its text score
 
 # API configuration
 API_HOST = os.getenv("API_HOST", "0.0.0.0")
@@ -18,8 +79,86 @@ API_PORT = int(os.getenv("API_PORT", "8000"))
 
 # Crawler configuration
 CRAWL_LIMIT = int(os.getenv("CRAWL_LIMIT", "10"))  # Default limit of pages to crawl
+CRAWLER_BACKEND = os.getenv("CRAWLER_BACKEND", "firecrawl")  # "firecrawl" or "http"
 FORMATS = ["markdown", "html"]
 
+# FireCrawl response cache
+FIRECRAWL_CACHE_ENABLED = os.getenv("FIRECRAWL_CACHE_ENABLED", "true").lower() == "true"
+FIRECRAWL_CACHE_DIR = os.getenv("FIRECRAWL_CACHE_DIR", ".cache/firecrawl")
+FIRECRAWL_CACHE_TTL = float(os.getenv("FIRECRAWL_CACHE_TTL", "21600"))  # Seconds a cached response stays valid
+FIRECRAWL_CACHE_MAX_BYTES = int(os.getenv("FIRECRAWL_CACHE_MAX_BYTES", str(1024 ** 3)))  # Compressed size limit
+
+# Crawl status polling
+CRAWL_POLL_INITIAL_INTERVAL = float(os.getenv("CRAWL_POLL_INITIAL_INTERVAL", "2"))  # First wait between status checks (seconds)
+CRAWL_POLL_MAX_INTERVAL = float(os.getenv("CRAWL_POLL_MAX_INTERVAL", "30"))  # Upper bound on the wait between checks
+CRAWL_POLL_BACKOFF = float(os.getenv("CRAWL_POLL_BACKOFF", "1.5"))  # Multiplier applied to the wait after each check
+CRAWL_POLL_JITTER = float(os.getenv("CRAWL_POLL_JITTER", "0.2"))  # +/- fraction of random jitter added to each wait
+CRAWL_TIMEOUT_PER_PAGE = float(os.getenv("CRAWL_TIMEOUT_PER_PAGE", "6"))  # Deadline budget per requested page (seconds)
+CRAWL_MIN_TIMEOUT = float(os.getenv("CRAWL_MIN_TIMEOUT", "120"))  # Minimum deadline for any crawl (seconds)
+
+# URL canonicalization
+URL_CACHE_SIZE = int(os.getenv("URL_CACHE_SIZE", "100000"))  # Memoized URL normalizations
+TRACKING_PARAMS = [  # Query parameters dropped from links ("*" matches a prefix)
+    "utm_*",
+    "gclid",
+    "dclid",
+    "fbclid",
+    "msclkid",
+    "yclid",
+    "mc_cid",
+    "mc_eid",
+    "_ga",
+    "_gl",
+    "_hsenc",
+    "_hsmi",
+    "mkt_tok",
+    "jsessionid",
+    "phpsessid",
+    "sessionid"
+]
+
+# Link processing
+LINK_CHUNK_SIZE = int(os.getenv("LINK_CHUNK_SIZE", "500"))  # Links processed and yielded per chunk
+LINK_WORKERS = int(os.getenv("LINK_WORKERS", "1"))  # Processes normalizing and scoring links; 1 disables the pool
+
+# Seen-URL set used to skip links processed before
+SEEN_SET_BACKEND = os.getenv("SEEN_SET_BACKEND", "memory")  # "memory", "bloom" or "database"
+SEEN_SET_CAPACITY = int(os.getenv("SEEN_SET_CAPACITY", "10000000"))  # Expected URLs for the Bloom filter
+SEEN_SET_ERROR_RATE = float(os.getenv("SEEN_SET_ERROR_RATE", "0.001"))  # Bloom filter false positive rate
+SEEN_SET_PATH = os.getenv("SEEN_SET_PATH", "")  # Memory-mapped Bloom filter file; empty keeps it in memory
+
+# Built-in HTTP crawler
+HTTP_CRAWLER_CONCURRENCY = int(os.getenv("HTTP_CRAWLER_CONCURRENCY", "10"))  # Pages fetched at the same time
+HTTP_CRAWLER_PER_HOST_CONCURRENCY = int(os.getenv("HTTP_CRAWLER_PER_HOST_CONCURRENCY", "2"))  # Requests in flight per host
+HTTP_CRAWLER_TIMEOUT = float(os.getenv("HTTP_CRAWLER_TIMEOUT", "15"))  # Request timeout (seconds)
+HTTP_CRAWLER_USER_AGENT = os.getenv("HTTP_CRAWLER_USER_AGENT", "HighValueLinkScraper/1.0")
+HTTP_CRAWLER_RESPECT_ROBOTS = os.getenv("HTTP_CRAWLER_RESPECT_ROBOTS", "true").lower() == "true"
+
+# Document probing (HEAD requests to find documents behind extension-less URLs)
+DOCUMENT_PROBE_ENABLED = os.getenv("DOCUMENT_PROBE_ENABLED", "false").lower() == "true"
+DOCUMENT_PROBE_CONCURRENCY = int(os.getenv("DOCUMENT_PROBE_CONCURRENCY", "20"))  # Probes in flight at the same time
+DOCUMENT_PROBE_PER_HOST_CONCURRENCY = int(os.getenv("DOCUMENT_PROBE_PER_HOST_CONCURRENCY", "2"))  # Probes in flight per host
+DOCUMENT_PROBE_TIMEOUT = float(os.getenv("DOCUMENT_PROBE_TIMEOUT", "10"))  # Probe request timeout (seconds)
+DOCUMENT_PROBE_CACHE_TTL = int(os.getenv("DOCUMENT_PROBE_CACHE_TTL", "86400"))  # Seconds a probe result stays valid
+DOCUMENT_PROBE_CACHE_SIZE = int(os.getenv("DOCUMENT_PROBE_CACHE_SIZE", "100000"))  # Probe results kept in memory
+DOCUMENT_URL_HINTS = [  # URL fragments that suggest a download endpoint worth probing
+    "download",
+    "documentcenter",
+    "document",
+    "attachment",
+    "getfile",
+    "showdocument",
+    "viewfile",
+    "file",
+    "blob",
+    "/view/"
+]
+
+# Batch crawling
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "10"))  # Sites crawled at the same time
+BATCH_DOMAIN_DELAY = float(os.getenv("BATCH_DOMAIN_DELAY", "5"))  # Seconds between crawls of the same domain
+FIRECRAWL_REQUESTS_PER_MINUTE = float(os.getenv("FIRECRAWL_REQUESTS_PER_MINUTE", "100"))  # Firecrawl API call budget
+
 # Link prioritization
 HIGH_VALUE_KEYWORDS = [
     "acfr",
@@ -0,0 +1,81 @@
+import logging
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Dict, Iterator, List
+
+from src.config import CRAWL_LIMIT
+
+logger = logging.getLogger(__name__)
+
+class BaseCrawler(ABC):
+    """
+    Interface shared by crawler backends
+    
+    Every backend yields page dictionaries shaped like FireCrawl results:
+    a ``links`` list of absolute URLs, a ``metadata`` dictionary with at least
+    ``sourceURL`` and ``title``, and the page content under ``markdown``/``html``.
+    """
+    
+    # Response cache, if the backend has one
+    cache = None
+    
+    @abstractmethod
+    def scrape_url(self, url: str) -> Dict:
+        """Scrape a single URL and return its page dictionary"""
+        
+    @abstractmethod
+    def iter_crawl_pages(self, url: str, limit: int = CRAWL_LIMIT) -> Iterator[Dict]:
+        """Crawl a website and yield pages as they become available"""
+        
+    @abstractmethod
+    def aiter_crawl_pages(self, url: str, limit: int = CRAWL_LIMIT) -> AsyncIterator[Dict]:
+        """Async variant of iter_crawl_pages"""
+        
+    def crawl_website(self, url: str, limit: int = CRAWL_LIMIT) -> List[Dict]:
+        """
+        Crawl a website starting from the given URL
+        
+        Args:
+            url: The starting URL for crawling
+            limit: Maximum number of pages to crawl
+            
+        Returns:
+            List of dictionaries containing data for each crawled page
+        """
+        return list(self.iter_crawl_pages(url, limit=limit))
+        
+    def extract_links(self, page_data: Dict) -> List[Dict]:
+        """
+        Extract links from page data
+        
+        Args:
+            page_data: Dictionary containing scraped page data
+            
+        Returns:
+            List of dictionaries with link information
+        """
+        links = []
+        
+        # Extract raw links from the page
+        raw_links = page_data.get('links', [])
+        
+        # Get page metadata
+        metadata = page_data.get('metadata', {})
+        source_url = metadata.get('sourceURL', '')
+        
+        logger.debug(f"Found {len(raw_links)} raw links")
+
+        for link in raw_links:
+            # Skip empty links
+            if not link:
+                continue
+                
+            # Create link entry
+            link_info = {
+                'url': link,
+                'source_url': source_url,
+                'page_title': metadata.get('title', ''),
+            }
+            
+            links.append(link_info)
+            
+        return links
@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.config import CRAWL_LIMIT, BATCH_CONCURRENCY, BATCH_DOMAIN_DELAY, LINK_WORKERS
+from src.crawler.base_crawler import BaseCrawler
+from src.crawler.document_probe import DocumentProbe
+from src.crawler.parallel_processor import create_link_pool, create_link_processor
+from src.crawler.pipeline import CrawlPipeline
+from src.crawler.seen_set import SeenSet
+from src.crawler.url_normalizer import canonical_domain
+from src.ai.openai_service import OpenAIService
+from src.ai.scoring_budget import ScoringBudget
+from src.storage.repository import LinkRepository
+from src.storage.write_queue import DatabaseWriter, get_writer
+
+logger = logging.getLogger(__name__)
+
+class BatchCrawler:
+    """Run crawl pipelines for many websites concurrently"""
+    
+    def __init__(self, crawler: BaseCrawler, ai_service: OpenAIService,
+                 concurrency: int = BATCH_CONCURRENCY, domain_delay: float = BATCH_DOMAIN_DELAY,
+                 incremental: bool = True, seen_set: Optional[SeenSet] = None,
+                 workers: int = LINK_WORKERS, probe: Optional[DocumentProbe] = None,
+                 budget: Optional[ScoringBudget] = None, writer: Optional[DatabaseWriter] = None):
+        """
+        Initialize batch crawler
+        
+        Args:
+            crawler: Crawler shared by all sites (its rate limiter applies globally)
+            ai_service: OpenAI service shared by all sites
+            concurrency: Maximum number of sites crawled at the same time
+            domain_delay: Minimum seconds between crawls of the same domain
+            incremental: Skip pages that have not changed since the previous crawl
+            seen_set: Processed-URL set shared by all sites (each site gets its own if None)
+            workers: Link processing processes shared by all sites; 1 processes links in-process
+            probe: Document probe shared by all sites (its cache is shared too)
+            budget: Scoring budget applied to each site separately (None for no limit)
+            writer: Thread running the database writes of all sites (the process-wide writer if None)
+        """
+        self.crawler = crawler
+        self.ai_service = ai_service
+        self.concurrency = concurrency
+        self.domain_delay = domain_delay
+        self.incremental = incremental
+        self.seen_set = seen_set
+        self.workers = workers
+        self.probe = probe
+        self.budget = budget
+        self.writer = writer if writer is not None else get_writer()
+        self._link_pool = None
+        
+        self._domain_locks: Dict[str, asyncio.Lock] = {}
+        self._domain_last_finished: Dict[str, float] = {}
+        
+    def run(self, urls: Iterable[str], limit: int = CRAWL_LIMIT) -> List[Dict[str, Any]]:
+        """
+        Crawl all URLs and return a summary per site
+        
+        Args:
+            urls: URLs to crawl
+            limit: Maximum number of pages to crawl per site
+            
+        Returns:
+            List of per-site summary dictionaries, in input order
+        """
+        return asyncio.run(self.arun(urls, limit=limit))
+        
+    async def arun(self, urls: Iterable[str], limit: int = CRAWL_LIMIT) -> List[Dict[str, Any]]:
+        """
+        Crawl all URLs concurrently
+        
+        Each site runs as its own task, so a slow site only occupies one of the
+        ``concurrency`` slots and never delays the others.
+        
+        Args:
+            urls: URLs to crawl
+            limit: Maximum number of pages to crawl per site
+            
+        Returns:
+            List of per-site summary dictionaries, in input order
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        self._link_pool = create_link_pool(self.workers)
+        try:
+            tasks = [asyncio.create_task(self._crawl_site(url, limit, semaphore)) for url in urls]
+            return list(await asyncio.gather(*tasks))
+        finally:
+            if self._link_pool is not None:
+                self._link_pool.shutdown()
+                self._link_pool = None
+        
+    async def _crawl_site(self, url: str, limit: int, semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+        """
+        Crawl one site, never raising so the rest of the batch is unaffected
+        
+        Args:
+            url: URL to crawl
+            limit: Maximum number of pages to crawl
+            semaphore: Global concurrency cap
+            
+        Returns:
+            Summary dictionary for the site
+        """
+        domain = self._domain(url)
+        lock = self._domain_locks.setdefault(domain, asyncio.Lock())
+        
+        # Take the domain lock before a global slot so politeness waits don't block other sites
+        async with lock:
+            wait = self._domain_last_finished.get(domain, 0.0) + self.domain_delay - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+                
+            async with semaphore:
+                started = time.monotonic()
+                repo = LinkRepository()
+                try:
+                    processor = create_link_processor(seen_set=self.seen_set, workers=self.workers,
+                                                      executor=self._link_pool)
+                    pipeline = CrawlPipeline(self.crawler, processor, self.ai_service, repo,
+                                             incremental=self.incremental, probe=self.probe,
+                                             budget=self.budget.fresh() if self.budget is not None else None,
+                                             writer=self.writer)
+                    summary = await pipeline.arun(url, limit=limit)
+                    summary['status'] = 'ok' if summary['pages_crawled'] else 'empty'
+                except Exception as e:
+                    logger.error(f"Error crawling {url}: {str(e)}")
+                    summary = {
+                        'url': url,
+                        'pages_crawled': 0,
+                        'pages_unchanged': 0,
+                        'pages_incomplete': 0,
+                        'links_found': 0,
+                        'links_stored': 0,
+                        'status': 'failed',
+                        'error': str(e)
+                    }
+                finally:
+                    await asyncio.to_thread(repo.close)
+                    self._domain_last_finished[domain] = time.monotonic()
+                    
+                summary['duration'] = round(time.monotonic() - started, 1)
+                logger.info(f"Finished {url}: {summary['status']} in {summary['duration']}s")
+                return summary
+                
+    def _domain(self, url: str) -> str:
+        """
+        Extract the domain used for politeness from a URL
+        
+        Args:
+            url: URL to extract domain from
+            
+        Returns:
+            Lowercased domain without www prefix
+        """
+        return canonical_domain(url)
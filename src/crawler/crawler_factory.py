@@ -0,0 +1,28 @@
+from typing import Optional
+
+from src.config import CRAWLER_BACKEND
+from src.crawler.base_crawler import BaseCrawler
+from src.utils.rate_limiter import TokenBucket
+
+CRAWLER_BACKENDS = ['firecrawl', 'http']
+
+def create_crawler(backend: str = CRAWLER_BACKEND, rate_limiter: Optional[TokenBucket] = None,
+                   bypass_cache: bool = False) -> BaseCrawler:
+    """
+    Create a crawler for the configured backend
+    
+    Args:
+        backend: "firecrawl" for the FireCrawl API or "http" for the built-in HTTP crawler
+        rate_limiter: Token bucket for FireCrawl API calls (FireCrawl backend only)
+        bypass_cache: Ignore cached FireCrawl responses (FireCrawl backend only)
+        
+    Returns:
+        Crawler instance
+    """
+    if backend == 'firecrawl':
+        from src.crawler.firecrawl_service import FirecrawlService
+        return FirecrawlService(rate_limiter=rate_limiter, bypass_cache=bypass_cache)
+    if backend == 'http':
+        from src.crawler.http_crawler import HttpCrawler
+        return HttpCrawler()
+    raise ValueError(f"Unknown crawler backend: {backend}")
@@ -0,0 +1,284 @@
+import asyncio
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from src.config import (
+    DOCUMENT_PROBE_CONCURRENCY, DOCUMENT_PROBE_PER_HOST_CONCURRENCY, DOCUMENT_PROBE_TIMEOUT,
+    DOCUMENT_PROBE_CACHE_TTL, DOCUMENT_PROBE_CACHE_SIZE, DOCUMENT_URL_HINTS, HTTP_CRAWLER_USER_AGENT
+)
+from src.crawler.link_record import LinkRecord
+from src.utils.async_utils import run_sync
+
+logger = logging.getLogger(__name__)
+
+# Content types of PDF, Office and other valuable documents
+DOCUMENT_CONTENT_TYPES = {
+    'application/pdf', 'application/x-pdf', 'application/msword', 'application/rtf',
+    'application/vnd.ms-excel', 'application/vnd.ms-powerpoint', 'text/csv'
+}
+DOCUMENT_CONTENT_TYPE_PREFIXES = (
+    'application/vnd.openxmlformats-officedocument.',
+    'application/vnd.oasis.opendocument.'
+)
+
+# Extensions a Content-Disposition filename may carry for a document
+DOCUMENT_EXTENSIONS = {'.pdf', '.doc', '.docx', '.xls', '.xlsx', '.csv', '.ppt', '.pptx', '.txt'}
+
+# Extensions of ordinary pages and assets that are never probed
+KNOWN_EXTENSIONS = DOCUMENT_EXTENSIONS | {
+    '.html', '.htm', '.php', '.asp', '.aspx', '.jsp', '.cfm', '.shtml',
+    '.jpg', '.jpeg', '.png', '.gif', '.svg', '.ico', '.css', '.js', '.xml', '.json',
+    '.zip', '.mp3', '.mp4'
+}
+
+# Statuses for which servers often reject HEAD but serve GET
+HEAD_FALLBACK_STATUSES = {403, 405, 501}
+
+FILENAME_PATTERN = re.compile(r'filename\*?\s*=\s*(?:[\w-]+\'[\w-]*\')?"?([^";]+)', re.IGNORECASE)
+
+
+def is_document_response(content_type: str, content_disposition: str = '') -> bool:
+    """
+    Check whether response headers describe a document
+    
+    Args:
+        content_type: Content-Type header
+        content_disposition: Content-Disposition header
+    
+    Returns:
+        True for PDF, Office, CSV and similar documents
+    """
+    media_type = content_type.split(';')[0].strip().lower()
+    if media_type in DOCUMENT_CONTENT_TYPES or media_type.startswith(DOCUMENT_CONTENT_TYPE_PREFIXES):
+        return True
+    
+    # Generic binary downloads are identified by their file name
+    match = FILENAME_PATTERN.search(content_disposition)
+    if match:
+        _, ext = os.path.splitext(match.group(1).strip())
+        return ext.lower() in DOCUMENT_EXTENSIONS
+    
+    return False
+
+
+class DocumentProbe:
+    """Detect documents behind extension-less URLs with concurrent HEAD requests"""
+    
+    def __init__(self, concurrency: int = DOCUMENT_PROBE_CONCURRENCY,
+                 per_host_concurrency: int = DOCUMENT_PROBE_PER_HOST_CONCURRENCY,
+                 timeout: float = DOCUMENT_PROBE_TIMEOUT, cache_ttl: float = DOCUMENT_PROBE_CACHE_TTL,
+                 cache_size: int = DOCUMENT_PROBE_CACHE_SIZE, user_agent: str = HTTP_CRAWLER_USER_AGENT,
+                 hints: Iterable[str] = DOCUMENT_URL_HINTS):
+        """
+        Initialize document probe
+        
+        Args:
+            concurrency: Maximum number of probes in flight
+            per_host_concurrency: Maximum number of probes in flight to one host
+            timeout: Request timeout in seconds
+            cache_ttl: Seconds a probe result stays valid
+            cache_size: Maximum number of probe results kept
+            user_agent: User-Agent header
+            hints: URL fragments that make an extension-less URL worth probing
+        """
+        self.concurrency = concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.user_agent = user_agent
+        self.hints = tuple(hint.lower() for hint in hints)
+        
+        # URL -> (expiry time, content type or None if not a document)
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def is_candidate(self, url: str) -> bool:
+        """
+        Check whether a URL is ambiguous enough to be worth probing
+        
+        Args:
+            url: Absolute URL
+        
+        Returns:
+            True for HTTP(S) URLs without a known extension that look like download endpoints
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            return False
+        
+        _, ext = os.path.splitext(parts.path)
+        if ext.lower() in KNOWN_EXTENSIONS:
+            return False
+        
+        target = f"{parts.path}?{parts.query}".lower()
+        return any(hint in target for hint in self.hints)
+    
+    def annotate(self, links: List[LinkRecord]) -> int:
+        """
+        Probe ambiguous links and mark the ones serving documents
+        
+        Document links get the same initial value the link processor gives
+        links with a document extension, and their content type is recorded
+        in the link metadata.
+        
+        Args:
+            links: Processed link records, updated in place
+        
+        Returns:
+            Number of links newly marked as documents
+        """
+        candidates = [link for link in links if not link.is_document and self.is_candidate(link.url)]
+        if not candidates:
+            return 0
+        
+        content_types = self.probe([link.url for link in candidates])
+        
+        marked = 0
+        for link in candidates:
+            content_type = content_types.get(link.url)
+            if content_type:
+                link.is_document = True
+                link.initial_value = max(link.initial_value, 0.9)
+                link.metadata = dict(link.metadata or {}, content_type=content_type)
+                marked += 1
+        
+        if marked:
+            logger.info(f"Probing found {marked} document links among {len(candidates)} candidates")
+        return marked
+    
+    def probe(self, urls: Iterable[str]) -> Dict[str, Optional[str]]:
+        """
+        Probe URLs for document content types
+        
+        Args:
+            urls: Absolute URLs to probe
+        
+        Returns:
+            Dictionary mapping each URL to its document content type, or None if it is not a document
+        """
+        return run_sync(self.aprobe(urls))
+    
+    async def aprobe(self, urls: Iterable[str]) -> Dict[str, Optional[str]]:
+        """
+        Probe URLs for document content types concurrently
+        
+        Cached results are returned without a request. Concurrency is capped
+        overall and per host for the duration of the call.
+        
+        Args:
+            urls: Absolute URLs to probe
+        
+        Returns:
+            Dictionary mapping each URL to its document content type, or None if it is not a document
+        """
+        results = {}
+        misses = []
+        for url in dict.fromkeys(urls):
+            found, content_type = self._cache_get(url)
+            if found:
+                results[url] = content_type
+            else:
+                misses.append(url)
+        
+        if not misses:
+            return results
+        
+        semaphore = asyncio.Semaphore(self.concurrency)
+        host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        
+        async with self._client() as client:
+            probed = await asyncio.gather(*(
+                self._probe_url(client, url, semaphore, host_semaphores) for url in misses
+            ))
+        
+        for url, (content_type, cacheable) in zip(misses, probed):
+            results[url] = content_type
+            if cacheable:
+                self._cache_set(url, content_type)
+        
+        return results
+    
+    def _client(self) -> httpx.AsyncClient:
+        """Create a connection-pooled HTTP client"""
+        return httpx.AsyncClient(
+            headers={'User-Agent': self.user_agent},
+            timeout=self.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=self.concurrency,
+                max_keepalive_connections=self.concurrency
+            )
+        )
+    
+    async def _probe_url(self, client: httpx.AsyncClient, url: str, semaphore: asyncio.Semaphore,
+                         host_semaphores: Dict[str, asyncio.Semaphore]) -> Tuple[Optional[str], bool]:
+        """
+        Probe one URL with HEAD, falling back to a one-byte ranged GET
+        
+        Args:
+            client: HTTP client
+            url: URL to probe
+            semaphore: Overall concurrency limit
+            host_semaphores: Per-host concurrency limits
+        
+        Returns:
+            Tuple of (document content type or None, whether the result may be cached)
+        """
+        host = urlsplit(url).netloc.lower()
+        host_semaphore = host_semaphores.setdefault(host, asyncio.Semaphore(self.per_host_concurrency))
+        
+        async with semaphore, host_semaphore:
+            try:
+                response = await client.head(url)
+                if response.status_code in HEAD_FALLBACK_STATUSES or 'content-type' not in response.headers:
+                    # Only the headers are needed; the body is never read
+                    async with client.stream('GET', url, headers={'Range': 'bytes=0-0'}) as response:
+                        pass
+            except httpx.HTTPError as e:
+                logger.debug(f"Error probing {url}: {str(e)}")
+                return None, False
+        
+        if response.status_code >= 500:
+            return None, False
+        if response.status_code >= 400:
+            return None, True
+        
+        content_type = response.headers.get('content-type', '')
+        if is_document_response(content_type, response.headers.get('content-disposition', '')):
+            return content_type.split(';')[0].strip().lower(), True
+        return None, True
+    
+    def _cache_get(self, url: str) -> Tuple[bool, Optional[str]]:
+        """
+        Look up an unexpired probe result
+        
+        Returns:
+            Tuple of (whether a result was found, document content type or None)
+        """
+        with self._lock:
+            entry = self._cache.get(url)
+            if entry is None:
+                return False, None
+            expires, content_type = entry
+            if expires < time.time():
+                del self._cache[url]
+                return False, None
+            self._cache.move_to_end(url)
+            return True, content_type
+    
+    def _cache_set(self, url: str, content_type: Optional[str]) -> None:
+        """Store a probe result, evicting the least recently used above the cache size"""
+        with self._lock:
+            self._cache[url] = (time.time() + self.cache_ttl, content_type)
+            self._cache.move_to_end(url)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
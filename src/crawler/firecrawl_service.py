@@ -1,19 +1,75 @@
+import asyncio
 import logging
-from typing import Dict, List, Any
+import random
+from typing import AsyncIterator, Dict, Iterator, List, Any, Optional
 import time
 
+import httpx
 from firecrawl import FirecrawlApp
-from src.config import FIRECRAWL_API_KEY, FORMATS, CRAWL_LIMIT
+from src.crawler.base_crawler import BaseCrawler
+from src.crawler.response_cache import ResponseCache
+from src.utils.rate_limiter import TokenBucket
+from src.config import (
+    FIRECRAWL_API_KEY, FIRECRAWL_API_URL, FORMATS, CRAWL_LIMIT, FIRECRAWL_CACHE_ENABLED,
+    CRAWL_POLL_INITIAL_INTERVAL, CRAWL_POLL_MAX_INTERVAL, CRAWL_POLL_BACKOFF, CRAWL_POLL_JITTER,
+    CRAWL_TIMEOUT_PER_PAGE, CRAWL_MIN_TIMEOUT
+)
 
 logger = logging.getLogger(__name__)
 
-class FirecrawlService:
+class FirecrawlService(BaseCrawler):
     """Service for interacting with FireCrawl API"""
 
-    def __init__(self, api_key: str = FIRECRAWL_API_KEY):
-        """Initialize FireCrawl SDK client"""
+    def __init__(self, api_key: str = FIRECRAWL_API_KEY, api_url: str = FIRECRAWL_API_URL,
+                 rate_limiter: Optional[TokenBucket] = None, cache: Optional[ResponseCache] = None,
+                 bypass_cache: bool = False):
+        """
+        Initialize FireCrawl SDK client
+        
+        Args:
+            api_key: FireCrawl API key
+            api_url: FireCrawl API base URL
+            rate_limiter: Optional token bucket shared by all API calls of this service
+            cache: Response cache (defaults to an on-disk cache if FIRECRAWL_CACHE_ENABLED)
+            bypass_cache: Skip cache lookups but still store fresh responses
+        """
         self.app = FirecrawlApp(api_key=api_key)
+        self.api_key = api_key
+        self.api_url = api_url.rstrip('/')
+        self.rate_limiter = rate_limiter
+        self.cache = cache if cache is not None else (ResponseCache() if FIRECRAWL_CACHE_ENABLED else None)
+        self.bypass_cache = bypass_cache
         logger.info("FireCrawl service initialized")
+        
+    def _throttle(self) -> None:
+        """Wait for the rate limiter before an API call"""
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+            
+    async def _throttle_async(self) -> None:
+        """Wait for the rate limiter before an API call without blocking the event loop"""
+        if self.rate_limiter:
+            await self.rate_limiter.acquire_async()
+            
+    def _cache_key(self, kind: str, url: str, params: Dict) -> Optional[str]:
+        """Build the cache key for a request, or None if caching is disabled"""
+        if self.cache is None:
+            return None
+        return self.cache.make_key(kind, url, params)
+        
+    def _cache_get(self, key: Optional[str]) -> Optional[Any]:
+        """Look up a cached response unless the cache is disabled or bypassed"""
+        if key is None or self.bypass_cache:
+            return None
+        cached = self.cache.get(key)
+        if cached is not None:
+            logger.info("Using cached FireCrawl response")
+        return cached
+        
+    def _cache_set(self, key: Optional[str], value: Any) -> None:
+        """Store a response in the cache if caching is enabled"""
+        if key is not None:
+            self.cache.set(key, value)
 
     def scrape_url(self, url: str) -> Dict[str, Any]:
         """
@@ -34,14 +90,22 @@ class FirecrawlService:
                 'blockAds': True
             }
             
+            cache_key = self._cache_key('scrape', url, params)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+            
             # Execute scrape
+            self._throttle()
             scrape_result = self.app.scrape_url(url, params=params)
             
             if not scrape_result.get('success', False):
                 logger.error(f"Failed to scrape URL: {url}")
                 return {}
                 
-            return scrape_result.get('data', {})
+            data = scrape_result.get('data', {})
+            self._cache_set(cache_key, data)
+            return data
         except Exception as e:
             logger.error(f"Error scraping URL {url}: {str(e)}")
             return {}
@@ -58,113 +122,459 @@ class FirecrawlService:
             List of dictionaries containing data for each crawled page
         """
         try:
-            logger.info(f"Starting crawl for website: {url} with limit: {limit}")
-            
-            # Configure crawl parameters
-            params = {
-                'limit': limit,
-                'scrapeOptions': {
-                    'formats': FORMATS
-                }
-            }
-            
-            # Start asynchronous crawl job
-            crawl_status = self.app.async_crawl_url(url, params=params)
-            
-            if not crawl_status.get('success', False):
-                logger.error(f"Failed to start crawl for URL: {url}")
+            cache_key = self._cache_key('crawl', url, self._crawl_params(limit))
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+                
+            crawl_id = self._start_crawl(url, limit)
+            if not crawl_id:
                 return []
+                
+            # Poll for results
+            return self._poll_for_crawl_results(crawl_id, limit=limit, cache_key=cache_key)
+        except Exception as e:
+            logger.error(f"Error crawling website {url}: {str(e)}")
+            return []
             
-            # Get crawl ID
-            crawl_id = crawl_status.get('id')
+    async def crawl_website_async(self, url: str, limit: int = CRAWL_LIMIT) -> List[Dict]:
+        """
+        Crawl a website without blocking the event loop
+        
+        Args:
+            url: The starting URL for crawling
+            limit: Maximum number of pages to crawl
+            
+        Returns:
+            List of dictionaries containing data for each crawled page
+        """
+        try:
+            cache_key = self._cache_key('crawl', url, self._crawl_params(limit))
+            cached = await asyncio.to_thread(self._cache_get, cache_key)
+            if cached is not None:
+                return cached
+                
+            crawl_id = await asyncio.to_thread(self._start_crawl, url, limit)
             if not crawl_id:
-                logger.error("No crawl ID returned")
                 return []
                 
-            # Poll for results
-            return self._poll_for_crawl_results(crawl_id)
+            return await self._poll_for_crawl_results_async(crawl_id, limit=limit, cache_key=cache_key)
         except Exception as e:
             logger.error(f"Error crawling website {url}: {str(e)}")
             return []
             
-    def _poll_for_crawl_results(self, crawl_id: str, max_attempts: int = 10) -> List[Dict]:
+    def iter_crawl_pages(self, url: str, limit: int = CRAWL_LIMIT) -> Iterator[Dict]:
+        """
+        Crawl a website and yield pages as soon as FireCrawl reports them
+        
+        Partial results are read from the crawl status while the job is still
+        running, following ``next`` cursors, so callers can process pages while
+        the rest of the site is being crawled.
+        
+        Args:
+            url: The starting URL for crawling
+            limit: Maximum number of pages to crawl
+            
+        Yields:
+            Dictionaries containing data for each crawled page
+        """
+        cache_key = self._cache_key('crawl', url, self._crawl_params(limit))
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            yield from cached
+            return
+            
+        try:
+            crawl_id = self._start_crawl(url, limit)
+        except Exception as e:
+            logger.error(f"Error crawling website {url}: {str(e)}")
+            return
+        if not crawl_id:
+            return
+            
+        started = time.monotonic()
+        deadline = started + self._crawl_timeout(limit)
+        seen = set()
+        pages = []
+        attempt = 0
+        
+        with httpx.Client(headers=self._auth_headers(), timeout=60) as client:
+            while True:
+                status = {}
+                status_url = self._crawl_status_url(crawl_id, skip=len(seen))
+                
+                # Drain every page of results currently available
+                while status_url:
+                    try:
+                        self._throttle()
+                        response = client.get(status_url)
+                        response.raise_for_status()
+                        status = response.json()
+                    except Exception as e:
+                        logger.error(f"Error checking crawl status: {str(e)}")
+                        break
+                        
+                    for page in self._new_pages(status, seen):
+                        pages.append(page)
+                        yield page
+                    status_url = status.get('next')
+                    
+                if self._crawl_finished(crawl_id, status, len(seen)):
+                    if status.get('status') == 'completed':
+                        self._cache_set(cache_key, pages)
+                    return
+                    
+                now = time.monotonic()
+                if now >= deadline:
+                    logger.warning(f"Crawl {crawl_id} did not complete within {deadline - started:.0f}s, "
+                                   f"stopping after {len(seen)} pages")
+                    return
+                    
+                wait = self._next_poll_interval(attempt, status, now - started)
+                attempt += 1
+                time.sleep(min(wait, deadline - now))
+                
+    async def aiter_crawl_pages(self, url: str, limit: int = CRAWL_LIMIT) -> AsyncIterator[Dict]:
+        """
+        Async variant of iter_crawl_pages that never blocks the event loop
+        
+        Args:
+            url: The starting URL for crawling
+            limit: Maximum number of pages to crawl
+            
+        Yields:
+            Dictionaries containing data for each crawled page
+        """
+        cache_key = self._cache_key('crawl', url, self._crawl_params(limit))
+        cached = await asyncio.to_thread(self._cache_get, cache_key)
+        if cached is not None:
+            for page in cached:
+                yield page
+            return
+            
+        try:
+            crawl_id = await asyncio.to_thread(self._start_crawl, url, limit)
+        except Exception as e:
+            logger.error(f"Error crawling website {url}: {str(e)}")
+            return
+        if not crawl_id:
+            return
+            
+        started = time.monotonic()
+        deadline = started + self._crawl_timeout(limit)
+        seen = set()
+        pages = []
+        attempt = 0
+        
+        async with httpx.AsyncClient(headers=self._auth_headers(), timeout=60) as client:
+            while True:
+                status = {}
+                status_url = self._crawl_status_url(crawl_id, skip=len(seen))
+                
+                # Drain every page of results currently available
+                while status_url:
+                    try:
+                        await self._throttle_async()
+                        response = await client.get(status_url)
+                        response.raise_for_status()
+                        status = response.json()
+                    except Exception as e:
+                        logger.error(f"Error checking crawl status: {str(e)}")
+                        break
+                        
+                    for page in self._new_pages(status, seen):
+                        pages.append(page)
+                        yield page
+                    status_url = status.get('next')
+                    
+                if self._crawl_finished(crawl_id, status, len(seen)):
+                    if status.get('status') == 'completed':
+                        await asyncio.to_thread(self._cache_set, cache_key, pages)
+                    return
+                    
+                now = time.monotonic()
+                if now >= deadline:
+                    logger.warning(f"Crawl {crawl_id} did not complete within {deadline - started:.0f}s, "
+                                   f"stopping after {len(seen)} pages")
+                    return
+                    
+                wait = self._next_poll_interval(attempt, status, now - started)
+                attempt += 1
+                await asyncio.sleep(min(wait, deadline - now))
+                
+    def _auth_headers(self) -> Dict[str, str]:
+        """Headers for direct FireCrawl API requests"""
+        return {'Authorization': f'Bearer {self.api_key}'}
+        
+    def _crawl_status_url(self, crawl_id: str, skip: int = 0) -> str:
+        """
+        Build the status URL for a crawl job
+        
+        Args:
+            crawl_id: ID of the crawl job
+            skip: Number of pages already received, so they are not sent again
+            
+        Returns:
+            Crawl status URL
+        """
+        status_url = f"{self.api_url}/v1/crawl/{crawl_id}"
+        if skip:
+            status_url += f"?skip={skip}"
+        return status_url
+        
+    def _new_pages(self, status: Dict, seen: set) -> List[Dict]:
+        """
+        Pick out pages in a status response that have not been yielded yet
+        
+        Args:
+            status: Status response from FireCrawl
+            seen: Keys of pages already yielded, updated in place
+            
+        Returns:
+            List of newly available pages
+        """
+        pages = []
+        for page in status.get('data') or []:
+            metadata = page.get('metadata') or {}
+            key = metadata.get('sourceURL') or metadata.get('url') or len(seen)
+            if key in seen:
+                continue
+            seen.add(key)
+            pages.append(page)
+        return pages
+        
+    def _crawl_finished(self, crawl_id: str, status: Dict, page_count: int) -> bool:
+        """
+        Check whether a streamed crawl has reached a terminal state
+        
+        Args:
+            crawl_id: ID of the crawl job
+            status: Last status response from FireCrawl
+            page_count: Number of pages yielded so far
+            
+        Returns:
+            True if no more pages will arrive
+        """
+        state = status.get('status', 'unknown')
+        if state == 'completed':
+            logger.info(f"Crawl {crawl_id} completed with {page_count} pages")
+            return True
+        if state in ['failed', 'cancelled']:
+            logger.error(f"Crawl {crawl_id} {state}")
+            return True
+            
+        logger.info(f"Crawl {crawl_id} status: {state} ({page_count}/{status.get('total', '?')} pages received)")
+        return False
+        
+    def _start_crawl(self, url: str, limit: int) -> Optional[str]:
         """
-        Poll for crawl results
+        Start an asynchronous crawl job
+        
+        Args:
+            url: The starting URL for crawling
+            limit: Maximum number of pages to crawl
+            
+        Returns:
+            Crawl job ID, or None if the job could not be started
+        """
+        logger.info(f"Starting crawl for website: {url} with limit: {limit}")
+        
+        # Start asynchronous crawl job
+        self._throttle()
+        crawl_status = self.app.async_crawl_url(url, params=self._crawl_params(limit))
+        
+        if not crawl_status.get('success', False):
+            logger.error(f"Failed to start crawl for URL: {url}")
+            return None
+        
+        # Get crawl ID
+        crawl_id = crawl_status.get('id')
+        if not crawl_id:
+            logger.error("No crawl ID returned")
+            return None
+            
+        return crawl_id
+        
+    def _crawl_params(self, limit: int) -> Dict[str, Any]:
+        """
+        Build crawl parameters
+        
+        Args:
+            limit: Maximum number of pages to crawl
+            
+        Returns:
+            Parameters for a FireCrawl crawl job
+        """
+        return {
+            'limit': limit,
+            'scrapeOptions': {
+                'formats': FORMATS
+            }
+        }
+        
+    def _poll_for_crawl_results(self, crawl_id: str, limit: int = CRAWL_LIMIT,
+                                cache_key: Optional[str] = None) -> List[Dict]:
+        """
+        Poll for crawl results with adaptive backoff
         
         Args:
             crawl_id: ID of the crawl job
-            max_attempts: Maximum number of polling attempts
+            limit: Page limit of the crawl, used to scale the deadline
+            cache_key: Cache key under which completed results are stored
             
         Returns:
             List of dictionaries containing data for each crawled page
         """
+        started = time.monotonic()
+        deadline = started + self._crawl_timeout(limit)
+        status = {}
         attempt = 0
-        poll_interval = 30  # seconds
         
-        while attempt < max_attempts:
-            attempt += 1
-            
-            # Check crawl status - use check_crawl_status method
+        while True:
             try:
+                self._throttle()
                 status = self.app.check_crawl_status(crawl_id)
+            except Exception as e:
+                logger.error(f"Error checking crawl status: {str(e)}")
                 
-                logger.info(f"Crawl status: {status.get('status', 'unknown')}")
-                
+            results = self._handle_crawl_status(crawl_id, status)
+            if results is not None:
                 if status.get('status') == 'completed':
-                    logger.info(f"Crawl {crawl_id} completed")
-                    
-                    # Get results directly from the status response
-                    results = status.get('data', [])
-                    logger.info(f"Retrieved {len(results)} pages from crawl")
-                    return results
-                    
-                elif status.get('status') in ['failed', 'cancelled']:
-                    logger.error(f"Crawl {crawl_id} {status.get('status')}")
-                    return []
+                    self._cache_set(cache_key, results)
+                return results
                 
-                logger.info(f"Crawl in progress, attempt {attempt}/{max_attempts}...")
-                time.sleep(poll_interval)
+            now = time.monotonic()
+            if now >= deadline:
+                break
                 
+            wait = self._next_poll_interval(attempt, status, now - started)
+            attempt += 1
+            time.sleep(min(wait, deadline - now))
+            
+        return self._partial_crawl_results(crawl_id, status, deadline - started)
+        
+    async def _poll_for_crawl_results_async(self, crawl_id: str, limit: int = CRAWL_LIMIT,
+                                            cache_key: Optional[str] = None) -> List[Dict]:
+        """
+        Poll for crawl results with adaptive backoff, using asyncio for waiting
+        
+        Args:
+            crawl_id: ID of the crawl job
+            limit: Page limit of the crawl, used to scale the deadline
+            cache_key: Cache key under which completed results are stored
+            
+        Returns:
+            List of dictionaries containing data for each crawled page
+        """
+        started = time.monotonic()
+        deadline = started + self._crawl_timeout(limit)
+        status = {}
+        attempt = 0
+        
+        while True:
+            try:
+                await self._throttle_async()
+                status = await asyncio.to_thread(self.app.check_crawl_status, crawl_id)
             except Exception as e:
                 logger.error(f"Error checking crawl status: {str(e)}")
-                time.sleep(poll_interval)
+                
+            results = self._handle_crawl_status(crawl_id, status)
+            if results is not None:
+                if status.get('status') == 'completed':
+                    await asyncio.to_thread(self._cache_set, cache_key, results)
+                return results
+                
+            now = time.monotonic()
+            if now >= deadline:
+                break
+                
+            wait = self._next_poll_interval(attempt, status, now - started)
+            attempt += 1
+            await asyncio.sleep(min(wait, deadline - now))
             
-        logger.warning(f"Max polling attempts reached for crawl {crawl_id}")
-        return []
-
-    def extract_links(self, page_data: Dict) -> List[Dict]:
+        return self._partial_crawl_results(crawl_id, status, deadline - started)
+        
+    def _handle_crawl_status(self, crawl_id: str, status: Dict) -> Optional[List[Dict]]:
         """
-        Extract links from page data
+        Interpret a crawl status response
         
         Args:
-            page_data: Dictionary containing scraped page data
+            crawl_id: ID of the crawl job
+            status: Status response from FireCrawl
             
         Returns:
-            List of dictionaries with link information
+            List of pages if the crawl finished, an empty list if it failed,
+            or None if it is still running
         """
-        links = []
+        state = status.get('status', 'unknown')
         
-        # Extract raw links from the page
-        raw_links = page_data.get('links', [])
+        if state == 'completed':
+            logger.info(f"Crawl {crawl_id} completed")
+            
+            # Get results directly from the status response
+            results = status.get('data', [])
+            logger.info(f"Retrieved {len(results)} pages from crawl")
+            return results
+            
+        elif state in ['failed', 'cancelled']:
+            logger.error(f"Crawl {crawl_id} {state}")
+            return []
+            
+        logger.info(f"Crawl {crawl_id} status: {state} ({status.get('completed', 0)}/{status.get('total', '?')} pages)")
+        return None
         
-        # Get page metadata
-        metadata = page_data.get('metadata', {})
-        source_url = metadata.get('sourceURL', '')
+    def _partial_crawl_results(self, crawl_id: str, status: Dict, timeout: float) -> List[Dict]:
+        """
+        Return whatever pages a timed-out crawl produced so far
         
-        logger.debug(f"Found {len(raw_links)} raw links")
-
-        for link in raw_links:
-            # Skip empty links
-            if not link:
-                continue
-                
-            # Create link entry
-            link_info = {
-                'url': link,
-                'source_url': source_url,
-                'page_title': metadata.get('title', ''),
-            }
+        Args:
+            crawl_id: ID of the crawl job
+            status: Last status response from FireCrawl
+            timeout: Deadline that was exceeded (seconds)
+            
+        Returns:
+            List of pages available in the last status response
+        """
+        results = status.get('data') or []
+        logger.warning(f"Crawl {crawl_id} did not complete within {timeout:.0f}s, "
+                       f"returning {len(results)} partial pages")
+        return results
+        
+    def _crawl_timeout(self, limit: int) -> float:
+        """
+        Deadline for a crawl, scaled by its page limit
+        
+        Args:
+            limit: Maximum number of pages to crawl
             
-            links.append(link_info)
+        Returns:
+            Number of seconds to wait before giving up on the crawl
+        """
+        return max(CRAWL_MIN_TIMEOUT, limit * CRAWL_TIMEOUT_PER_PAGE)
+        
+    def _next_poll_interval(self, attempt: int, status: Dict, elapsed: float) -> float:
+        """
+        Compute the wait before the next status check
+        
+        The wait grows exponentially from CRAWL_POLL_INITIAL_INTERVAL, but is
+        capped by the estimated time remaining when the status reports
+        completed/total page counts, so small crawls are picked up quickly.
+        
+        Args:
+            attempt: Number of status checks already waited on
+            status: Last status response from FireCrawl
+            elapsed: Seconds since polling started
+            
+        Returns:
+            Number of seconds to wait, including jitter
+        """
+        wait = min(CRAWL_POLL_INITIAL_INTERVAL * (CRAWL_POLL_BACKOFF ** attempt), CRAWL_POLL_MAX_INTERVAL)
+        
+        # Estimate time remaining from the crawl rate observed so far
+        completed = status.get('completed') or 0
+        total = status.get('total') or 0
+        if 0 < completed < total and elapsed > 0:
+            remaining = (total - completed) * elapsed / completed
+            wait = min(wait, max(remaining, CRAWL_POLL_INITIAL_INTERVAL))
             
-        return links
\ No newline at end of file
+        return wait * random.uniform(1 - CRAWL_POLL_JITTER, 1 + CRAWL_POLL_JITTER)
@@ -0,0 +1,72 @@
+import heapq
+import itertools
+from typing import Callable, List, Optional, Tuple
+
+class CrawlFrontier:
+    """
+    Best-first crawl frontier: a max-priority heap of URLs plus a seen-set
+    
+    The seen-set holds the key of every URL ever queued or marked seen, so a
+    URL is queued at most once even after it has been popped.
+    """
+    
+    def __init__(self, scorer: Callable[[str], float], key: Optional[Callable[[str], str]] = None):
+        """
+        Initialize frontier
+        
+        Args:
+            scorer: Function returning the priority of a URL (higher is crawled first)
+            key: Function mapping equivalent URLs to one seen-set key (the URL itself if None)
+        """
+        self.scorer = scorer
+        self.key = key
+        self._heap: List[Tuple[float, int, str]] = []
+        self._seen = set()
+        
+        # Insertion counter so equal scores are crawled in discovery order
+        self._counter = itertools.count()
+        
+    def add(self, url: str, score: Optional[float] = None) -> bool:
+        """
+        Add a URL to the frontier unless it was seen before
+        
+        Args:
+            url: URL to add
+            score: Priority to use instead of the scorer
+            
+        Returns:
+            True if the URL was added
+        """
+        key = self.key(url) if self.key else url
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        
+        if score is None:
+            score = self.scorer(url)
+        heapq.heappush(self._heap, (-score, next(self._counter), url))
+        return True
+        
+    def pop(self) -> str:
+        """
+        Remove and return the highest-priority URL
+        
+        Returns:
+            URL to crawl next
+        """
+        return heapq.heappop(self._heap)[2]
+        
+    def mark_seen(self, url: str) -> None:
+        """
+        Record a URL as visited without queueing it, e.g. the target of a redirect
+        
+        Args:
+            url: URL that must not be queued
+        """
+        self._seen.add(self.key(url) if self.key else url)
+        
+    def __len__(self) -> int:
+        return len(self._heap)
+        
+    def __contains__(self, url: str) -> bool:
+        return (self.key(url) if self.key else url) in self._seen
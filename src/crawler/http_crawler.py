@@ -0,0 +1,380 @@
+import asyncio
+import html
+import logging
+import os
+import queue
+import re
+import threading
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse, urlsplit, urlunsplit
+from urllib.robotparser import RobotFileParser
+
+import httpx
+
+from src.crawler.base_crawler import BaseCrawler
+from src.crawler.frontier import CrawlFrontier
+from src.crawler.link_processor import LinkProcessor
+from src.crawler.url_normalizer import canonical_domain, canonicalize_url
+from src.config import (
+    CRAWL_LIMIT, HTTP_CRAWLER_CONCURRENCY, HTTP_CRAWLER_PER_HOST_CONCURRENCY,
+    HTTP_CRAWLER_TIMEOUT, HTTP_CRAWLER_USER_AGENT, HTTP_CRAWLER_RESPECT_ROBOTS
+)
+
+logger = logging.getLogger(__name__)
+
+# Link and title patterns for the HTML link extractor
+HREF_PATTERN = re.compile(
+    r'<(?:a|area)\b[^>]*?\bhref\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))',
+    re.IGNORECASE
+)
+BASE_PATTERN = re.compile(
+    r'<base\b[^>]*?\bhref\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))',
+    re.IGNORECASE
+)
+TITLE_PATTERN = re.compile(r'<title\b[^>]*>(.*?)</title\s*>', re.IGNORECASE | re.DOTALL)
+
+# Extensions that are never fetched as pages
+NON_PAGE_EXTENSIONS = {
+    '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.csv', '.ppt', '.pptx', '.txt',
+    '.zip', '.jpg', '.jpeg', '.png', '.gif', '.svg', '.ico', '.mp3', '.mp4',
+    '.css', '.js', '.xml', '.json'
+}
+
+# Directory index documents, served for the directory URL itself
+DIRECTORY_INDEX = re.compile(r'/(?:index|default)\.(?:html?|php|aspx?)$', re.IGNORECASE)
+
+# Marks the end of a crawl in the queue bridging async and sync iteration
+_DONE = object()
+
+
+def extract_page_links(page_html: str, page_url: str) -> Tuple[str, List[str]]:
+    """
+    Extract the title and absolute link URLs from an HTML page
+    
+    Args:
+        page_html: HTML content of the page
+        page_url: URL the page was fetched from
+    
+    Returns:
+        Tuple of (page title, list of unique absolute link URLs in document order)
+    """
+    base_match = BASE_PATTERN.search(page_html)
+    base_url = page_url
+    if base_match:
+        base_href = html.unescape(next(group for group in base_match.groups() if group is not None)).strip()
+        base_url = urljoin(page_url, base_href)
+    
+    title_match = TITLE_PATTERN.search(page_html)
+    title = html.unescape(' '.join(title_match.group(1).split())) if title_match else ''
+    
+    links = []
+    seen = set()
+    for match in HREF_PATTERN.finditer(page_html):
+        href = html.unescape(next(group for group in match.groups() if group is not None)).strip()
+        
+        # Skip empty, in-page and script links
+        if not href or href.startswith('#') or href.lower().startswith('javascript:'):
+            continue
+        
+        link = urljoin(base_url, href)
+        if link not in seen:
+            seen.add(link)
+            links.append(link)
+    
+    return title, links
+
+
+def crawl_key(url: str) -> str:
+    """
+    Key under which equivalent page URLs are crawled only once
+    
+    The canonical URL (see canonicalize_url), with a trailing directory
+    index document such as /index.html dropped.
+    
+    Args:
+        url: Absolute page URL
+    
+    Returns:
+        Canonical page key
+    """
+    parts = urlsplit(canonicalize_url(url))
+    path = DIRECTORY_INDEX.sub('', parts.path) or '/'
+    return urlunsplit(parts._replace(path=path))
+
+
+class HttpCrawler(BaseCrawler):
+    """Crawler that fetches pages directly over HTTP with asyncio"""
+    
+    def __init__(self, concurrency: int = HTTP_CRAWLER_CONCURRENCY,
+                 per_host_concurrency: int = HTTP_CRAWLER_PER_HOST_CONCURRENCY,
+                 timeout: float = HTTP_CRAWLER_TIMEOUT, user_agent: str = HTTP_CRAWLER_USER_AGENT,
+                 respect_robots: bool = HTTP_CRAWLER_RESPECT_ROBOTS,
+                 scorer: Optional[Callable[[str], float]] = None):
+        """
+        Initialize HTTP crawler
+        
+        Args:
+            concurrency: Maximum number of pages fetched at the same time
+            per_host_concurrency: Maximum number of requests in flight to one host
+            timeout: Request timeout in seconds
+            user_agent: User-Agent header, also used for robots.txt rules
+            respect_robots: Skip URLs disallowed by robots.txt
+            scorer: URL priority function for the crawl frontier
+                    (defaults to LinkProcessor.crawl_priority)
+        """
+        self.concurrency = concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self.respect_robots = respect_robots
+        self.scorer = scorer or LinkProcessor().crawl_priority
+        logger.info("HTTP crawler initialized")
+    
+    def scrape_url(self, url: str) -> Dict:
+        """
+        Scrape a single URL
+        
+        Args:
+            url: The URL to scrape
+        
+        Returns:
+            Dictionary containing scraped data
+        """
+        async def scrape():
+            async with self._client() as client:
+                return await self._fetch_page(client, url, {})
+        
+        try:
+            return asyncio.run(scrape()) or {}
+        except Exception as e:
+            logger.error(f"Error scraping URL {url}: {str(e)}")
+            return {}
+    
+    def iter_crawl_pages(self, url: str, limit: int = CRAWL_LIMIT) -> Iterator[Dict]:
+        """
+        Crawl a website and yield pages as they are fetched
+        
+        The async crawl runs on its own event loop in a background thread.
+        
+        Args:
+            url: The starting URL for crawling
+            limit: Maximum number of pages to crawl
+        
+        Yields:
+            Dictionaries containing data for each crawled page
+        """
+        pages = queue.Queue()
+        stop = threading.Event()
+        
+        async def produce():
+            try:
+                async for page in self.aiter_crawl_pages(url, limit=limit):
+                    if stop.is_set():
+                        break
+                    pages.put(page)
+            except Exception as e:
+                logger.error(f"Error crawling website {url}: {str(e)}")
+            finally:
+                pages.put(_DONE)
+        
+        thread = threading.Thread(target=lambda: asyncio.run(produce()), daemon=True)
+        thread.start()
+        
+        try:
+            while True:
+                page = pages.get()
+                if page is _DONE:
+                    break
+                yield page
+        finally:
+            stop.set()
+    
+    async def aiter_crawl_pages(self, url: str, limit: int = CRAWL_LIMIT) -> AsyncIterator[Dict]:
+        """
+        Crawl a website best-first, staying on the starting host
+        
+        Unvisited URLs are kept in a priority frontier ordered by the scorer,
+        so the page budget is spent on the most promising pages first.
+        
+        Args:
+            url: The starting URL for crawling
+            limit: Maximum number of pages to crawl
+        
+        Yields:
+            Dictionaries containing data for each crawled page
+        """
+        logger.info(f"Starting HTTP crawl for website: {url} with limit: {limit}")
+        
+        start_url = url.split('#')[0]
+        site = self._site(start_url)
+        host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        
+        # Pages are fetched under the URL they were linked as, but deduplicated by canonical key
+        frontier = CrawlFrontier(self.scorer, key=crawl_key)
+        frontier.add(start_url, score=float('inf'))
+        visited = set()
+        pending = set()
+        crawled = 0
+        
+        async with self._client() as client:
+            robots = await self._load_robots(client, start_url)
+            
+            try:
+                while (frontier or pending) and crawled < limit:
+                    # Keep up to `concurrency` fetches in flight without exceeding the page budget
+                    while frontier and len(pending) < self.concurrency and crawled + len(pending) < limit:
+                        next_url = frontier.pop()
+                        if robots and not robots.can_fetch(self.user_agent, next_url):
+                            logger.debug(f"Skipping {next_url} disallowed by robots.txt")
+                            continue
+                        pending.add(asyncio.create_task(self._fetch_page(client, next_url, host_semaphores)))
+                    
+                    if not pending:
+                        break
+                    
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    
+                    for task in done:
+                        page = task.result()
+                        if not page:
+                            continue
+                        
+                        # Skip pages already crawled under another URL (redirects), and
+                        # never queue a page again under the URL it was served from
+                        final_key = crawl_key(page['metadata']['url'])
+                        if final_key in visited:
+                            continue
+                        visited.add(final_key)
+                        frontier.mark_seen(page['metadata']['url'])
+                        
+                        # Queue new on-site pages
+                        for link in page['links']:
+                            candidate = link.split('#')[0]
+                            if candidate not in frontier and self._is_crawlable(candidate, site):
+                                frontier.add(candidate)
+                        
+                        if crawled < limit:
+                            crawled += 1
+                            yield page
+            finally:
+                for task in pending:
+                    task.cancel()
+        
+        logger.info(f"HTTP crawl of {url} finished with {crawled} pages")
+    
+    def _client(self) -> httpx.AsyncClient:
+        """Create a connection-pooled HTTP client"""
+        return httpx.AsyncClient(
+            headers={'User-Agent': self.user_agent},
+            timeout=self.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=self.concurrency,
+                max_keepalive_connections=self.concurrency
+            )
+        )
+    
+    async def _load_robots(self, client: httpx.AsyncClient, url: str) -> Optional[RobotFileParser]:
+        """
+        Fetch and parse robots.txt for the host of a URL
+        
+        Args:
+            client: HTTP client
+            url: Any URL on the host
+        
+        Returns:
+            Parsed robots.txt rules, or None if everything may be fetched
+        """
+        if not self.respect_robots:
+            return None
+        
+        parsed = urlparse(url)
+        robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
+        robots = RobotFileParser(robots_url)
+        
+        try:
+            response = await client.get(robots_url)
+        except httpx.HTTPError as e:
+            logger.debug(f"Could not fetch {robots_url}: {str(e)}")
+            return None
+        
+        if response.status_code in (401, 403):
+            robots.disallow_all = True
+        elif response.status_code == 200:
+            robots.parse(response.text.splitlines())
+        else:
+            return None
+        
+        return robots
+    
+    async def _fetch_page(self, client: httpx.AsyncClient, url: str,
+                          host_semaphores: Dict[str, asyncio.Semaphore]) -> Optional[Dict]:
+        """
+        Fetch one HTML page and build its page dictionary
+        
+        Args:
+            client: HTTP client
+            url: URL to fetch
+            host_semaphores: Per-host concurrency limits for the current crawl
+        
+        Returns:
+            Page dictionary, or None if the URL is not a reachable HTML page
+        """
+        host = urlparse(url).netloc.lower()
+        semaphore = host_semaphores.setdefault(host, asyncio.Semaphore(self.per_host_concurrency))
+        
+        async with semaphore:
+            try:
+                response = await client.get(url)
+            except httpx.HTTPError as e:
+                logger.warning(f"Error fetching {url}: {str(e)}")
+                return None
+        
+        if response.status_code >= 400:
+            logger.debug(f"Skipping {url}: HTTP {response.status_code}")
+            return None
+        
+        content_type = response.headers.get('content-type', '')
+        if 'html' not in content_type.lower():
+            return None
+        
+        page_html = response.text
+        final_url = str(response.url)
+        title, links = extract_page_links(page_html, final_url)
+        
+        return {
+            'html': page_html,
+            'links': links,
+            'metadata': {
+                'sourceURL': url,
+                'url': final_url,
+                'title': title,
+                'statusCode': response.status_code,
+                'contentType': content_type,
+                'etag': response.headers.get('etag'),
+                'lastModified': response.headers.get('last-modified')
+            }
+        }
+    
+    def _is_crawlable(self, url: str, site: str) -> bool:
+        """
+        Check whether a link should be fetched as a page of the current site
+        
+        Args:
+            url: Absolute link URL
+            site: Host of the site being crawled, without www prefix
+        
+        Returns:
+            True if the link is an on-site HTTP(S) URL that is likely an HTML page
+        """
+        parsed = urlparse(url)
+        if parsed.scheme not in ('http', 'https'):
+            return False
+        if self._site(url) != site:
+            return False
+        _, ext = os.path.splitext(parsed.path)
+        return ext.lower() not in NON_PAGE_EXTENSIONS
+    
+    def _site(self, url: str) -> str:
+        """Get the host of a URL, lowercased and without www prefix"""
+        return canonical_domain(url)
@@ -0,0 +1,197 @@
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, parse_qsl
+
+from src.config import (
+    LINK_CLUSTER_MIN_SIZE, LINK_CLUSTER_REPRESENTATIVES, LINK_CLUSTER_MAX_SPREAD, LINK_CLUSTER_CACHE_SIZE
+)
+from src.crawler.link_record import LinkRecord, RELEVANCE_FIELDS, PROPAGATED_RATIONALE_PREFIX
+
+DIGITS = re.compile(r'\d+')
+# Hex and UUID identifiers, e.g. /item/5f3a9c0e1b2d or /doc/0b8e...-...
+HEX_ID = re.compile(r'(?=[a-f]*\d)[0-9a-f]{8,}|[0-9a-f]{8}(?:-[0-9a-f]{4}){3}-[0-9a-f]{12}', re.IGNORECASE)
+
+
+def url_template(url: str) -> str:
+    """
+    Reduce a URL to the template shared by its structurally identical siblings
+    
+    Numbers inside path segments and query values become wildcards, and hex
+    or UUID segments become a single wildcard, so /news/2023/05/item-123 and
+    /news/2024/01/item-9 both map to host/news/*/*/item-*.
+    
+    Args:
+        url: Absolute URL
+    
+    Returns:
+        Template string
+    """
+    parts = urlsplit(url)
+    segments = ['*' if HEX_ID.fullmatch(segment) else DIGITS.sub('*', segment)
+                for segment in parts.path.split('/')]
+    query = '&'.join(sorted(f"{key}={DIGITS.sub('*', value)}"
+                            for key, value in parse_qsl(parts.query, keep_blank_values=True)))
+    
+    template = f"{parts.netloc.lower()}{'/'.join(segments)}"
+    return f"{template}?{query}" if query else template
+
+
+class LinkCluster:
+    """Links sharing a URL template, split into representatives and the members they stand for"""
+    
+    __slots__ = ('template', 'is_document', 'representatives', 'members')
+    
+    def __init__(self, template: str, is_document: bool, representatives: List[LinkRecord],
+                 members: List[LinkRecord]):
+        self.template = template
+        self.is_document = is_document
+        self.representatives = representatives
+        self.members = members
+
+
+class LinkClusterer:
+    """
+    Score one family of look-alike links through a few representatives
+    
+    Links are grouped by URL template; in groups of at least `min_size`,
+    only `representatives` links are sent for scoring. If the scored
+    representatives agree to within `max_spread` overall relevance, their
+    median result is copied to the other members and the template is
+    remembered, so later members are filled in without scoring at all.
+    Otherwise the members are scored individually. Copied rationales start
+    with PROPAGATED_RATIONALE_PREFIX.
+    """
+    
+    def __init__(self, min_size: int = LINK_CLUSTER_MIN_SIZE, representatives: int = LINK_CLUSTER_REPRESENTATIVES,
+                 max_spread: float = LINK_CLUSTER_MAX_SPREAD, cache_size: int = LINK_CLUSTER_CACHE_SIZE):
+        """
+        Initialize clusterer
+        
+        Args:
+            min_size: Links sharing a template before only representatives are scored
+            representatives: Links scored per cluster
+            max_spread: Largest difference in representatives' overall relevance that still propagates
+            cache_size: Resolved templates remembered across calls
+        """
+        self.min_size = max(min_size, representatives + 1)
+        self.representatives = max(representatives, 1)
+        self.max_spread = max_spread
+        self.cache_size = cache_size
+        
+        self.propagated = 0
+        self.rejected = 0
+        
+        # (template, is_document) -> (relevance data, representative URL)
+        self._resolved: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def plan(self, links: List[LinkRecord]) -> Tuple[List[LinkRecord], List[LinkCluster]]:
+        """
+        Decide which links to score
+        
+        Links of templates resolved earlier are filled in right away.
+        
+        Args:
+            links: Link records to analyze
+        
+        Returns:
+            Tuple of (links to score, clusters whose members wait for their representatives)
+        """
+        groups: Dict[Tuple[str, bool], List[LinkRecord]] = {}
+        for link in links:
+            groups.setdefault((url_template(link.url), bool(link.is_document)), []).append(link)
+        
+        to_score, clusters = [], []
+        for (template, is_document), group in groups.items():
+            resolved = self._lookup((template, is_document))
+            if resolved is not None:
+                relevance_data, source_url = resolved
+                for link in group:
+                    self._copy(link, relevance_data, template, source_url)
+            elif len(group) < self.min_size:
+                to_score.extend(group)
+            else:
+                # Spread representatives over the group rather than taking its first links
+                step = (len(group) - 1) / max(self.representatives - 1, 1)
+                picks = {round(i * step) for i in range(self.representatives)}
+                representatives = [group[i] for i in sorted(picks)]
+                members = [link for i, link in enumerate(group) if i not in picks]
+                to_score.extend(representatives)
+                clusters.append(LinkCluster(template, is_document, representatives, members))
+        
+        return to_score, clusters
+    
+    def propagate(self, clusters: List[LinkCluster], scored: Dict[int, Dict]) -> List[LinkRecord]:
+        """
+        Copy representatives' scores to their cluster members where they agree
+        
+        Args:
+            clusters: Clusters returned by plan()
+            scored: Relevance data of successfully scored links, by id() of the link record
+        
+        Returns:
+            Members that still need scoring of their own
+        """
+        unresolved = []
+        for cluster in clusters:
+            results = sorted(
+                ((scored[id(link)], link) for link in cluster.representatives if id(link) in scored),
+                key=lambda result: result[0].get('overall_relevance', 0.0)
+            )
+            overall = [relevance_data.get('overall_relevance', 0.0) for relevance_data, _ in results]
+            
+            # Confidence rule: every representative scored, and all of them agree
+            if len(results) < len(cluster.representatives) or max(overall) - min(overall) > self.max_spread:
+                with self._lock:
+                    self.rejected += len(cluster.members)
+                unresolved.extend(cluster.members)
+                continue
+            
+            relevance_data, source = results[len(results) // 2]
+            for link in cluster.representatives:
+                link.metadata = dict(link.metadata or {}, cluster_template=cluster.template)
+            for link in cluster.members:
+                self._copy(link, relevance_data, cluster.template, source.url)
+            self._remember((cluster.template, cluster.is_document), relevance_data, source.url)
+        
+        return unresolved
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Get clustering statistics
+        
+        Returns:
+            Dictionary with the number of links given a representative's score
+            and the number scored individually because representatives disagreed
+        """
+        return {
+            'propagated': self.propagated,
+            'rejected': self.rejected,
+            'templates': len(self._resolved)
+        }
+    
+    def _copy(self, link: LinkRecord, relevance_data: Dict, template: str, source_url: str) -> None:
+        """Give a link a representative's relevance data, recording where it came from"""
+        link.update({field: relevance_data[field] for field in RELEVANCE_FIELDS if field in relevance_data})
+        link.rationale = f"{PROPAGATED_RATIONALE_PREFIX}{relevance_data.get('rationale') or ''}"[:255]
+        link.metadata = dict(link.metadata or {}, cluster_template=template, scored_from=source_url)
+        with self._lock:
+            self.propagated += 1
+    
+    def _lookup(self, key: Tuple[str, bool]) -> Optional[Tuple[Dict, str]]:
+        """Get the relevance data a template was resolved to, if any"""
+        with self._lock:
+            resolved = self._resolved.get(key)
+            if resolved is not None:
+                self._resolved.move_to_end(key)
+            return resolved
+    
+    def _remember(self, key: Tuple[str, bool], relevance_data: Dict, source_url: str) -> None:
+        """Remember a resolved template, evicting the least recently used above the cache size"""
+        with self._lock:
+            self._resolved[key] = (relevance_data, source_url)
+            self._resolved.move_to_end(key)
+            while len(self._resolved) > self.cache_size:
+                self._resolved.popitem(last=False)
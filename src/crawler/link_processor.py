@@ -1,28 +1,113 @@
 import logging
 import os
-from typing import Dict, List, Set
-from urllib.parse import urljoin, urlparse
+import re
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+from urllib.parse import urlparse
 
-from src.config import HIGH_VALUE_KEYWORDS
+from src.config import HIGH_VALUE_KEYWORDS, LINK_CHUNK_SIZE
+from src.crawler.keyword_matcher import get_keyword_matcher
+from src.crawler.link_clusterer import HEX_ID
+from src.crawler.link_record import LinkRecord
+from src.crawler.seen_set import SeenSet, MemorySeenSet
+from src.crawler.url_normalizer import resolve_url
 
 logger = logging.getLogger(__name__)
 
+# Path segments that are dates or numeric IDs (/2023/05/, /item-123), marking one item of a long series
+SERIAL_SEGMENT = re.compile(r'^\d+$|\d{3,}')
+# Crawl priority lost per serial path segment
+SERIAL_SEGMENT_PENALTY = 0.15
+
+
+def chunked(items: Iterable, size: int) -> Iterator[List]:
+    """
+    Split an iterable into lists of at most `size` items
+    
+    Args:
+        items: Items to split
+        size: Maximum chunk size
+        
+    Yields:
+        Consecutive chunks of items
+    """
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
 class LinkProcessor:
     """Process and filter links from crawled pages"""
     
-    def __init__(self):
+    def __init__(self, seen_set: Optional[SeenSet] = None):
+        """
+        Initialize link processor
+        
+        Args:
+            seen_set: Set of already processed URLs, shareable across processors and
+                      persistent across runs (defaults to an in-memory set)
+        """
         # File extensions that might contain valuable information
         self.valuable_extensions = {
             '.pdf', '.doc', '.docx', '.xls', '.xlsx', 
             '.csv', '.ppt', '.pptx', '.txt'
         }
         
+        # Site sections that usually hold budget, finance or contact pages
+        self.valuable_paths = ['/budget', '/finance', '/financial', '/report', '/contact', '/staff', '/department']
+        
+        # Single matcher for keywords and paths, compiled once per process
+        self.keywords = frozenset(keyword.lower() for keyword in HIGH_VALUE_KEYWORDS)
+        self.matcher = get_keyword_matcher(tuple(HIGH_VALUE_KEYWORDS) + tuple(self.valuable_paths))
+        
         # Initialize set to track processed URLs
-        self.processed_urls = set()
+        self.processed_urls = seen_set if seen_set is not None else MemorySeenSet()
+        
+        # URLs handed downstream but not stored yet; mark_seen() moves them to the seen-set
+        self.pending_urls: Set[str] = set()
+        
+    def close(self):
+        """Persist and release the processed URL set"""
+        self.processed_urls.close()
+        
+    def mark_seen(self, links: Iterable[LinkRecord]) -> None:
+        """
+        Mark processed links as seen once they are stored
+        
+        Until then their URLs are only pending: the rest of the crawl skips
+        them, but a crawl that fails before storing them processes them again
+        on the next run.
+        
+        Args:
+            links: Stored link records
+        """
+        for link in links:
+            self.pending_urls.discard(link.url)
+            self.processed_urls.add(link.url)
+            
+    def _unseen_urls(self, urls: Iterable[str]) -> Set[str]:
+        """
+        Find the URLs neither seen before nor pending, with one seen-set lookup
+        
+        Args:
+            urls: Normalized URLs of a chunk of links
+            
+        Returns:
+            Set of new URLs
+        """
+        candidates = {url for url in urls if url not in self.pending_urls}
+        return candidates - self.processed_urls.seen_among(candidates)
         
     def normalize_url(self, url: str, base_url: str) -> str:
         """
-        Normalize URL by resolving relative paths and removing fragments
+        Normalize URL by resolving relative paths and canonicalizing the result
+        
+        Equivalent spellings of a link (scheme/host case, www., default port,
+        tracking parameters, query order, duplicate or trailing slashes and
+        fragments) collapse to one URL. Results are memoized.
         
         Args:
             url: URL to normalize
@@ -31,16 +116,7 @@ class LinkProcessor:
         Returns:
             Normalized URL
         """
-        # Handle relative URLs
-        full_url = urljoin(base_url, url)
-        
-        # Parse URL
-        parsed = urlparse(full_url)
-        
-        # Remove fragments
-        normalized = parsed._replace(fragment='').geturl()
-        
-        return normalized
+        return resolve_url(url, base_url)
         
     def is_document_link(self, url: str) -> bool:
         """
@@ -70,9 +146,63 @@ class LinkProcessor:
         if self.is_document_link(url):
             return 0.9
         
-        # Check for valuable keywords in URL
+        return self._assess(url.lower())
+        
+    def score_urls(self, urls: List[str]) -> List[float]:
+        """
+        Make initial value assessments for many URLs at once
+        
+        Args:
+            urls: URLs to assess
+            
+        Returns:
+            Initial value scores (0.0 to 1.0), in input order
+        """
+        is_document_link = self.is_document_link
+        assess = self._assess
+        return [0.9 if is_document_link(url) else assess(url.lower()) for url in urls]
+        
+    def crawl_priority(self, url: str) -> float:
+        """
+        Score a page URL for the crawl frontier
+        
+        Keyword-first, without the .gov depth bonus of the initial value
+        assessment, which would rank deep news and calendar pages above
+        sections like /finance/budget. Each path segment that is a date or
+        numeric ID lowers the priority.
+        
+        Args:
+            url: URL to score
+            
+        Returns:
+            Crawl priority (0.0 to 1.0, higher is crawled first)
+        """
         url_lower = url.lower()
+        found = self.matcher.find_all(url_lower)
+        keyword_count = len(found & self.keywords)
+        
+        if keyword_count > 0:
+            priority = min(0.5 + (keyword_count * 0.1), 0.9)
+        elif any(valuable_path in found for valuable_path in self.valuable_paths):
+            priority = 0.7
+        else:
+            priority = 0.4
+            
+        serial_segments = sum(1 for segment in urlparse(url_lower).path.split('/')
+                              if SERIAL_SEGMENT.search(segment) or HEX_ID.fullmatch(segment))
+        return max(priority - serial_segments * SERIAL_SEGMENT_PENALTY, 0.0)
+        
+    def _assess(self, url_lower: str, found: Optional[Set[str]] = None) -> float:
+        """
+        Score a non-document URL from the keywords and paths it contains
         
+        Args:
+            url_lower: Lowercased URL
+            found: Keywords and valuable paths found in the URL, matched here if not given
+            
+        Returns:
+            Initial value score (0.0 to 1.0)
+        """
         # For government sites, automatically assign higher value to deeper links
         if '.gov' in url_lower:
             # Higher value for deeper paths
@@ -80,22 +210,23 @@ class LinkProcessor:
             if path_depth >= 3:  # /path/to/something
                 return min(0.6 + (path_depth * 0.05), 0.9)
         
-        # Check for valuable keywords in URL
-        keyword_count = sum(1 for keyword in HIGH_VALUE_KEYWORDS if keyword in url_lower)
+        # Count valuable keywords in URL
+        if found is None:
+            found = self.matcher.find_all(url_lower)
+        keyword_count = len(found & self.keywords)
         
         # Calculate initial score based on keyword presence
         if keyword_count > 0:
             return min(0.5 + (keyword_count * 0.1), 0.9)
             
         # For budget-related folders, set higher score
-        for valuable_path in ['/budget', '/finance', '/financial', '/report', '/contact', '/staff', '/department']:
-            if valuable_path in url_lower:
-                return 0.7
+        if any(valuable_path in found for valuable_path in self.valuable_paths):
+            return 0.7
                 
         # Default score - more lenient now
         return 0.4  # Increased from 0.2 to send more links for AI analysis
         
-    def process_links(self, links: List[Dict], base_url: str) -> List[Dict]:
+    def process_links(self, links: List[Dict], base_url: str) -> List[LinkRecord]:
         """
         Process a list of links extracted from a page
         
@@ -104,38 +235,68 @@ class LinkProcessor:
             base_url: Base URL of the page
             
         Returns:
-            List of processed link dictionaries
+            List of processed link records
         """
-        processed_links = []
+        return [link for chunk in self.iter_process_links(links, base_url) for link in chunk]
         
-        for link in links:
-            url = link.get('url', '')
+    def iter_process_links(self, links: Iterable[Dict], base_url: str,
+                           chunk_size: int = LINK_CHUNK_SIZE) -> Iterator[List[LinkRecord]]:
+        """
+        Process links lazily, yielding processed links chunk by chunk
+        
+        Downstream scoring and storage can start on the first chunk while the
+        rest of the links are still being processed.
+        
+        Args:
+            links: Link dictionaries, possibly a generator
+            base_url: Base URL of the page
+            chunk_size: Maximum number of input links per chunk
             
-            # Skip empty URLs
-            if not url:
-                continue
+        Yields:
+            Non-empty lists of processed link records
+        """
+        for chunk in chunked(links, chunk_size):
+            processed_links = self._process_chunk(chunk, base_url)
+            if processed_links:
+                yield processed_links
                 
-            # Normalize URL
-            normalized_url = self.normalize_url(url, base_url)
+    def _process_chunk(self, links: List[Dict], base_url: str) -> List[LinkRecord]:
+        """
+        Normalize, deduplicate and score one chunk of links
+        
+        Args:
+            links: List of link dictionaries
+            base_url: Base URL of the page
             
-            # Skip already processed URLs
-            if normalized_url in self.processed_urls:
+        Returns:
+            List of processed link records
+        """
+        processed_links = []
+        
+        # Normalize URLs, skipping empty ones
+        normalized = [(link, self.normalize_url(link['url'], base_url)) for link in links if link.get('url')]
+        new_urls = self._unseen_urls(normalized_url for _, normalized_url in normalized)
+        
+        for link, normalized_url in normalized:
+            # Skip already processed URLs and repeats within the chunk
+            if normalized_url not in new_urls:
                 continue
-                
-            # Mark as processed
-            self.processed_urls.add(normalized_url)
+            new_urls.discard(normalized_url)
+            
+            # Skipped by the rest of the crawl, but only marked seen once stored
+            self.pending_urls.add(normalized_url)
             
             # Make initial value assessment
             initial_value = self.initial_value_assessment(normalized_url)
             
             # Create processed link entry
-            processed_link = {
-                'url': normalized_url,
-                'source_url': link.get('source_url', base_url),
-                'page_title': link.get('page_title', ''),
-                'is_document': self.is_document_link(normalized_url),
-                'initial_value': initial_value
-            }
+            processed_link = LinkRecord(
+                url=normalized_url,
+                source_url=link.get('source_url', base_url),
+                page_title=link.get('page_title', ''),
+                is_document=self.is_document_link(normalized_url),
+                initial_value=initial_value
+            )
             
             processed_links.append(processed_link)
             
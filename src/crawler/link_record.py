@@ -0,0 +1,122 @@
+import sys
+from typing import Any, Dict, Optional
+
+# Relevance fields filled in by link analysis
+RELEVANCE_FIELDS = (
+    'contact_relevance', 'financial_relevance', 'official_relevance',
+    'overall_relevance', 'primary_category', 'rationale'
+)
+
+# Rationales of links left with their heuristic score because analysis failed
+# or the scoring budget ran out; the model still has to score them
+ANALYSIS_ERROR_RATIONALE = "Error during analysis"
+BUDGET_EXHAUSTED_RATIONALE = "Scoring budget exhausted"
+UNSCORED_RATIONALES = (ANALYSIS_ERROR_RATIONALE, BUDGET_EXHAUSTED_RATIONALE)
+
+# Prefix of the rationale of a link given its cluster representative's score;
+# these copies are not independent labels and are left out of training
+PROPAGATED_RATIONALE_PREFIX = "Cluster: "
+
+
+class LinkRecord:
+    """
+    Compact record for one link moving through processing, analysis and storage
+    
+    Uses __slots__ instead of a per-link dict, which keeps memory per link to a
+    fraction of a dict with the same fields. get(), update() and item access
+    mirror the dict interface so code written against link dictionaries keeps
+    working; convert with to_dict()/from_dict() at the API and database edges.
+    """
+    
+    __slots__ = (
+        'url', 'source_url', 'page_title', 'is_document', 'initial_value',
+        'contact_relevance', 'financial_relevance', 'official_relevance',
+        'overall_relevance', 'primary_category', 'rationale', 'metadata'
+    )
+    _fields = frozenset(__slots__)
+    
+    def __init__(self, url: str, source_url: str = '', page_title: str = '', is_document: bool = False,
+                 initial_value: float = 0.0, contact_relevance: float = 0.0,
+                 financial_relevance: float = 0.0, official_relevance: float = 0.0,
+                 overall_relevance: float = 0.0, primary_category: str = 'other',
+                 rationale: str = '', metadata: Optional[Dict] = None):
+        self.url = url
+        self.source_url = source_url
+        self.page_title = page_title
+        self.is_document = is_document
+        self.initial_value = initial_value
+        self.contact_relevance = contact_relevance
+        self.financial_relevance = financial_relevance
+        self.official_relevance = official_relevance
+        self.overall_relevance = overall_relevance
+        # Links loaded from the database may have no category
+        if isinstance(primary_category, str):
+            primary_category = sys.intern(primary_category)
+        self.primary_category = primary_category
+        self.rationale = rationale
+        self.metadata = metadata
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'LinkRecord':
+        """
+        Create a record from a link dictionary, ignoring unknown keys
+        
+        Args:
+            data: Link dictionary
+        
+        Returns:
+            Link record
+        """
+        return cls(**{key: value for key, value in data.items() if key in cls._fields})
+    
+    @classmethod
+    def coerce(cls, link: Any) -> 'LinkRecord':
+        """Return a link as a LinkRecord, converting dictionaries"""
+        return link if isinstance(link, cls) else cls.from_dict(link)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the record to a link dictionary"""
+        return {key: getattr(self, key) for key in self.__slots__}
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get a field like dict.get"""
+        return getattr(self, key, default) if key in self._fields else default
+    
+    def update(self, data: Optional[Dict[str, Any]] = None, **fields: Any) -> None:
+        """
+        Set fields from a dictionary and/or keyword arguments like dict.update
+        
+        Keys that are not record fields (e.g. extra keys in an AI response)
+        are ignored.
+        
+        Args:
+            data: Field values to set
+            **fields: More field values to set
+        """
+        for key, value in dict(data or {}, **fields).items():
+            if key in self._fields:
+                setattr(self, key, value)
+        if isinstance(self.primary_category, str):
+            self.primary_category = sys.intern(self.primary_category)
+    
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._fields:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in self._fields:
+            raise KeyError(key)
+        setattr(self, key, value)
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self._fields
+    
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, LinkRecord):
+            return NotImplemented
+        return all(getattr(self, key) == getattr(other, key) for key in self.__slots__)
+    
+    def __repr__(self) -> str:
+        return f"LinkRecord(url={self.url!r}, overall_relevance={self.overall_relevance!r})"
+
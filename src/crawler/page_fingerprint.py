@@ -0,0 +1,53 @@
+import hashlib
+from typing import Dict, Optional
+
+def page_fingerprint(page: Dict) -> Dict[str, Optional[str]]:
+    """
+    Compute the fingerprint of a crawled page
+    
+    Args:
+        page: Dictionary containing crawled page data
+        
+    Returns:
+        Dictionary with the page URL, a SHA-256 of its content and any HTTP validators
+    """
+    metadata = page.get('metadata') or {}
+    
+    # Hash the markdown, falling back to html and then the link list
+    content = page.get('markdown') or page.get('html')
+    if not content and page.get('links'):
+        content = '\n'.join(sorted(link for link in page['links'] if link))
+    content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest() if content else None
+    
+    return {
+        'url': metadata.get('sourceURL') or metadata.get('url'),
+        'content_hash': content_hash,
+        'etag': metadata.get('etag') or metadata.get('ETag'),
+        'last_modified': metadata.get('lastModified') or metadata.get('last-modified')
+    }
+
+
+def is_unchanged(fingerprint: Dict[str, Optional[str]], etag: Optional[str] = None,
+                 last_modified: Optional[str] = None, content_hash: Optional[str] = None) -> bool:
+    """
+    Compare a fresh fingerprint with a stored one
+    
+    The content hash is authoritative when both sides have one; HTTP
+    validators are used for pages fetched without a body.
+    
+    Args:
+        fingerprint: Fingerprint of the freshly crawled page
+        etag: Stored ETag
+        last_modified: Stored Last-Modified value
+        content_hash: Stored content hash
+        
+    Returns:
+        True if the page has not changed since it was stored
+    """
+    if fingerprint.get('content_hash') and content_hash:
+        return fingerprint['content_hash'] == content_hash
+    if fingerprint.get('etag') and etag:
+        return fingerprint['etag'] == etag
+    if fingerprint.get('last_modified') and last_modified:
+        return fingerprint['last_modified'] == last_modified
+    return False
@@ -0,0 +1,181 @@
+import logging
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from itertools import chain
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.config import LINK_CHUNK_SIZE, LINK_WORKERS
+from src.crawler.link_processor import LinkProcessor, chunked
+from src.crawler.link_record import LinkRecord
+from src.crawler.seen_set import SeenSet
+
+logger = logging.getLogger(__name__)
+
+# Link processor of the current worker process, created on first use
+_worker_processor: Optional[LinkProcessor] = None
+
+
+def _score_chunk(urls: List[str], base_url: str) -> List[Optional[Tuple[str, bool, float]]]:
+    """
+    Normalize and score raw link URLs in a worker process
+    
+    Args:
+        urls: Raw URLs as found on the page (may be empty)
+        base_url: Base URL of the page
+    
+    Returns:
+        (normalized URL, is document, initial value) per input URL, None for empty URLs
+    """
+    global _worker_processor
+    if _worker_processor is None:
+        _worker_processor = LinkProcessor()
+    processor = _worker_processor
+    
+    results = []
+    for url in urls:
+        if not url:
+            results.append(None)
+            continue
+        normalized_url = processor.normalize_url(url, base_url)
+        results.append((normalized_url, processor.is_document_link(normalized_url),
+                        processor.initial_value_assessment(normalized_url)))
+    return results
+
+
+def create_link_pool(workers: int = LINK_WORKERS) -> Optional[Executor]:
+    """
+    Create a process pool for link processing
+    
+    Args:
+        workers: Number of worker processes
+    
+    Returns:
+        Process pool, or None if workers is 1 or less
+    """
+    if workers <= 1:
+        return None
+    logger.info(f"Starting link processing pool with {workers} workers")
+    return ProcessPoolExecutor(max_workers=workers)
+
+
+class ParallelLinkProcessor(LinkProcessor):
+    """Link processor that normalizes and scores chunks of links in worker processes"""
+    
+    def __init__(self, seen_set: Optional[SeenSet] = None, workers: int = LINK_WORKERS,
+                 executor: Optional[Executor] = None):
+        """
+        Initialize parallel link processor
+        
+        Args:
+            seen_set: Set of already processed URLs (defaults to an in-memory set)
+            workers: Number of worker processes (size of the executor, if given)
+            executor: Process pool shared with other processors; closing this
+                      processor leaves a shared pool running
+        """
+        super().__init__(seen_set=seen_set)
+        self._owns_executor = executor is None
+        self.executor = executor or ProcessPoolExecutor(max_workers=workers)
+        self.workers = workers
+    
+    def close(self):
+        """Persist the processed URL set and stop the worker pool if owned"""
+        super().close()
+        if self._owns_executor:
+            self.executor.shutdown()
+    
+    def iter_process_links(self, links: Iterable[Dict], base_url: str,
+                           chunk_size: int = LINK_CHUNK_SIZE) -> Iterator[List[LinkRecord]]:
+        """
+        Process links across worker processes, yielding processed links chunk by chunk
+        
+        Workers only normalize and score. Deduplication against the seen-set
+        happens here, in input order, so results are the same as the serial
+        processor's no matter how chunks are spread over workers. Pages with
+        a single chunk of links are processed in-process, where the pool's
+        overhead would outweigh its benefit.
+        
+        Args:
+            links: Link dictionaries, possibly a generator
+            base_url: Base URL of the page
+            chunk_size: Maximum number of input links per chunk
+        
+        Yields:
+            Non-empty lists of processed link records, in input order
+        """
+        chunks = chunked(links, chunk_size)
+        first = next(chunks, None)
+        if first is None:
+            return
+        second = next(chunks, None)
+        if second is None:
+            processed_links = self._process_chunk(first, base_url)
+            if processed_links:
+                yield processed_links
+            return
+        
+        # Keep a bounded number of chunks in flight so memory stays flat on huge inputs
+        pending = deque()
+        for chunk in chain([first, second], chunks):
+            urls = [link.get('url', '') for link in chunk]
+            pending.append((chunk, self.executor.submit(_score_chunk, urls, base_url)))
+            if len(pending) >= self.workers * 2:
+                processed_links = self._collect(*pending.popleft(), base_url)
+                if processed_links:
+                    yield processed_links
+        
+        while pending:
+            processed_links = self._collect(*pending.popleft(), base_url)
+            if processed_links:
+                yield processed_links
+    
+    def _collect(self, links: List[Dict], scored: Future, base_url: str) -> List[LinkRecord]:
+        """
+        Deduplicate a scored chunk against the seen-set and build processed links
+        
+        Args:
+            links: Link dictionaries of the chunk
+            scored: Future with the worker's results for the chunk
+            base_url: Base URL of the page
+        
+        Returns:
+            List of processed link records
+        """
+        processed_links = []
+        
+        results = [(link, result) for link, result in zip(links, scored.result()) if result is not None]
+        new_urls = self._unseen_urls(result[0] for _, result in results)
+        
+        for link, (normalized_url, is_document, initial_value) in results:
+            # Skip already processed URLs and repeats within the chunk
+            if normalized_url not in new_urls:
+                continue
+            new_urls.discard(normalized_url)
+            self.pending_urls.add(normalized_url)
+            
+            processed_links.append(LinkRecord(
+                url=normalized_url,
+                source_url=link.get('source_url', base_url),
+                page_title=link.get('page_title', ''),
+                is_document=is_document,
+                initial_value=initial_value
+            ))
+        
+        return processed_links
+
+
+def create_link_processor(seen_set: Optional[SeenSet] = None, workers: int = LINK_WORKERS,
+                          executor: Optional[Executor] = None) -> LinkProcessor:
+    """
+    Create a serial or parallel link processor
+    
+    Args:
+        seen_set: Set of already processed URLs
+        workers: Number of worker processes; 1 or less processes links in-process
+        executor: Process pool shared with other processors
+    
+    Returns:
+        Link processor
+    """
+    if executor is None and workers <= 1:
+        return LinkProcessor(seen_set=seen_set)
+    return ParallelLinkProcessor(seen_set=seen_set, workers=workers, executor=executor)
@@ -0,0 +1,340 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, TypeVar
+
+from src.config import (
+    CRAWL_LIMIT, OPENAI_BATCH_SIZE, OPENAI_CONCURRENCY, SCORING_QUEUE_MAX_LINKS, SCORING_FLUSH_SECONDS
+)
+from src.crawler.base_crawler import BaseCrawler
+from src.crawler.document_probe import DocumentProbe
+from src.crawler.link_processor import LinkProcessor
+from src.crawler.link_record import UNSCORED_RATIONALES
+from src.crawler.page_fingerprint import page_fingerprint, is_unchanged
+from src.ai.llm_metrics import crawl_context, new_crawl_id
+from src.ai.openai_service import OpenAIService
+from src.ai.scoring_budget import ScoringBudget, ScoringQueue
+from src.storage.models import Website
+from src.storage.repository import LinkRepository
+from src.storage.write_queue import DatabaseWriter
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+# Deferred links scored per batch_analyze_links call: enough to keep every request slot busy
+DEFERRED_CHUNK_SIZE = OPENAI_BATCH_SIZE * OPENAI_CONCURRENCY
+
+class CrawlPipeline:
+    """Crawl a website and score and store its links as pages arrive"""
+    
+    def __init__(self, crawler: BaseCrawler, processor: LinkProcessor,
+                 ai_service: OpenAIService, repo: LinkRepository, incremental: bool = True,
+                 probe: Optional[DocumentProbe] = None, budget: Optional[ScoringBudget] = None,
+                 writer: Optional[DatabaseWriter] = None):
+        """
+        Initialize pipeline with its services
+        
+        Args:
+            crawler: Crawler backend yielding page dictionaries
+            processor: Link processor
+            ai_service: OpenAI service used to score links
+            repo: Link repository
+            incremental: Skip pages whose fingerprint matches the previous crawl
+            probe: Document probe used to find documents behind extension-less links
+            budget: Cap on the LLM calls, tokens and time spent scoring this crawl;
+                links are then queued and scored most promising first
+            writer: Writer thread running this crawl's database writes (written through `repo` if None)
+        """
+        self.crawler = crawler
+        self.processor = processor
+        self.ai_service = ai_service
+        self.repo = repo
+        self.incremental = incremental
+        self.probe = probe
+        self.budget = budget
+        self.writer = writer
+        
+        # Links and pages of a budgeted crawl waiting to be scored
+        self.deferred: Optional[ScoringQueue] = None
+        self.deferred_unscored: Set[str] = set()
+        self.pending_pages: List[tuple] = []
+        self.last_flush = 0.0
+        
+    def run(self, url: str, limit: int = CRAWL_LIMIT) -> Dict[str, Any]:
+        """
+        Crawl a website and store high-value links
+        
+        Each page is processed, scored and stored as soon as the crawler
+        yields it, so link analysis overlaps with the crawl itself. With a
+        scoring budget, links are queued instead and scored highest initial
+        value first: the best queued links are stored whenever the queue
+        outgrows SCORING_QUEUE_MAX_LINKS or SCORING_FLUSH_SECONDS pass, and
+        the rest once the crawl is done.
+        
+        Args:
+            url: URL to crawl
+            limit: Maximum number of pages to crawl
+            
+        Returns:
+            Summary dictionary with page and link counts
+        """
+        website, summary, fingerprints = self._start(url)
+        
+        for page in self.crawler.iter_crawl_pages(url, limit=limit):
+            self._process_page(page, url, website, summary, fingerprints)
+        self._score_deferred(url, website, summary)
+            
+        return self._finish(summary)
+        
+    async def arun(self, url: str, limit: int = CRAWL_LIMIT) -> Dict[str, Any]:
+        """
+        Async variant of run for crawling many sites concurrently
+        
+        Pages are received on the event loop; processing, scoring and storage
+        run in a worker thread so other crawls keep making progress.
+        
+        Args:
+            url: URL to crawl
+            limit: Maximum number of pages to crawl
+            
+        Returns:
+            Summary dictionary with page and link counts
+        """
+        website, summary, fingerprints = await asyncio.to_thread(self._start, url)
+        
+        async for page in self.crawler.aiter_crawl_pages(url, limit=limit):
+            await asyncio.to_thread(self._process_page, page, url, website, summary, fingerprints)
+        await asyncio.to_thread(self._score_deferred, url, website, summary)
+            
+        return self._finish(summary)
+        
+    def _start(self, url: str):
+        """
+        Get the website record, an empty summary and stored page fingerprints for a crawl
+        
+        Args:
+            url: URL to crawl
+            
+        Returns:
+            Tuple of (Website record, summary dictionary, fingerprints by page URL)
+        """
+        # Get or create website record
+        website = self._write(lambda repo: repo.get_or_create_website(url))
+        self.deferred = ScoringQueue() if self.budget is not None else None
+        self.deferred_unscored = set()
+        self.pending_pages = []
+        self.last_flush = time.monotonic()
+        
+        summary = {
+            'url': url,
+            'crawl_id': new_crawl_id(),
+            'website_id': website.id,
+            'pages_crawled': 0,
+            'pages_unchanged': 0,
+            'pages_incomplete': 0,
+            'links_found': 0,
+            'links_stored': 0
+        }
+        
+        fingerprints = {}
+        if self.incremental:
+            fingerprints = {
+                page.url: {
+                    'content_hash': page.content_hash,
+                    'etag': page.etag,
+                    'last_modified': page.last_modified
+                }
+                for page in self.repo.get_page_fingerprints(website).values()
+            }
+            
+        return website, summary, fingerprints
+        
+    def _finish(self, summary: Dict[str, Any]) -> Dict[str, Any]:
+        """Log the end of a crawl and return its summary"""
+        if not summary['pages_crawled']:
+            logger.warning(f"No pages crawled for URL: {summary['url']}")
+        if self.budget is not None:
+            summary['scoring_budget'] = self.budget.stats()
+        return summary
+        
+    def _process_page(self, page: Dict, base_url: str, website: Website, summary: Dict[str, Any],
+                      fingerprints: Dict[str, Dict]) -> None:
+        """
+        Process, score and store the links of one crawled page
+        
+        Args:
+            page: Dictionary containing crawled page data
+            base_url: URL the crawl started from
+            website: Website record to associate links with
+            summary: Crawl summary, updated in place
+            fingerprints: Fingerprints stored by the previous crawl, by page URL
+        """
+        summary['pages_crawled'] += 1
+        
+        # Skip pages that have not changed since the last crawl
+        fingerprint = page_fingerprint(page)
+        stored = fingerprints.get(fingerprint['url'])
+        if stored and is_unchanged(fingerprint, **stored):
+            summary['pages_unchanged'] += 1
+            logger.debug(f"Skipping unchanged page {fingerprint['url']}")
+            return
+            
+        # Process, score and store the page's links chunk by chunk
+        link_count = 0
+        link_urls = []
+        unscored = set()
+        for processed_links in self.processor.iter_process_links(self.page_links(page, base_url), base_url):
+            link_count += len(processed_links)
+            summary['links_found'] += len(processed_links)
+            if self.deferred is not None:
+                self._defer_links(processed_links)
+                link_urls.extend(link.url for link in processed_links)
+            else:
+                unscored |= self._store_links(processed_links, base_url, website, summary)
+                
+        if self.deferred is not None:
+            self.pending_pages.append((fingerprint, link_count, link_urls))
+            self._flush_deferred(base_url, website, summary)
+        else:
+            self._save_fingerprint(fingerprint, website, link_count, not unscored, summary)
+            
+    def _defer_links(self, processed_links: List[Dict]) -> None:
+        """
+        Queue processed links to be scored by a budgeted crawl
+        
+        Args:
+            processed_links: Links returned by the link processor
+        """
+        # Probe now so documents are ranked by their final initial value
+        if self.probe is not None:
+            self.probe.annotate(processed_links)
+        self.deferred.push(processed_links)
+        
+    def _score_deferred(self, base_url: str, website: Website, summary: Dict[str, Any]) -> None:
+        """
+        Score and store the links still queued by a budgeted crawl, then fingerprint their pages
+        
+        Args:
+            base_url: URL the crawl started from
+            website: Website record to associate links with
+            summary: Crawl summary, updated in place
+        """
+        if self.deferred is None:
+            return
+            
+        self._flush_deferred(base_url, website, summary, final=True)
+        for fingerprint, link_count, link_urls in self.pending_pages:
+            complete = self.deferred_unscored.isdisjoint(link_urls)
+            self._save_fingerprint(fingerprint, website, link_count, complete, summary)
+        self.pending_pages = []
+        
+    def _flush_deferred(self, base_url: str, website: Website, summary: Dict[str, Any],
+                        final: bool = False) -> None:
+        """
+        Score and store the best queued links of a budgeted crawl
+        
+        During the crawl, chunks are taken off the queue while it holds more
+        than SCORING_QUEUE_MAX_LINKS links, and at least one chunk every
+        SCORING_FLUSH_SECONDS, so a crawl that is interrupted still leaves its
+        best links stored. Pages are fingerprinted once the crawl is done.
+        
+        Args:
+            base_url: URL the crawl started from
+            website: Website record to associate links with
+            summary: Crawl summary, updated in place
+            final: Empty the queue
+        """
+        due = time.monotonic() - self.last_flush >= SCORING_FLUSH_SECONDS
+        while self.deferred and (final or due or len(self.deferred) > SCORING_QUEUE_MAX_LINKS):
+            chunk = self.deferred.pop(DEFERRED_CHUNK_SIZE)
+            self.deferred_unscored |= self._store_links(chunk, base_url, website, summary, probed=True)
+            self.last_flush = time.monotonic()
+            due = False
+        
+    def _save_fingerprint(self, fingerprint: Dict[str, Any], website: Website, link_count: int,
+                          complete: bool, summary: Dict[str, Any]) -> None:
+        """
+        Record a page's fingerprint once its links are stored and scored
+        
+        Pages with links left unscored are not fingerprinted, so the next
+        crawl processes them again.
+        
+        Args:
+            fingerprint: Fingerprint of the crawled page
+            website: Website record the page belongs to
+            link_count: Number of links found on the page
+            complete: Whether every link of the page was scored
+            summary: Crawl summary, updated in place
+        """
+        if not complete:
+            summary['pages_incomplete'] += 1
+            logger.info(f"Not fingerprinting {fingerprint['url']}: some links were not scored")
+        elif fingerprint['url']:
+            self._write(lambda repo: repo.save_page_fingerprint(fingerprint, website, link_count=link_count))
+            
+    def _store_links(self, processed_links: List[Dict], base_url: str, website: Website,
+                     summary: Dict[str, Any], probed: bool = False) -> Set[str]:
+        """
+        Score and store processed links
+        
+        Args:
+            processed_links: Links returned by the link processor
+            base_url: URL the crawl started from
+            website: Website record to associate links with
+            summary: Crawl summary, updated in place
+            probed: Whether the document probe already ran on these links
+            
+        Returns:
+            URLs of links left unscored (not scored by the model, the cache or a heuristic)
+        """
+        # Find documents served from extension-less download URLs
+        if self.probe is not None and not probed:
+            self.probe.annotate(processed_links)
+            
+        # Analyze links with OpenAI, attributing the calls to this crawl
+        with crawl_context(summary['crawl_id'], website.id):
+            enriched_links = self.ai_service.batch_analyze_links(processed_links, budget=self.budget)
+        
+        # Store links in database
+        stats = self._write(lambda repo: repo.bulk_upsert_links(enriched_links, website))
+        inserted = sum(chunk['inserted'] for chunk in stats)
+        updated = sum(chunk['updated'] for chunk in stats)
+        summary['links_stored'] += inserted + updated
+        
+        logger.info(f"{base_url} page {summary['pages_crawled']}: stored {inserted + updated} links "
+                    f"({inserted} new, {updated} updated; {summary['links_stored']} total)")
+        
+        # Only stored, scored links count as seen; unscored ones are processed again next run
+        unscored = {link.url for link in enriched_links if link.rationale in UNSCORED_RATIONALES}
+        self.processor.mark_seen(link for link in enriched_links if link.url not in unscored)
+        return unscored
+        
+    def _write(self, job: Callable[[LinkRepository], T]) -> T:
+        """Run a database write on the writer thread, or directly without one"""
+        if self.writer is not None:
+            return self.writer.call(job)
+        return job(self.repo)
+        
+    def page_links(self, page: Dict, base_url: str) -> List[Dict]:
+        """
+        Get raw link entries for a crawled page
+        
+        Args:
+            page: Dictionary containing crawled page data
+            base_url: URL the crawl started from
+            
+        Returns:
+            List of dictionaries with link information
+        """
+        # Firecrawl may already extract links for us
+        if 'links' in page:
+            return self.crawler.extract_links(page)
+            
+        # Otherwise use the page itself as a link
+        metadata = page.get('metadata', {})
+        return [{
+            'url': metadata.get('sourceURL', ''),
+            'source_url': base_url,
+            'page_title': metadata.get('title', '')
+        }]
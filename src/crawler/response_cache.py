@@ -0,0 +1,179 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from src.config import FIRECRAWL_CACHE_DIR, FIRECRAWL_CACHE_TTL, FIRECRAWL_CACHE_MAX_BYTES
+
+logger = logging.getLogger(__name__)
+
+class ResponseCache:
+    """On-disk, gzip-compressed cache of API responses with TTL and LRU eviction"""
+    
+    def __init__(self, cache_dir: str = FIRECRAWL_CACHE_DIR, ttl: float = FIRECRAWL_CACHE_TTL,
+                 max_bytes: int = FIRECRAWL_CACHE_MAX_BYTES):
+        """
+        Initialize cache directory
+        
+        Args:
+            cache_dir: Directory where cache entries are stored
+            ttl: Seconds an entry stays valid
+            max_bytes: Total size of entries above which the least recently used are evicted
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        
+        os.makedirs(cache_dir, exist_ok=True)
+        self._size = sum(os.path.getsize(path) for path in self._entry_paths())
+        
+    def make_key(self, kind: str, url: str, params: Optional[Dict] = None) -> str:
+        """
+        Build a cache key from a request
+        
+        Args:
+            kind: Request type, e.g. 'scrape' or 'crawl'
+            url: Requested URL
+            params: Request parameters
+            
+        Returns:
+            Hex digest identifying the request
+        """
+        request = json.dumps([kind, url, params or {}], sort_keys=True)
+        return hashlib.sha256(request.encode('utf-8')).hexdigest()
+        
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get a cached value
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Cached value, or None if missing or expired
+        """
+        path = self._path(key)
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self._record(hit=False)
+            return None
+            
+        if time.time() - entry.get('created_at', 0) > self.ttl:
+            self._remove(path)
+            self._record(hit=False)
+            return None
+            
+        # Touch the entry so eviction treats it as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+            
+        self._record(hit=True)
+        return entry.get('value')
+        
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store a value in the cache
+        
+        Args:
+            key: Cache key
+            value: JSON-serializable value
+        """
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        
+        # Write to a temporary file first so readers never see a partial entry
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+                json.dump({'created_at': time.time(), 'value': value}, f)
+                
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+            
+            with self._lock:
+                self._size += os.path.getsize(path) - old_size
+        except (OSError, TypeError, ValueError) as e:
+            logger.error(f"Error writing cache entry {key}: {str(e)}")
+            self._remove(tmp_path)
+            return
+            
+        if self._size > self.max_bytes:
+            self._evict()
+            
+    def clear(self) -> None:
+        """Remove all cache entries"""
+        for path in list(self._entry_paths()):
+            self._remove(path)
+            
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+        
+        Returns:
+            Dictionary with hit/miss counts, hit rate and size in bytes
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size_bytes': self._size
+        }
+        
+    def _evict(self) -> None:
+        """Remove least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        for path in self._entry_paths():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, path))
+            
+        entries.sort()
+        for _, path in entries:
+            if self._size <= self.max_bytes:
+                break
+            self._remove(path)
+            
+    def _remove(self, path: str) -> None:
+        """Delete a cache file and update the tracked size"""
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return
+        if path.endswith('.json.gz'):
+            with self._lock:
+                self._size -= size
+                
+    def _record(self, hit: bool) -> None:
+        """Update hit/miss counters"""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+                
+    def _path(self, key: str) -> str:
+        """Get the file path of an entry, sharded by key prefix"""
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json.gz")
+        
+    def _entry_paths(self):
+        """Iterate over the file paths of all cache entries"""
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith('.json.gz'):
+                    yield os.path.join(root, name)
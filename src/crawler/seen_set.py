@@ -0,0 +1,280 @@
+import hashlib
+import logging
+import math
+import mmap
+import os
+import struct
+import threading
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Iterable, List, Optional, Set
+
+from src.config import SEEN_SET_BACKEND, SEEN_SET_CAPACITY, SEEN_SET_ERROR_RATE, SEEN_SET_PATH
+
+if TYPE_CHECKING:
+    from src.storage.write_queue import DatabaseWriter
+
+logger = logging.getLogger(__name__)
+
+SEEN_SET_BACKENDS = ['memory', 'bloom', 'database']
+
+class SeenSet(ABC):
+    """Set of URLs that have already been processed"""
+    
+    @abstractmethod
+    def __contains__(self, url: str) -> bool:
+        """Check whether a URL has been seen"""
+        
+    @abstractmethod
+    def add(self, url: str) -> None:
+        """Mark a URL as seen"""
+        
+    def seen_among(self, urls: Iterable[str]) -> Set[str]:
+        """
+        Find which of several URLs have been seen
+        
+        Args:
+            urls: URLs to check
+            
+        Returns:
+            Set of the URLs already seen
+        """
+        return {url for url in urls if url in self}
+        
+    def flush(self) -> None:
+        """Persist pending additions"""
+        
+    def close(self) -> None:
+        """Persist pending additions and release resources"""
+        self.flush()
+
+
+class MemorySeenSet(set, SeenSet):
+    """Exact in-memory seen-set for a single process (the default)"""
+    
+    # set already provides __contains__ and add
+    __contains__ = set.__contains__
+    add = set.add
+    
+    def seen_among(self, urls: Iterable[str]) -> Set[str]:
+        return set.intersection(self, urls)
+
+
+class BloomSeenSet(SeenSet):
+    """
+    Fixed-size Bloom filter seen-set
+    
+    Memory stays constant regardless of how many URLs are added; a URL is
+    wrongly reported as seen with probability ``error_rate`` once ``capacity``
+    URLs have been added. When ``path`` is given, the bit array lives in a
+    memory-mapped file so the filter persists across runs.
+    """
+    
+    MAGIC = b'HVLBLOOM'
+    HEADER = struct.Struct('<8sQI')
+    
+    def __init__(self, capacity: int = SEEN_SET_CAPACITY, error_rate: float = SEEN_SET_ERROR_RATE,
+                 path: Optional[str] = None):
+        """
+        Initialize Bloom filter
+        
+        Args:
+            capacity: Expected number of URLs
+            error_rate: Target false positive rate at capacity
+            path: File to memory-map the filter to, or None to keep it in memory
+        """
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.path = path
+        self._file = None
+        self._lock = threading.Lock()
+        
+        if path:
+            self._bits = self._open_file(path)
+        else:
+            self._bits = bytearray((self.num_bits + 7) // 8)
+            self._offset = 0
+            
+        logger.info(f"Bloom seen-set: {self.num_bits // 8 / 1024 / 1024:.1f} MB, {self.num_hashes} hashes")
+        
+    def _open_file(self, path: str) -> mmap.mmap:
+        """
+        Memory-map the filter file, creating it if necessary
+        
+        Args:
+            path: Filter file path
+            
+        Returns:
+            Memory map over the whole file
+        """
+        self._offset = self.HEADER.size
+        
+        if os.path.exists(path) and os.path.getsize(path) >= self._offset:
+            self._file = open(path, 'r+b')
+            magic, num_bits, num_hashes = self.HEADER.unpack(self._file.read(self._offset))
+            if magic != self.MAGIC:
+                raise ValueError(f"{path} is not a Bloom seen-set file")
+                
+            # Keep the parameters the file was created with
+            self.num_bits, self.num_hashes = num_bits, num_hashes
+        else:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(path, 'w+b')
+            self._file.write(self.HEADER.pack(self.MAGIC, self.num_bits, self.num_hashes))
+            self._file.truncate(self._offset + (self.num_bits + 7) // 8)
+            self._file.flush()
+            
+        return mmap.mmap(self._file.fileno(), 0)
+        
+    def _positions(self, url: str):
+        """Bit positions of a URL, using double hashing over one 128-bit digest"""
+        digest = hashlib.blake2b(url.encode('utf-8'), digest_size=16).digest()
+        h1, h2 = struct.unpack('<QQ', digest)
+        h2 |= 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+            
+    def __contains__(self, url: str) -> bool:
+        bits = self._bits
+        offset = self._offset
+        return all(bits[offset + (position >> 3)] & (1 << (position & 7)) for position in self._positions(url))
+        
+    def add(self, url: str) -> None:
+        bits = self._bits
+        offset = self._offset
+        with self._lock:
+            for position in self._positions(url):
+                bits[offset + (position >> 3)] |= 1 << (position & 7)
+                
+    def flush(self) -> None:
+        if self._file is not None:
+            self._bits.flush()
+            
+    def close(self) -> None:
+        if self._file is not None:
+            self._bits.flush()
+            self._bits.close()
+            self._file.close()
+            self._file = None
+
+
+class DatabaseSeenSet(SeenSet):
+    """
+    Exact seen-set persisted in the links database
+    
+    URLs are stored as fixed-size hashes in the ``seen_urls`` table. Additions
+    are buffered and written in one transaction every ``flush_every`` URLs, so
+    memory stays bounded by the buffer size; the writes run on the database
+    writer thread with the crawl's other writes. Lookups for a chunk of links
+    are batched into ``IN`` queries by ``seen_among`` on a read-only session.
+    """
+    
+    # Hashes per IN query, well below SQLite's bound parameter limit
+    LOOKUP_BATCH_SIZE = 500
+    
+    def __init__(self, flush_every: int = 1000, writer: Optional['DatabaseWriter'] = None):
+        """
+        Initialize database seen-set
+        
+        Args:
+            flush_every: Number of buffered additions that triggers a write
+            writer: Thread running the writes (the process-wide writer if None)
+        """
+        from src.storage.models import get_session
+        from src.storage.write_queue import get_writer
+        
+        self.session = get_session()
+        self.writer = writer if writer is not None else get_writer()
+        self.flush_every = flush_every
+        self._pending = set()
+        self._lock = threading.Lock()
+        
+    @staticmethod
+    def _hash(url: str) -> str:
+        """Fixed-size key for a URL"""
+        return hashlib.blake2b(url.encode('utf-8'), digest_size=16).hexdigest()
+        
+    def __contains__(self, url: str) -> bool:
+        from src.storage.models import SeenUrl
+        
+        url_hash = self._hash(url)
+        with self._lock:
+            if url_hash in self._pending:
+                return True
+            return self.session.get(SeenUrl, url_hash) is not None
+            
+    def seen_among(self, urls: Iterable[str]) -> Set[str]:
+        from src.storage.models import SeenUrl
+        
+        hashes = {}
+        for url in urls:
+            hashes.setdefault(self._hash(url), url)
+        
+        with self._lock:
+            seen = {hashes[url_hash] for url_hash in self._pending.intersection(hashes)}
+            lookup = [url_hash for url_hash in hashes if url_hash not in self._pending]
+            for start in range(0, len(lookup), self.LOOKUP_BATCH_SIZE):
+                batch = lookup[start:start + self.LOOKUP_BATCH_SIZE]
+                seen.update(hashes[row.url_hash] for row in
+                            self.session.query(SeenUrl.url_hash).filter(SeenUrl.url_hash.in_(batch)))
+        return seen
+        
+    def add(self, url: str) -> None:
+        with self._lock:
+            self._pending.add(self._hash(url))
+            should_flush = len(self._pending) >= self.flush_every
+        if should_flush:
+            self.flush()
+            
+    @staticmethod
+    def _insert(session, pending: List[str]) -> None:
+        """Writer job: store the hashes not stored yet"""
+        from src.storage.models import SeenUrl
+        
+        existing = {
+            row.url_hash for row in
+            session.query(SeenUrl.url_hash).filter(SeenUrl.url_hash.in_(pending))
+        }
+        session.bulk_insert_mappings(
+            SeenUrl, [{'url_hash': url_hash} for url_hash in pending if url_hash not in existing]
+        )
+        session.commit()
+        
+    def flush(self) -> None:
+        with self._lock:
+            if not self._pending:
+                return
+            pending = list(self._pending)
+            
+            try:
+                self.writer.call(lambda repo: self._insert(repo.session, pending))
+                self._pending.clear()
+            except Exception as e:
+                logger.error(f"Error persisting seen URLs: {str(e)}")
+            finally:
+                # End the read transaction so lookups see the writer's commit
+                self.session.rollback()
+                
+    def close(self) -> None:
+        self.flush()
+        self.session.close()
+
+
+def create_seen_set(backend: str = SEEN_SET_BACKEND) -> SeenSet:
+    """
+    Create a seen-set for the configured backend
+    
+    Args:
+        backend: "memory", "bloom" (memory-mapped to SEEN_SET_PATH if set) or "database"
+        
+    Returns:
+        SeenSet instance
+    """
+    if backend == 'memory':
+        return MemorySeenSet()
+    if backend == 'bloom':
+        return BloomSeenSet(path=SEEN_SET_PATH or None)
+    if backend == 'database':
+        return DatabaseSeenSet()
+    raise ValueError(f"Unknown seen-set backend: {backend}")
@@ -0,0 +1,117 @@
+import re
+from functools import lru_cache
+from urllib.parse import unquote_plus, urljoin, urlsplit, urlunsplit
+
+from src.config import TRACKING_PARAMS, URL_CACHE_SIZE
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+DUPLICATE_SLASHES = re.compile(r'/{2,}')
+
+_tracking_params = frozenset(param.lower() for param in TRACKING_PARAMS if not param.endswith('*'))
+_tracking_prefixes = tuple(param[:-1].lower() for param in TRACKING_PARAMS if param.endswith('*'))
+
+
+def strip_www(host: str) -> str:
+    """
+    Remove a leading www. label from a host
+    
+    Args:
+        host: Host name
+        
+    Returns:
+        Host without www prefix
+    """
+    return host[4:] if host.startswith('www.') else host
+
+
+def canonical_domain(url: str) -> str:
+    """
+    Extract the canonical domain of a URL
+    
+    Args:
+        url: URL to extract domain from
+        
+    Returns:
+        Lowercased network location without www prefix
+    """
+    return strip_www(urlsplit(url).netloc.lower())
+
+
+def is_tracking_param(name: str) -> bool:
+    """Check whether a query parameter only tracks campaigns or sessions"""
+    name = name.lower()
+    return name in _tracking_params or name.startswith(_tracking_prefixes)
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def canonicalize_url(url: str) -> str:
+    """
+    Canonicalize an absolute URL so equivalent links compare equal
+    
+    Lowercases scheme and host, strips www. and default ports, collapses
+    duplicate slashes, drops trailing slashes and fragments, removes tracking
+    parameters and sorts the remaining query parameters. Path case and the
+    parameters' original encoding (including valueless flags like ?print)
+    are kept.
+    
+    Args:
+        url: Absolute URL
+        
+    Returns:
+        Canonical URL
+    """
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        # Unbalanced brackets around an IPv6 host
+        return url
+    scheme = parts.scheme.lower()
+    
+    # Only web URLs are canonicalized; mailto:, tel: etc. just lose their fragment
+    if scheme not in DEFAULT_PORTS:
+        return urlunsplit((parts.scheme, parts.netloc, parts.path, parts.query, ''))
+        
+    try:
+        port = parts.port
+    except ValueError:
+        # A port that is not a number is not ours to fix; keep the netloc as written
+        netloc = parts.netloc
+    else:
+        host = strip_www((parts.hostname or '').rstrip('.'))
+        if ':' in host:
+            # hostname drops the brackets of an IPv6 address
+            host = f"[{host}]"
+        netloc = host if port in (None, DEFAULT_PORTS[scheme]) else f"{host}:{port}"
+        if parts.username:
+            userinfo = parts.username + (f":{parts.password}" if parts.password else '')
+            netloc = f"{userinfo}@{netloc}"
+        
+    path = DUPLICATE_SLASHES.sub('/', parts.path)
+    if len(path) > 1:
+        path = path.rstrip('/')
+    path = path or '/'
+    
+    query = ''
+    if parts.query:
+        # Sort the raw name=value pairs by name, keeping repeated names in order;
+        # decoding and re-encoding would turn ?print into ?print= and change escapes
+        params = [param for param in parts.query.split('&')
+                  if param and not is_tracking_param(unquote_plus(param.partition('=')[0]))]
+        query = '&'.join(sorted(params, key=lambda param: param.partition('=')[0]))
+        
+    return urlunsplit((scheme, netloc, path, query, ''))
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def resolve_url(url: str, base_url: str) -> str:
+    """
+    Resolve a possibly relative link against its page and canonicalize it
+    
+    Args:
+        url: Link as found on the page
+        base_url: URL of the page the link was found on
+        
+    Returns:
+        Canonical absolute URL
+    """
+    return canonicalize_url(urljoin(base_url, url))
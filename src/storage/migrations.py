@@ -0,0 +1,97 @@
+import logging
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+
+from src.storage.models import Link, SchemaMigration
+from src.storage.search_index import create_search_index, drop_search_index, fts5_supported
+
+logger = logging.getLogger(__name__)
+
+LINK_QUERY_INDEXES = (
+    'ix_links_relevance', 'ix_links_category_relevance', 'ix_links_website_relevance', 'ix_links_document_relevance'
+)
+
+
+def _add_link_query_indexes(connection: Connection) -> None:
+    """Add the indexes used by the link listing queries"""
+    for index in Link.__table__.indexes:
+        if index.name in LINK_QUERY_INDEXES:
+            index.create(bind=connection, checkfirst=True)
+
+
+def _add_search_index(connection: Connection) -> Optional[bool]:
+    """Add the FTS5 index used by link search (SQLite only; skipped without FTS5)"""
+    if connection.dialect.name == 'sqlite':
+        return create_search_index(connection)
+    return None
+
+
+def _use_trigram_search_index(connection: Connection) -> Optional[bool]:
+    """Recreate an FTS5 index built with the word tokenizer with the trigram tokenizer"""
+    if connection.dialect.name != 'sqlite':
+        return None
+    if not fts5_supported(connection):
+        return False
+    
+    definition = connection.exec_driver_sql(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'links_fts'"
+    ).scalar()
+    if definition is not None and 'trigram' in definition:
+        return True
+    drop_search_index(connection)
+    return create_search_index(connection)
+
+
+# (version, description, migration), applied in version order; never change a released entry
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], Optional[bool]]]] = [
+    (1, "Add composite indexes for link listing queries", _add_link_query_indexes),
+    (2, "Add full-text search index for links", _add_search_index),
+    (3, "Index link search by trigrams for substring matches", _use_trigram_search_index),
+]
+
+
+def run_migrations(engine: Engine) -> List[int]:
+    """
+    Apply migrations not yet recorded in the schema_migrations table
+    
+    Each migration runs in its own transaction together with the row
+    recording it, so an interrupted run resumes at the failed migration.
+    Tables created from the models already have the latest schema;
+    migrations only have to bring older databases up to date, and must be
+    safe to run on either. A migration returning False was skipped because
+    the database cannot support it yet (e.g. SQLite without FTS5); it is
+    not recorded, so it is tried again on the next start.
+    
+    Args:
+        engine: Database engine
+    
+    Returns:
+        Versions applied by this call
+    """
+    with engine.connect() as connection:
+        applied = {row[0] for row in connection.execute(SchemaMigration.__table__.select().with_only_columns(
+            SchemaMigration.version
+        ))}
+    
+    ran = []
+    for version, description, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+        try:
+            with engine.begin() as connection:
+                if migrate(connection) is False:
+                    logger.info(f"Skipped schema migration {version}: {description}")
+                    continue
+                connection.execute(SchemaMigration.__table__.insert().values(
+                    version=version, description=description, applied_at=datetime.utcnow()
+                ))
+        except IntegrityError:
+            # Another process applied it first
+            continue
+        logger.info(f"Applied schema migration {version}: {description}")
+        ran.append(version)
+    
+    return ran
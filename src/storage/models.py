@@ -1,11 +1,13 @@
 import json
 import os
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, create_engine
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, Index, create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, sessionmaker
 
-from src.config import DATABASE_URL
+from src.config import (
+    DATABASE_URL, SQLITE_JOURNAL_MODE, SQLITE_SYNCHRONOUS, SQLITE_BUSY_TIMEOUT, SQLITE_CACHE_SIZE, SQLITE_MMAP_SIZE
+)
 
 # Create SQLAlchemy base
 Base = declarative_base()
@@ -13,6 +15,24 @@ Base = declarative_base()
 # Create engine
 engine = create_engine(DATABASE_URL)
 
+# Session factory, shared by all sessions
+SessionLocal = sessionmaker(bind=engine)
+
+
+if engine.dialect.name == 'sqlite':
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        """Tune each new SQLite connection for concurrent crawls and API reads"""
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}")
+        cursor.execute(f"PRAGMA cache_size={SQLITE_CACHE_SIZE}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+
 class Website(Base):
     """Model representing a crawled website"""
     __tablename__ = 'websites'
@@ -24,6 +44,7 @@ class Website(Base):
     
     # Relationships
     links = relationship("Link", back_populates="website", cascade="all, delete-orphan")
+    pages = relationship("CrawledPage", back_populates="website", cascade="all, delete-orphan")
     
     def __repr__(self):
         return f"<Website domain={self.domain}>"
@@ -60,6 +81,14 @@ class Link(Base):
     website_id = Column(Integer, ForeignKey('websites.id'))
     website = relationship("Website", back_populates="links")
     
+    # Listing queries filter on one column and order by relevance
+    __table_args__ = (
+        Index('ix_links_relevance', 'overall_relevance'),
+        Index('ix_links_category_relevance', 'primary_category', 'overall_relevance'),
+        Index('ix_links_website_relevance', 'website_id', 'overall_relevance'),
+        Index('ix_links_document_relevance', 'is_document', 'overall_relevance'),
+    )
+    
     def __repr__(self):
         return f"<Link url={self.url}, relevance={self.overall_relevance}>"
     
@@ -82,6 +111,79 @@ class Link(Base):
             self.metadata_json = None
 
 
+class CrawledPage(Base):
+    """Model representing a crawled page and the fingerprint of its content"""
+    __tablename__ = 'crawled_pages'
+    
+    id = Column(Integer, primary_key=True)
+    url = Column(String(1024), unique=True, nullable=False)
+    
+    # Fingerprint
+    content_hash = Column(String(64))
+    etag = Column(String(255))
+    last_modified = Column(String(64))
+    
+    link_count = Column(Integer, default=0)
+    last_crawled = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    website_id = Column(Integer, ForeignKey('websites.id'))
+    website = relationship("Website", back_populates="pages")
+    
+    def __repr__(self):
+        return f"<CrawledPage url={self.url}, hash={self.content_hash}>"
+
+
+class LLMCall(Base):
+    """Model representing one chat completion made to score links"""
+    __tablename__ = 'llm_calls'
+    
+    id = Column(Integer, primary_key=True)
+    crawl_id = Column(String(32), index=True)
+    website_id = Column(Integer, ForeignKey('websites.id'), index=True)
+    model = Column(String(100))
+    
+    # Request
+    links = Column(Integer, default=1)
+    prompt_tokens = Column(Integer, default=0)
+    completion_tokens = Column(Integer, default=0)
+    cost = Column(Float, default=0.0)
+    latency_ms = Column(Float, default=0.0)
+    
+    # Failures
+    retries = Column(Integer, default=0)
+    parse_failures = Column(Integer, default=0)
+    error = Column(String(255))
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<LLMCall model={self.model}, links={self.links}, latency_ms={self.latency_ms}>"
+
+
+class SeenUrl(Base):
+    """Model representing a URL hash that has already been processed"""
+    __tablename__ = 'seen_urls'
+    
+    url_hash = Column(String(32), primary_key=True)
+    first_seen = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<SeenUrl hash={self.url_hash}>"
+
+
+class SchemaMigration(Base):
+    """Model representing a schema migration applied to the database"""
+    __tablename__ = 'schema_migrations'
+    
+    version = Column(Integer, primary_key=True)
+    description = Column(String(255))
+    applied_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<SchemaMigration version={self.version}>"
+
+
 # Ensure database directory exists
 def ensure_db_directory():
     """Ensure the directory for SQLite database exists"""
@@ -106,11 +208,14 @@ def init_db():
     
     # Create tables
     Base.metadata.create_all(engine)
+    
+    # Bring databases created by earlier versions up to date
+    from src.storage.migrations import run_migrations
+    run_migrations(engine)
     return engine
 
 
 # Session factory
-def get_session():
-    """Create a new database session"""
-    Session = sessionmaker(bind=engine)
-    return Session()
\ No newline at end of file
+def get_session(**kwargs):
+    """Create a new database session, with optional sessionmaker overrides"""
+    return SessionLocal(**kwargs)
\ No newline at end of file
@@ -1,21 +1,54 @@
+import json
 import logging
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 from urllib.parse import urlparse
 
-from sqlalchemy import desc
-from sqlalchemy.orm import Session
+from sqlalchemy import desc, func, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Query, Session
 
-from src.storage.models import Website, Link, get_session
+from src.config import DB_UPSERT_CHUNK_SIZE, SEARCH_CANDIDATES, SEARCH_MAX_RANKED, SEARCH_RELEVANCE_WEIGHT
+
+from src.crawler.link_record import (
+    LinkRecord, RELEVANCE_FIELDS, BUDGET_EXHAUSTED_RATIONALE, PROPAGATED_RATIONALE_PREFIX, UNSCORED_RATIONALES
+)
+from src.crawler.url_normalizer import canonical_domain
+from src.storage.models import Website, Link, CrawledPage, LLMCall, get_session
+from src.storage.search_index import match_expression, search_index_available
 
 logger = logging.getLogger(__name__)
 
+
+def keeps_stored_scores(new_rationale: Optional[str], stored_rationale: Optional[str]) -> bool:
+    """
+    Check whether a stored link keeps its scores instead of taking new ones
+    
+    A link that failed to be rescored (analysis error, exhausted budget)
+    only carries its heuristic score, which must not replace a real score
+    stored by an earlier crawl.
+    
+    Args:
+        new_rationale: Rationale of the incoming link data
+        stored_rationale: Rationale of the stored link
+        
+    Returns:
+        True if the stored relevance fields should be kept
+    """
+    return new_rationale in UNSCORED_RATIONALES and bool(stored_rationale) \
+        and stored_rationale not in UNSCORED_RATIONALES
+
 class LinkRepository:
     """Repository for storing and retrieving link data"""
     
-    def __init__(self):
-        """Initialize repository with database session"""
-        self.session = get_session()
+    def __init__(self, session: Optional[Session] = None):
+        """
+        Initialize repository with database session
+        
+        Args:
+            session: Session to use (a new one if None)
+        """
+        self.session = session if session is not None else get_session()
         
     def close(self):
         """Close database session"""
@@ -58,88 +91,258 @@ class LinkRepository:
         Returns:
             Domain name
         """
-        parsed = urlparse(url)
-        domain = parsed.netloc
+        # Same www handling as link canonicalization
+        return canonical_domain(url)
         
-        # Remove www prefix if present
-        if domain.startswith('www.'):
-            domain = domain[4:]
-            
-        return domain
-        
-    def add_link(self, link_data: Dict, website: Website) -> Link:
+    def add_link(self, link_data: Union[LinkRecord, Dict], website: Website) -> Link:
         """
         Add a link to the database
         
         Args:
-            link_data: Dictionary containing link data
+            link_data: Link record, or dictionary containing link data
             website: Website record to associate with link
             
         Returns:
             Created or updated Link record
         """
-        url = link_data.get('url')
+        if isinstance(link_data, dict):
+            return self._add_link_dict(link_data, website)
+            
+        record = link_data
         
         # Check if link already exists
-        link = self.session.query(Link).filter_by(url=url).first()
+        link = self.session.query(Link).filter_by(url=record.url).first()
         
         if link:
             # Update existing link
-            link.source_url = link_data.get('source_url', link.source_url)
-            link.page_title = link_data.get('page_title', link.page_title)
-            link.contact_relevance = link_data.get('contact_relevance', link.contact_relevance)
-            link.financial_relevance = link_data.get('financial_relevance', link.financial_relevance)
-            link.official_relevance = link_data.get('official_relevance', link.official_relevance)
-            link.overall_relevance = link_data.get('overall_relevance', link.overall_relevance)
-            link.primary_category = link_data.get('primary_category', link.primary_category)
-            link.rationale = link_data.get('rationale', link.rationale)
+            link.source_url = record.source_url or link.source_url
+            link.page_title = record.page_title or link.page_title
+            if not keeps_stored_scores(record.rationale, link.rationale):
+                link.contact_relevance = record.contact_relevance
+                link.financial_relevance = record.financial_relevance
+                link.official_relevance = record.official_relevance
+                link.overall_relevance = record.overall_relevance
+                link.primary_category = record.primary_category
+                link.rationale = record.rationale
+            if record.metadata:
+                link.link_metadata = record.metadata
             link.updated_at = datetime.utcnow()
         else:
             # Create new link
             link = Link(
-                url=url,
-                source_url=link_data.get('source_url', ''),
-                page_title=link_data.get('page_title', ''),
-                is_document=link_data.get('is_document', False),
-                contact_relevance=link_data.get('contact_relevance', 0.0),
-                financial_relevance=link_data.get('financial_relevance', 0.0),
-                official_relevance=link_data.get('official_relevance', 0.0),
-                overall_relevance=link_data.get('overall_relevance', 0.0),
-                primary_category=link_data.get('primary_category', 'other'),
-                rationale=link_data.get('rationale', ''),
+                url=record.url,
+                source_url=record.source_url,
+                page_title=record.page_title,
+                is_document=record.is_document,
+                contact_relevance=record.contact_relevance,
+                financial_relevance=record.financial_relevance,
+                official_relevance=record.official_relevance,
+                overall_relevance=record.overall_relevance,
+                primary_category=record.primary_category,
+                rationale=record.rationale,
                 website=website
             )
             
             # Add metadata if available
-            if link_data.get('metadata'):
-                link.link_metadata = link_data.get('metadata')
+            if record.metadata:
+                link.link_metadata = record.metadata
                 
             self.session.add(link)
             
         self.session.commit()
         return link
         
-    def add_links(self, links: List[Dict], website: Website) -> List[Link]:
+    def _add_link_dict(self, link_data: Dict, website: Website) -> Link:
+        """
+        Add a link given as a dictionary, keeping stored values for missing keys
+        
+        Args:
+            link_data: Dictionary containing link data
+            website: Website record to associate with link
+            
+        Returns:
+            Created or updated Link record
+        """
+        link = self.session.query(Link).filter_by(url=link_data.get('url')).first()
+        record = LinkRecord.from_dict(link_data)
+        
+        # Fields missing from the dictionary keep their stored values
+        if link:
+            for field in RELEVANCE_FIELDS:
+                if field not in link_data:
+                    setattr(record, field, getattr(link, field))
+                    
+        return self.add_link(record, website)
+        
+    def add_links(self, links: List[Union[LinkRecord, Dict]], website: Website) -> List[Link]:
         """
         Add multiple links to the database
         
+        Links are written with bulk_upsert_links; use that directly when the
+        stored records are not needed.
+        
         Args:
-            links: List of link data dictionaries
+            links: List of link records or link data dictionaries
             website: Website record to associate with links
             
         Returns:
             List of created or updated Link records
         """
-        added_links = []
+        self.bulk_upsert_links(links, website)
         
-        for link_data in links:
+        urls = list(dict.fromkeys(link_data.get('url') for link_data in links))
+        stored = {}
+        for i in range(0, len(urls), DB_UPSERT_CHUNK_SIZE):
+            for link in self.session.query(Link).filter(Link.url.in_(urls[i:i+DB_UPSERT_CHUNK_SIZE])):
+                stored[link.url] = link
+                
+        return [stored[url] for url in urls if url in stored]
+        
+    def bulk_upsert_links(self, links: List[Union[LinkRecord, Dict]], website: Website,
+                          chunk_size: int = DB_UPSERT_CHUNK_SIZE) -> List[Dict[str, int]]:
+        """
+        Insert or update many links with one transaction per chunk
+        
+        Each chunk costs one query for the URLs already stored, one bulk
+        insert and one bulk update, instead of a query and a commit per link.
+        Stored links are updated the same way as by add_link. A chunk that
+        fails, e.g. because a concurrent crawl stored one of its URLs first,
+        is retried link by link.
+        
+        Args:
+            links: List of link records or link data dictionaries
+            website: Website record to associate new links with
+            chunk_size: Links written per transaction
+            
+        Returns:
+            List of per-chunk dictionaries with link, inserted, updated and failed counts
+        """
+        stats = []
+        
+        for i in range(0, len(links), chunk_size):
+            chunk = links[i:i+chunk_size]
+            inserted = updated = failed = 0
             try:
-                link = self.add_link(link_data, website)
-                added_links.append(link)
-            except Exception as e:
-                logger.error(f"Error adding link {link_data.get('url')}: {str(e)}")
+                inserted, updated = self._upsert_chunk(chunk, website)
+            except SQLAlchemyError as e:
+                self.session.rollback()
+                logger.warning(f"Bulk upsert of {len(chunk)} links failed, storing them one by one: {str(e)}")
+                for link_data in chunk:
+                    try:
+                        link_inserted, link_updated = self._upsert_chunk([link_data], website)
+                        inserted += link_inserted
+                        updated += link_updated
+                    except SQLAlchemyError as e:
+                        self.session.rollback()
+                        failed += 1
+                        logger.error(f"Error adding link {link_data.get('url')}: {str(e)}")
+                        
+            stats.append({'links': len(chunk), 'inserted': inserted, 'updated': updated, 'failed': failed})
+            
+        return stats
+        
+    def _upsert_chunk(self, links: List[Union[LinkRecord, Dict]], website: Website) -> Tuple[int, int]:
+        """
+        Insert or update links in one transaction
+        
+        Args:
+            links: List of link records or link data dictionaries
+            website: Website record to associate new links with
+            
+        Returns:
+            Tuple of (links inserted, links updated)
+        """
+        # A URL given twice is stored once, with its last data
+        records = {}
+        for link_data in links:
+            record = LinkRecord.coerce(link_data)
+            records[record.url] = (record, link_data)
+            
+        existing = {
+            row.url: row
+            for row in self.session.query(
+                Link.id, Link.url, Link.source_url, Link.page_title, Link.metadata_json,
+                *(getattr(Link, field) for field in RELEVANCE_FIELDS)
+            ).filter(Link.url.in_(list(records)))
+        }
+        
+        now = datetime.utcnow()
+        inserts, updates = [], []
+        for url, (record, link_data) in records.items():
+            row = existing.get(url)
+            if row is None:
+                inserts.append({
+                    'url': url,
+                    'source_url': record.source_url,
+                    'page_title': record.page_title,
+                    'is_document': record.is_document,
+                    **{field: getattr(record, field) for field in RELEVANCE_FIELDS},
+                    'metadata_json': json.dumps(record.metadata) if record.metadata else None,
+                    'website_id': website.id,
+                    'created_at': now,
+                    'updated_at': now
+                })
+            else:
+                # Fields missing from a dictionary, and scores a failed rescoring
+                # would replace with a fallback, keep their stored values
+                keep_scores = keeps_stored_scores(record.rationale, row.rationale)
+                updates.append({
+                    'id': row.id,
+                    'source_url': record.source_url or row.source_url,
+                    'page_title': record.page_title or row.page_title,
+                    **{field: getattr(row if keep_scores or (isinstance(link_data, dict) and field not in link_data)
+                                      else record, field)
+                       for field in RELEVANCE_FIELDS},
+                    'metadata_json': json.dumps(record.metadata) if record.metadata else row.metadata_json,
+                    'updated_at': now
+                })
                 
-        return added_links
+        if inserts:
+            self.session.bulk_insert_mappings(Link, inserts)
+        if updates:
+            self.session.bulk_update_mappings(Link, updates)
+        self.session.commit()
+        return len(inserts), len(updates)
+        
+    def get_page_fingerprints(self, website: Website) -> Dict[str, CrawledPage]:
+        """
+        Get stored page fingerprints for a website
+        
+        Args:
+            website: Website record
+            
+        Returns:
+            Dictionary mapping page URL to CrawledPage record
+        """
+        pages = self.session.query(CrawledPage).filter(CrawledPage.website_id == website.id).all()
+        return {page.url: page for page in pages}
+        
+    def save_page_fingerprint(self, fingerprint: Dict, website: Website, link_count: int = 0) -> CrawledPage:
+        """
+        Store the fingerprint of a crawled page
+        
+        Args:
+            fingerprint: Dictionary with url, content_hash, etag and last_modified
+            website: Website record to associate with the page
+            link_count: Number of links extracted from the page
+            
+        Returns:
+            Created or updated CrawledPage record
+        """
+        page = self.session.query(CrawledPage).filter_by(url=fingerprint['url']).first()
+        
+        if not page:
+            page = CrawledPage(url=fingerprint['url'], website_id=website.id)
+            self.session.add(page)
+            
+        page.content_hash = fingerprint.get('content_hash')
+        page.etag = fingerprint.get('etag')
+        page.last_modified = fingerprint.get('last_modified')
+        page.link_count = link_count
+        page.last_crawled = datetime.utcnow()
+        
+        self.session.commit()
+        return page
         
     def get_links_by_relevance(self, min_relevance: float = 0.0, limit: int = 10) -> List[Link]:
         """
@@ -152,11 +355,7 @@ class LinkRepository:
         Returns:
             List of Link records
         """
-        return self.session.query(Link)\
-            .filter(Link.overall_relevance >= min_relevance)\
-            .order_by(desc(Link.overall_relevance))\
-            .limit(limit)\
-            .all()
+        return self._ranked_links(Link.overall_relevance >= min_relevance).limit(limit).all()
             
     def get_links_by_category(self, category: str, limit: int = 10) -> List[Link]:
         """
@@ -169,11 +368,7 @@ class LinkRepository:
         Returns:
             List of Link records
         """
-        return self.session.query(Link)\
-            .filter(Link.primary_category == category)\
-            .order_by(desc(Link.overall_relevance))\
-            .limit(limit)\
-            .all()
+        return self._ranked_links(Link.primary_category == category).limit(limit).all()
             
     def get_links_by_website(self, website_id: int, limit: int = 10) -> List[Link]:
         """
@@ -186,11 +381,7 @@ class LinkRepository:
         Returns:
             List of Link records
         """
-        return self.session.query(Link)\
-            .filter(Link.website_id == website_id)\
-            .order_by(desc(Link.overall_relevance))\
-            .limit(limit)\
-            .all()
+        return self._ranked_links(Link.website_id == website_id).limit(limit).all()
             
     def get_document_links(self, limit: int = 10) -> List[Link]:
         """
@@ -202,12 +393,153 @@ class LinkRepository:
         Returns:
             List of Link records
         """
-        return self.session.query(Link)\
-            .filter(Link.is_document == True)\
-            .order_by(desc(Link.overall_relevance))\
-            .limit(limit)\
-            .all()
+        return self._ranked_links(Link.is_document == True).limit(limit).all()
+        
+    def _ranked_links(self, criterion) -> Query:
+        """
+        Query links matching a criterion, most relevant first
+        
+        Each listing query has a composite index on (filtered column,
+        overall_relevance), so it reads the first `limit` entries of the
+        index instead of scanning and sorting the table.
+        
+        Args:
+            criterion: Filter on one column of Link
+            
+        Returns:
+            Query ordered by overall relevance
+        """
+        return self.session.query(Link).filter(criterion).order_by(desc(Link.overall_relevance))
+        
+    def explain_link_queries(self) -> Dict[str, Dict]:
+        """
+        Get the SQLite query plan of each link listing query
+        
+        Returns:
+            Dictionary mapping method name to its plan lines and whether it
+            searches an index rather than scanning the table or a whole
+            index, without a separate sort
+            
+        Raises:
+            ValueError: If the database is not SQLite
+        """
+        dialect = self.session.get_bind().dialect
+        if dialect.name != 'sqlite':
+            raise ValueError(f"Query plans can only be checked on SQLite, not {dialect.name}")
+            
+        # Sample parameters; the plan does not depend on their values
+        criteria = {
+            'get_links_by_relevance': Link.overall_relevance >= 0.7,
+            'get_links_by_category': Link.primary_category == 'financial',
+            'get_links_by_website': Link.website_id == 1,
+            'get_document_links': Link.is_document == True,
+        }
+        
+        plans = {}
+        for name, criterion in criteria.items():
+            statement = self._ranked_links(criterion).limit(10).statement
+            sql = str(statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
+            plan = [row[-1] for row in self.session.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+            plans[name] = {
+                'plan': plan,
+                'indexed': not any(line.startswith('SCAN') or 'TEMP B-TREE' in line for line in plan)
+            }
+        return plans
+        
+    def iter_links(self, website_id: Optional[int] = None, after_id: int = 0,
+                   chunk_size: int = 1000) -> Iterator[List[Link]]:
+        """
+        Iterate over stored links in ID order, a chunk at a time
+        
+        Uses keyset pagination, so each chunk costs the same however far
+        into the table it is.
+        
+        Args:
+            website_id: Only include links of this website
+            after_id: Only include links with a greater ID
+            chunk_size: Links per chunk
+            
+        Yields:
+            Lists of Link records
+        """
+        while True:
+            query = self.session.query(Link).filter(Link.id > after_id)
+            if website_id is not None:
+                query = query.filter(Link.website_id == website_id)
+            chunk = query.order_by(Link.id).limit(chunk_size).all()
+            if not chunk:
+                return
+            yield chunk
+            after_id = chunk[-1].id
+            
+            # Keep the session from holding on to every link of a large table
+            for link in chunk:
+                self.session.expunge(link)
+            
+    def get_links_by_ids(self, link_ids: List[int]) -> List[Link]:
+        """
+        Get stored links by ID
+        
+        Args:
+            link_ids: Link IDs
+            
+        Returns:
+            List of Link records, in no particular order
+        """
+        links = []
+        for i in range(0, len(link_ids), DB_UPSERT_CHUNK_SIZE):
+            links.extend(self.session.query(Link).filter(Link.id.in_(link_ids[i:i+DB_UPSERT_CHUNK_SIZE])))
+        return links
+        
+    def update_link_scores(self, scores: Dict[int, Dict]) -> int:
+        """
+        Update the relevance data of stored links
+        
+        Args:
+            scores: Relevance data by link ID
             
+        Returns:
+            Number of links updated
+        """
+        if not scores:
+            return 0
+            
+        now = datetime.utcnow()
+        self.session.bulk_update_mappings(Link, [
+            {'id': link_id, 'updated_at': now,
+             **{field: value for field, value in data.items() if field in RELEVANCE_FIELDS}}
+            for link_id, data in scores.items()
+        ])
+        self.session.commit()
+        return len(scores)
+        
+    def get_scored_links(self, limit: Optional[int] = None) -> List[Link]:
+        """
+        Get links scored by the AI, for training the pre-classifier
+        
+        Links given default scores (low initial value, analysis errors,
+        exhausted scoring budget), scored by the pre-classifier itself or
+        given a cluster representative's score are excluded.
+        
+        Args:
+            limit: Maximum number of links to return (most recently found first)
+            
+        Returns:
+            List of Link records
+        """
+        query = self.session.query(Link)\
+            .filter(Link.rationale.isnot(None))\
+            .filter(Link.rationale != "")\
+            .filter(Link.rationale != "Low initial value assessment")\
+            .filter(~Link.rationale.like("Error during analysis%"))\
+            .filter(Link.rationale != BUDGET_EXHAUSTED_RATIONALE)\
+            .filter(~Link.rationale.like("Pre-classifier:%"))\
+            .filter(~Link.rationale.like(f"{PROPAGATED_RATIONALE_PREFIX}%"))\
+            .order_by(desc(Link.id))
+        if limit:
+            query = query.limit(limit)
+        return query.all()
+        
     def get_all_websites(self) -> List[Website]:
         """
         Get all websites that have been crawled
@@ -223,6 +555,13 @@ class LinkRepository:
         """
         Search links by URL or page title
         
+        On SQLite, words are looked up in the links_fts trigram index, which
+        matches them anywhere in a URL or title ("budget" finds
+        /citybudget2023), and the best matches are ranked by text score
+        weighted by relevance. Other databases, queries without a word of
+        three characters and queries the index finds nothing for use a LIKE
+        scan.
+        
         Args:
             query: Search query
             limit: Maximum number of links to return
@@ -230,6 +569,12 @@ class LinkRepository:
         Returns:
             List of Link records
         """
+        expression = match_expression(query)
+        if expression and search_index_available(self.session):
+            links = self._search_index(expression, limit)
+            if links:
+                return links
+                
         search_term = f"%{query}%"
         return self.session.query(Link)\
             .filter((Link.url.like(search_term)) | (Link.page_title.like(search_term)))\
@@ -237,6 +582,109 @@ class LinkRepository:
             .limit(limit)\
             .all()
             
+    def _search_index(self, expression: str, limit: int) -> List[Link]:
+        """
+        Search links through the full-text index
+        
+        For queries with at most SEARCH_MAX_RANKED matches, the
+        SEARCH_CANDIDATES best bm25 matches are re-ranked by bm25 score
+        times (1 + SEARCH_RELEVANCE_WEIGHT * overall relevance). Broader
+        queries (common words, which carry little bm25 signal) walk the
+        relevance index and check each link against the full-text index
+        instead, so their cost does not grow with the number of matches.
+        
+        Args:
+            expression: FTS5 MATCH expression
+            limit: Maximum number of links to return
+            
+        Returns:
+            List of Link records
+        """
+        matches = self.session.execute(
+            text("SELECT count(*) FROM (SELECT rowid FROM links_fts WHERE links_fts MATCH :expression LIMIT :cap)"),
+            {'expression': expression, 'cap': SEARCH_MAX_RANKED + 1}
+        ).scalar()
+        
+        if matches > SEARCH_MAX_RANKED:
+            ids = self.session.execute(
+                text("SELECT id FROM links WHERE EXISTS ("
+                     "SELECT 1 FROM links_fts WHERE links_fts MATCH :expression AND links_fts.rowid = links.id"
+                     ") ORDER BY overall_relevance DESC LIMIT :limit"),
+                {'expression': expression, 'limit': limit}
+            ).scalars().all()
+            order = {link_id: position for position, link_id in enumerate(ids)}
+            links = self.session.query(Link).filter(Link.id.in_(ids)).all() if ids else []
+            return sorted(links, key=lambda link: order[link.id])
+            
+        rows = self.session.execute(
+            text("SELECT rowid, rank FROM links_fts WHERE links_fts MATCH :expression ORDER BY rank LIMIT :candidates"),
+            {'expression': expression, 'candidates': max(SEARCH_CANDIDATES, limit)}
+        ).all()
+        if not rows:
+            return []
+            
+        # bm25 ranks are negative, best first
+        text_scores = {rowid: -rank for rowid, rank in rows}
+        links = self.session.query(Link).filter(Link.id.in_(list(text_scores))).all()
+        links.sort(key=lambda link: text_scores[link.id] * (1 + SEARCH_RELEVANCE_WEIGHT * (link.overall_relevance or 0.0)),
+                   reverse=True)
+        return links[:limit]
+        
+    def get_llm_metrics(self, group_by: str = "crawl", crawl_id: Optional[str] = None,
+                        website_id: Optional[int] = None, limit: int = 100) -> List[Dict]:
+        """
+        Get aggregated OpenAI call metrics
+        
+        Args:
+            group_by: Aggregate per "crawl", "website" or "model"
+            crawl_id: Only include calls made by this crawl
+            website_id: Only include calls made for this website
+            limit: Maximum number of groups to return (most recent first)
+            
+        Returns:
+            List of dictionaries with call and link counts, token totals, cost,
+            latency and failure counts per group
+        """
+        groups = {'crawl': LLMCall.crawl_id, 'website': LLMCall.website_id, 'model': LLMCall.model}
+        if group_by not in groups:
+            raise ValueError(f"Unknown metrics grouping: {group_by}")
+        key = groups[group_by]
+        
+        columns = [key]
+        if group_by == 'crawl':
+            # A crawl covers one website
+            columns.append(func.min(LLMCall.website_id).label('website_id'))
+            
+        query = self.session.query(
+            *columns,
+            func.count(LLMCall.id).label('calls'),
+            func.sum(LLMCall.links).label('links'),
+            func.sum(LLMCall.prompt_tokens).label('prompt_tokens'),
+            func.sum(LLMCall.completion_tokens).label('completion_tokens'),
+            func.sum(LLMCall.cost).label('cost'),
+            func.avg(LLMCall.latency_ms).label('avg_latency_ms'),
+            func.max(LLMCall.latency_ms).label('max_latency_ms'),
+            func.sum(LLMCall.retries).label('retries'),
+            func.sum(LLMCall.parse_failures).label('parse_failures'),
+            func.count(LLMCall.error).label('errors'),
+            func.min(LLMCall.created_at).label('first_call'),
+            func.max(LLMCall.created_at).label('last_call')
+        )
+        if crawl_id is not None:
+            query = query.filter(LLMCall.crawl_id == crawl_id)
+        if website_id is not None:
+            query = query.filter(LLMCall.website_id == website_id)
+            
+        rows = query.group_by(key).order_by(desc('last_call')).limit(limit).all()
+        
+        metrics = []
+        for row in rows:
+            entry = row._asdict()
+            entry['total_tokens'] = (entry['prompt_tokens'] or 0) + (entry['completion_tokens'] or 0)
+            entry['tokens_per_link'] = entry['total_tokens'] / entry['links'] if entry['links'] else 0.0
+            metrics.append(entry)
+        return metrics
+        
     def get_website_count(self) -> int:
         """
         Get count of websites
@@ -0,0 +1,137 @@
+import logging
+import re
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Words of a search query; a trailing * (prefix search) is accepted and ignored
+QUERY_TOKEN = re.compile(r'(\w+)\*?')
+
+# The trigram tokenizer indexes every three-character sequence, and cannot
+# look up anything shorter
+MIN_QUERY_WORD = 3
+
+# The trigram tokenizer needs SQLite 3.34
+TRIGRAM_SQLITE_VERSION = (3, 34, 0)
+
+# Full-text index over links.url and links.page_title, kept in sync by triggers.
+# The trigram tokenizer matches any substring of three characters or more, so
+# "budget" finds /citybudget2023 as a LIKE scan would, without the table scan.
+SEARCH_INDEX_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS links_fts USING fts5(
+        url, page_title,
+        content='links', content_rowid='id',
+        tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS links_fts_insert AFTER INSERT ON links BEGIN
+        INSERT INTO links_fts(rowid, url, page_title) VALUES (new.id, new.url, new.page_title);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS links_fts_delete AFTER DELETE ON links BEGIN
+        INSERT INTO links_fts(links_fts, rowid, url, page_title) VALUES ('delete', old.id, old.url, old.page_title);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS links_fts_update AFTER UPDATE OF url, page_title ON links
+    WHEN old.url IS NOT new.url OR old.page_title IS NOT new.page_title BEGIN
+        INSERT INTO links_fts(links_fts, rowid, url, page_title) VALUES ('delete', old.id, old.url, old.page_title);
+        INSERT INTO links_fts(rowid, url, page_title) VALUES (new.id, new.url, new.page_title);
+    END
+    """,
+    # Title matches count double in the bm25 rank
+    "INSERT INTO links_fts(links_fts, rank) VALUES ('rank', 'bm25(1.0, 2.0)')",
+]
+
+
+def fts5_supported(connection: Connection) -> bool:
+    """Check whether the connection is SQLite built with FTS5 and the trigram tokenizer"""
+    if connection.dialect.name != 'sqlite':
+        return False
+    version = connection.exec_driver_sql("SELECT sqlite_version()").scalar()
+    if tuple(int(part) for part in version.split('.')) < TRIGRAM_SQLITE_VERSION:
+        return False
+    options = {row[0] for row in connection.exec_driver_sql("PRAGMA compile_options")}
+    return 'ENABLE_FTS5' in options
+
+
+def create_search_index(connection: Connection) -> bool:
+    """
+    Create the links_fts index and its triggers, and fill it from the links table
+    
+    Args:
+        connection: Database connection, inside a transaction
+    
+    Returns:
+        True if the index was created, False if the database has no FTS5 support
+    """
+    if not fts5_supported(connection):
+        logger.warning("SQLite FTS5 with the trigram tokenizer is not available, link search uses LIKE")
+        return False
+    
+    for statement in SEARCH_INDEX_DDL:
+        connection.exec_driver_sql(statement)
+    connection.exec_driver_sql("INSERT INTO links_fts(links_fts) VALUES ('rebuild')")
+    return True
+
+
+def drop_search_index(connection: Connection) -> None:
+    """Drop the links_fts index and its triggers, if the database has them"""
+    for trigger in ('links_fts_insert', 'links_fts_delete', 'links_fts_update'):
+        connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {trigger}")
+    connection.exec_driver_sql("DROP TABLE IF EXISTS links_fts")
+
+
+def rebuild_search_index(engine: Engine) -> bool:
+    """
+    Rebuild the search index from the links table and merge its segments
+    
+    Creates the index first if the database does not have it yet.
+    
+    Args:
+        engine: Database engine
+    
+    Returns:
+        True if the index was rebuilt, False if the database has no FTS5 support
+    """
+    with engine.begin() as connection:
+        if not create_search_index(connection):
+            return False
+        connection.exec_driver_sql("INSERT INTO links_fts(links_fts) VALUES ('optimize')")
+    return True
+
+
+def search_index_available(session: Session) -> bool:
+    """Check whether the session's database has the links_fts index"""
+    if session.get_bind().dialect.name != 'sqlite':
+        return False
+    return session.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'links_fts'"
+    )).first() is not None
+
+
+def match_expression(query: str) -> str:
+    """
+    Turn a free-text query into an FTS5 MATCH expression
+    
+    Every word must occur somewhere in the URL or title, so "budget 2023"
+    finds /finance/citybudget2023.pdf; a word ending in * is the same
+    search, as every word already matches inside longer words. Words
+    shorter than MIN_QUERY_WORD cannot be looked up in the trigram index
+    and are dropped. Words are quoted, so FTS5 operators and punctuation are
+    taken literally.
+    
+    Args:
+        query: Search query
+    
+    Returns:
+        MATCH expression, or an empty string if the query has no word long
+        enough to look up (the caller falls back to a substring scan)
+    """
+    return ' '.join(f'"{word}"' for word in QUERY_TOKEN.findall(query.lower()) if len(word) >= MIN_QUERY_WORD)
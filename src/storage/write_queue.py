@@ -0,0 +1,128 @@
+import atexit
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Callable, Optional, TypeVar
+
+from src.config import DB_WRITE_QUEUE_SIZE
+from src.storage.models import get_session
+from src.storage.repository import LinkRepository
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class DatabaseWriter:
+    """
+    Run database writes one at a time on a dedicated thread
+    
+    Concurrent crawls submit their writes as jobs taking a LinkRepository;
+    the writer thread runs them in order on its own session, so writers
+    never contend for the SQLite write lock and, with WAL, readers never
+    wait behind them. Records returned by a job are detached from the
+    writer's session with their loaded attributes intact.
+    """
+    
+    def __init__(self, max_pending: int = DB_WRITE_QUEUE_SIZE):
+        """
+        Initialize writer; its thread starts with the first job
+        
+        Args:
+            max_pending: Jobs waiting before submit() blocks
+        """
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        
+        self.jobs = 0
+        self.failures = 0
+    
+    def submit(self, job: Callable[[LinkRepository], T]) -> 'Future[T]':
+        """
+        Queue a write
+        
+        Args:
+            job: Function receiving the writer's repository; it commits its own changes
+        
+        Returns:
+            Future resolving to the job's return value or exception
+        """
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='database-writer', daemon=True)
+                self._thread.start()
+        
+        future: Future = Future()
+        self._queue.put((job, future))
+        return future
+    
+    def call(self, job: Callable[[LinkRepository], T]) -> T:
+        """
+        Run a write on the writer thread and wait for it
+        
+        Args:
+            job: Function receiving the writer's repository; it commits its own changes
+        
+        Returns:
+            The job's return value
+        
+        Raises:
+            Exception: Whatever the job raised
+        """
+        return self.submit(job).result()
+    
+    def close(self) -> None:
+        """Finish the queued writes and stop the writer thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+    
+    def _run(self) -> None:
+        """Writer thread: run queued jobs until close()"""
+        # Keep returned records usable after the commit detaches them
+        repo = LinkRepository(get_session(expire_on_commit=False))
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    return
+                
+                job, future = item
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    result = job(repo)
+                except BaseException as e:
+                    repo.session.rollback()
+                    self.failures += 1
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+                finally:
+                    self.jobs += 1
+                    repo.session.expunge_all()
+        finally:
+            repo.close()
+
+
+_writer: Optional[DatabaseWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_writer() -> DatabaseWriter:
+    """
+    Get the process-wide database writer
+    
+    Returns:
+        DatabaseWriter shared by every crawl in the process, closed at exit
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = DatabaseWriter()
+            atexit.register(_writer.close)
+        return _writer
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+import time
+from typing import Optional
+
+class TokenBucket:
+    """Thread-safe token bucket usable from both threads and asyncio tasks"""
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Initialize token bucket
+        
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of tokens that can accumulate (defaults to one second of tokens)
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        
+    @classmethod
+    def per_minute(cls, amount: float, capacity: Optional[float] = None) -> "TokenBucket":
+        """
+        Create a bucket from a per-minute limit
+        
+        Args:
+            amount: Tokens allowed per minute
+            capacity: Maximum burst size
+            
+        Returns:
+            TokenBucket instance
+        """
+        return cls(amount / 60.0, capacity)
+        
+    def _reserve(self, tokens: float) -> float:
+        """
+        Take tokens from the bucket, going into debt if necessary
+        
+        Args:
+            tokens: Number of tokens to take
+            
+        Returns:
+            Seconds the caller must wait before the tokens are available
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+            
+    def acquire(self, tokens: float = 1) -> None:
+        """
+        Block the current thread until tokens are available
+        
+        Args:
+            tokens: Number of tokens to take
+        """
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+            
+    def adjust(self, tokens: float) -> None:
+        """
+        Correct an earlier acquisition once the real cost is known, without waiting
+        
+        Args:
+            tokens: Extra tokens to take, or a negative number to return unused tokens
+        """
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens - tokens)
+            
+    async def acquire_async(self, tokens: float = 1) -> None:
+        """
+        Wait without blocking the event loop until tokens are available
+        
+        Args:
+            tokens: Number of tokens to take
+        """
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
@@ -0,0 +1,140 @@
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Configure the application before anything imports src.config: a throwaway
+# database, and no on-disk caches or trained models from the working tree
+_tmp_dir = tempfile.mkdtemp(prefix='link-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_tmp_dir, 'links.db')}"
+os.environ['OPENAI_API_KEY'] = 'test-key'
+os.environ['RELEVANCE_CACHE_PATH'] = os.path.join(_tmp_dir, 'relevance.db')
+os.environ['PRECLASSIFIER_PATH'] = os.path.join(_tmp_dir, 'preclassifier.npz')
+os.environ['FIRECRAWL_CACHE_ENABLED'] = 'false'
+for flag in ('RELEVANCE_CACHE_ENABLED', 'PRECLASSIFIER_ENABLED', 'LLM_METRICS_ENABLED', 'LINK_CLUSTERING_ENABLED'):
+    os.environ[flag] = 'false'
+
+import pytest
+
+from src.storage.models import Base, engine, init_db
+from src.storage.repository import LinkRepository
+
+
+@pytest.fixture(scope='session', autouse=True)
+def database():
+    """Create the schema, search index included, once per test run"""
+    init_db()
+    return engine
+
+
+@pytest.fixture
+def repo(database):
+    """Repository on an empty database"""
+    repository = LinkRepository()
+    yield repository
+    repository.close()
+    with database.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            if table.name != 'schema_migrations':
+                connection.execute(table.delete())
+
+
+@pytest.fixture
+def website(repo):
+    return repo.get_or_create_website('https://city.gov/')
+
+
+class LocalSite:
+    """Local HTTP server answering from a route table and logging every request"""
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        self.headers = []
+        # Seconds every response waits, and the most requests seen in flight at once
+        self.delay = 0.0
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _respond(self, send_body):
+                with site._lock:
+                    site.requests.append((self.command, self.path))
+                    site.headers.append(dict(self.headers))
+                    site._in_flight += 1
+                    site.max_in_flight = max(site.max_in_flight, site._in_flight)
+                time.sleep(site.delay)
+                with site._lock:
+                    site._in_flight -= 1
+                # Read the request body so the client sees a clean response
+                self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                path = self.path.split('?')[0]
+                route = site.routes.get((self.command, path)) or site.routes.get(path, (404, {}, b''))
+                if isinstance(route, list):
+                    # Responses served in turn, the last one repeating
+                    with site._lock:
+                        route = route.pop(0) if len(route) > 1 else route[0]
+                status, headers, body = route
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if send_body:
+                    self.wfile.write(body)
+
+            def do_GET(self):
+                self._respond(True)
+
+            def do_HEAD(self):
+                self._respond(False)
+
+            def do_POST(self):
+                self._respond(True)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def page(self, path, html, status=200, **headers):
+        """Serve an HTML page at path"""
+        self.routes[path] = (status, {'Content-Type': 'text/html', **headers}, html.encode())
+
+    def file(self, path, content_type, body=b'', status=200, method=None, **headers):
+        """Serve a non-HTML response at path, to one method only if given"""
+        self.routes[(method, path) if method else path] = (status, {'Content-Type': content_type, **headers}, body)
+
+    def redirect(self, path, location):
+        """Redirect path to location"""
+        self.routes[path] = (301, {'Location': location}, b'')
+
+    def respond(self, path, status, method=None, **headers):
+        """Answer path with a bare status, to one method only if given"""
+        self.routes[(method, path) if method else path] = (status, headers, b'')
+
+    def sequence(self, path, *responses, method=None):
+        """Answer path with (status, headers, body) responses in turn, repeating the last"""
+        self.routes[(method, path) if method else path] = list(responses)
+
+    def fetched(self, method='GET'):
+        """Paths requested with a method, in order"""
+        return [path for command, path in self.requests if command == method]
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def local_site():
+    """Local HTTP server; add routes with page() and redirect()"""
+    site = LocalSite()
+    yield site
+    site.close()
@@ -0,0 +1,88 @@
+import json
+import time
+
+from src.ai.async_openai_service import AsyncOpenAIService
+from src.crawler.link_record import ANALYSIS_ERROR_RATIONALE, LinkRecord
+from src.utils.rate_limiter import TokenBucket
+
+SCORES = {
+    'contact_relevance': 0.1, 'financial_relevance': 0.9, 'official_relevance': 0.2,
+    'overall_relevance': 0.9, 'primary_category': 'financial', 'rationale': 'Budget document'
+}
+
+
+def completion(content):
+    """Chat completion response body with the given message content"""
+    return json.dumps({
+        'id': 'chatcmpl-test', 'object': 'chat.completion', 'created': 0, 'model': 'test-model',
+        'choices': [{'index': 0, 'finish_reason': 'stop', 'message': {'role': 'assistant', 'content': content}}],
+        'usage': {'prompt_tokens': 100, 'completion_tokens': 50, 'total_tokens': 150}
+    }).encode()
+
+
+BATCH_OF_TWO = (200, {'Content-Type': 'application/json'},
+                completion(json.dumps({'results': [{'index': 0, **SCORES}, {'index': 1, **SCORES}]})))
+
+
+def links(count):
+    return [LinkRecord(url=f'https://city.gov/budget/{i}', initial_value=0.9) for i in range(count)]
+
+
+def service(local_site, **kwargs):
+    options = {'concurrency': 2, 'requests_per_minute': 60000, 'tokens_per_minute': 10 ** 9, 'max_retries': 2}
+    return AsyncOpenAIService(api_key='test-key', model='test-model', base_url=local_site.url + '/v1',
+                              **{**options, **kwargs})
+
+
+def test_token_bucket_paces_acquisitions():
+    bucket = TokenBucket(rate=20, capacity=1)
+
+    started = time.monotonic()
+    for _ in range(3):
+        bucket.acquire()
+
+    # The first token was in the bucket, the next two took 50 ms each
+    assert time.monotonic() - started >= 0.09
+
+
+def test_token_bucket_adjust_returns_unused_tokens():
+    bucket = TokenBucket(rate=1, capacity=10)
+    bucket.acquire(10)
+    bucket.adjust(-5)
+
+    started = time.monotonic()
+    bucket.acquire(5)
+    assert time.monotonic() - started < 0.05
+
+
+def test_batches_run_concurrently_up_to_the_cap(local_site):
+    local_site.sequence('/v1/chat/completions', BATCH_OF_TWO, method='POST')
+    local_site.delay = 0.1
+
+    scored = service(local_site, concurrency=2).batch_analyze_links(links(8), batch_size=2)
+
+    assert len(local_site.fetched('POST')) == 4
+    assert local_site.max_in_flight == 2
+    assert all(link.rationale == 'Budget document' for link in scored)
+
+
+def test_rate_limited_request_is_retried_after_retry_after(local_site):
+    local_site.sequence('/v1/chat/completions',
+                        (429, {'Content-Type': 'application/json', 'Retry-After': '0'},
+                         b'{"error": {"message": "Rate limit reached", "type": "requests"}}'),
+                        BATCH_OF_TWO, method='POST')
+
+    scored = service(local_site).batch_analyze_links(links(2), batch_size=2)
+
+    assert len(local_site.fetched('POST')) == 2
+    assert all(link.rationale == 'Budget document' for link in scored)
+
+
+def test_failed_batch_is_not_retried_link_by_link(local_site):
+    local_site.respond('/v1/chat/completions', 400, method='POST')
+
+    scored = service(local_site).batch_analyze_links(links(2), batch_size=2)
+
+    # A bad request is not retryable, and each single link would fail the same way
+    assert len(local_site.fetched('POST')) == 1
+    assert all(link.rationale == ANALYSIS_ERROR_RATIONALE for link in scored)
@@ -0,0 +1,91 @@
+import json
+import re
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from src.ai.bulk_scoring import BulkScorer
+from src.ai.llm_metrics import LLMMetricsRecorder
+from src.ai.openai_service import OpenAIService, PROMPT_HASH
+from src.ai.relevance_cache import RelevanceCache
+from src.crawler.link_record import LinkRecord
+from src.storage.models import Link
+from src.storage.write_queue import DatabaseWriter
+
+LINK_LINE = re.compile(r'^\[(\d+)\] URL: (\S+)', re.MULTILINE)
+
+
+class StubBatchClient:
+    """Files and batches API answering every request line at once; PDFs score high, the 'broken' request fails"""
+
+    def __init__(self):
+        self.uploads = []
+        self.outputs = {}
+        self.batches = SimpleNamespace(create=self._create_batch, retrieve=self._retrieve_batch)
+        self.files = SimpleNamespace(create=self._create_file,
+                                     with_streaming_response=SimpleNamespace(content=self._content))
+
+    def _create_file(self, file, purpose):
+        self.uploads.append([json.loads(line) for line in file.read().decode().splitlines()])
+        return SimpleNamespace(id=f'file-{len(self.uploads)}')
+
+    def _create_batch(self, input_file_id, endpoint, completion_window, metadata):
+        requests = self.uploads[int(input_file_id.split('-')[1]) - 1]
+        self.outputs[f'output-{input_file_id}'] = [json.dumps(self._answer(request)) for request in requests]
+        return SimpleNamespace(id=f'batch-{input_file_id}', status='validating')
+
+    def _retrieve_batch(self, batch_id):
+        return SimpleNamespace(id=batch_id, status='completed', request_counts=None,
+                               output_file_id=f"output-{batch_id.split('-', 1)[1]}", error_file_id=None)
+
+    @contextmanager
+    def _content(self, file_id):
+        yield SimpleNamespace(iter_lines=lambda: iter(self.outputs[file_id]))
+
+    def _answer(self, request):
+        links = LINK_LINE.findall(request['body']['messages'][1]['content'])
+        if any('broken' in url for _, url in links):
+            return {'custom_id': request['custom_id'], 'response': {'status_code': 500, 'body': {}}}
+        results = [{'index': int(index), 'contact_relevance': 0.0,
+                    'financial_relevance': 0.9 if url.endswith('.pdf') else 0.1, 'official_relevance': 0.2,
+                    'primary_category': 'financial', 'rationale': 'Rescored'}
+                   for index, url in links]
+        return {'custom_id': request['custom_id'], 'response': {'status_code': 200, 'body': {
+            'choices': [{'message': {'content': json.dumps({'results': results})}}],
+            'usage': {'prompt_tokens': 100, 'completion_tokens': 40}
+        }}}
+
+
+def test_bulk_run_round_trip(repo, website, tmp_path):
+    urls = ['https://city.gov/budget.pdf', 'https://city.gov/news', 'https://city.gov/audit.pdf',
+            'https://city.gov/broken']
+    repo.bulk_upsert_links([LinkRecord(url=url, overall_relevance=0.3, rationale='Old') for url in urls], website)
+
+    writer = DatabaseWriter()
+    cache = RelevanceCache(path=str(tmp_path / 'cache.db'))
+    service = OpenAIService(api_key='test-key', cache=cache, metrics=LLMMetricsRecorder(writer=writer))
+    service.client = StubBatchClient()
+
+    summary = BulkScorer(service, repo, work_dir=str(tmp_path / 'bulk'), batch_size=3, poll_interval=0).run()
+    writer.close()
+
+    # Every request line is the service's own chat completion request
+    [requests] = service.client.uploads
+    assert [len(request['custom_id'].split(',')) for request in requests] == [3, 1]
+    assert requests[0]['body']['max_tokens'] == service.batch_max_tokens(3)
+    assert requests[0]['body']['messages'] == service.batch_request(
+        [{'url': url, 'page_title': '', 'is_document': False} for url in urls[:3]])['messages']
+
+    assert summary['links_scored'] == 3 and summary['links_failed'] == 1
+    repo.session.expire_all()
+    scores = {link.url: (link.overall_relevance, link.rationale) for link in repo.session.query(Link)}
+    assert scores['https://city.gov/budget.pdf'] == (0.9, 'Rescored')
+    assert scores['https://city.gov/news'] == (0.2, 'Rescored')
+    assert scores['https://city.gov/broken'] == (0.3, 'Old')
+
+    key = cache.make_key(service.model, PROMPT_HASH, 'https://city.gov/audit.pdf', '', False)
+    assert cache.get(key)['financial_relevance'] == 0.9
+
+    [metrics] = repo.get_llm_metrics(group_by='crawl', crawl_id=summary['run_id'])
+    assert metrics['calls'] == 2
+    assert metrics['prompt_tokens'] == 100
+    assert metrics['errors'] == 1
@@ -0,0 +1,66 @@
+import pytest
+
+from src.crawler.document_probe import DocumentProbe, is_document_response
+from src.crawler.link_record import LinkRecord
+
+XLSX = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+@pytest.mark.parametrize('url, candidate', [
+    ('https://city.gov/DocumentCenter/View/1234', True),
+    ('https://city.gov/files?id=55&download=1', True),
+    ('https://city.gov/documents/budget.pdf', False),
+    ('https://city.gov/document.aspx', False),
+    ('https://city.gov/about', False),
+    ('ftp://city.gov/download/1', False),
+])
+def test_only_extensionless_download_urls_are_candidates(url, candidate):
+    assert DocumentProbe().is_candidate(url) == candidate
+
+
+@pytest.mark.parametrize('content_type, disposition, document', [
+    ('application/pdf; charset=binary', '', True),
+    (XLSX, '', True),
+    ('application/octet-stream', 'attachment; filename="Budget 2023.PDF"', True),
+    ('application/octet-stream', "attachment; filename*=UTF-8''setup.exe", False),
+    ('text/html; charset=utf-8', '', False),
+])
+def test_document_responses(content_type, disposition, document):
+    assert is_document_response(content_type, disposition) == document
+
+
+def test_annotate_marks_links_serving_documents(local_site):
+    local_site.file('/DocumentCenter/View/1', 'application/pdf')
+    local_site.page('/DocumentCenter/View/2', '<html></html>')
+    links = [LinkRecord(url=local_site.url + path, initial_value=0.4)
+             for path in ('/DocumentCenter/View/1', '/DocumentCenter/View/2', '/about')]
+
+    assert DocumentProbe().annotate(links) == 1
+
+    assert [link.is_document for link in links] == [True, False, False]
+    assert links[0].initial_value == 0.9
+    assert links[0].metadata == {'content_type': 'application/pdf'}
+    assert local_site.fetched('HEAD') == ['/DocumentCenter/View/1', '/DocumentCenter/View/2']
+    assert local_site.fetched('GET') == []
+
+
+def test_refused_head_falls_back_to_a_ranged_get(local_site):
+    local_site.respond('/download/7', 405, method='HEAD')
+    local_site.file('/download/7', XLSX, b'P', status=206, method='GET')
+
+    assert DocumentProbe().probe([local_site.url + '/download/7']) == {local_site.url + '/download/7': XLSX}
+    assert local_site.requests == [('HEAD', '/download/7'), ('GET', '/download/7')]
+    assert local_site.headers[1]['Range'] == 'bytes=0-0'
+
+
+def test_results_are_cached_except_server_errors(local_site):
+    local_site.file('/download/1', 'application/pdf')
+    local_site.respond('/download/2', 503)
+    urls = [local_site.url + '/download/1', local_site.url + '/download/2']
+    probe = DocumentProbe()
+
+    probe.probe(urls)
+    assert probe.probe(urls) == {urls[0]: 'application/pdf', urls[1]: None}
+
+    # The server error is retried (HEAD, then the GET fallback for the missing content type)
+    assert local_site.fetched('HEAD') == ['/download/1', '/download/2', '/download/2']
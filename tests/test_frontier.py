@@ -0,0 +1,47 @@
+from src.crawler.frontier import CrawlFrontier
+from src.crawler.http_crawler import HttpCrawler, crawl_key
+from src.crawler.link_processor import LinkProcessor
+
+
+def test_finance_page_pops_before_dated_news():
+    frontier = CrawlFrontier(LinkProcessor().crawl_priority)
+    frontier.add('https://city.gov/news/2023/05/item-123')
+    frontier.add('https://city.gov/calendar/event/4567')
+    frontier.add('https://city.gov/finance/budget')
+
+    assert frontier.pop() == 'https://city.gov/finance/budget'
+
+
+def test_serial_segments_lower_priority():
+    priority = LinkProcessor().crawl_priority
+
+    assert priority('https://city.gov/news/2023/05/item-123') < priority('https://city.gov/news')
+    assert priority('https://city.gov/budget/2024') < priority('https://city.gov/budget')
+
+
+def test_equivalent_urls_are_queued_once():
+    frontier = CrawlFrontier(lambda url: 0.5, key=crawl_key)
+
+    assert frontier.add('https://www.city.gov/')
+    assert not frontier.add('https://city.gov/index.html')
+    assert not frontier.add('https://city.gov/?utm_source=newsletter')
+    assert not frontier.add('https://CITY.gov/#top')
+
+    # A popped URL stays seen
+    assert frontier.pop() == 'https://www.city.gov/'
+    assert not frontier.add('https://city.gov')
+
+
+def test_crawler_fetches_each_page_once(local_site):
+    local_site.page('/', '<a href="/index.html">Home</a> <a href="/finance?utm_source=x">Finance</a>'
+                         '<a href="/old-finance">Old</a>')
+    local_site.page('/index.html', '<a href="/">Home</a>')
+    local_site.redirect('/old-finance', '/finance')
+    local_site.page('/finance', '<a href="/finance/">Finance</a> <a href="/old-finance">Old</a>')
+
+    pages = HttpCrawler(concurrency=1, respect_robots=False).crawl_website(local_site.url + '/', limit=10)
+
+    # /old-finance is fetched, but it redirects to the finance page crawled already
+    assert [page['metadata']['sourceURL'] for page in pages] == [local_site.url + '/',
+                                                                  local_site.url + '/finance?utm_source=x']
+    assert local_site.fetched() == ['/', '/finance?utm_source=x', '/old-finance', '/finance']
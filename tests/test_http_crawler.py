@@ -0,0 +1,67 @@
+from src.crawler.http_crawler import HttpCrawler, extract_page_links
+
+
+def crawl(site, start='/', limit=20, **options):
+    options.setdefault('respect_robots', False)
+    pages = HttpCrawler(**options).crawl_website(site.url + start, limit=limit)
+    return [page['metadata']['sourceURL'][len(site.url):] for page in pages]
+
+
+def test_extract_page_links_resolves_against_base_href():
+    page = ('<html><head><title> Budget &amp; Finance </title><base href="/docs/"></head>'
+            '<a href="report.pdf">R</a> <a href=\'../contact?a=1&amp;b=2\'>C</a> <a href=#top>T</a>'
+            '<a href="javascript:void(0)">J</a> <area href="report.pdf"></html>')
+
+    title, links = extract_page_links(page, 'https://city.gov/finance/')
+
+    assert title == 'Budget & Finance'
+    assert links == ['https://city.gov/docs/report.pdf', 'https://city.gov/contact?a=1&b=2']
+
+
+def test_crawl_stays_on_site_html_pages(local_site):
+    local_site.page('/', '<a href="/finance">F</a> <a href="/budget.pdf">B</a> <a href="/data">D</a>'
+                         '<a href="http://elsewhere.example/finance">E</a> <a href="mailto:clerk@city.gov">M</a>'
+                         '<a href="/missing">X</a>')
+    local_site.page('/finance', '<title>Finance</title>')
+    local_site.file('/data', 'application/json', b'{}')
+
+    assert sorted(crawl(local_site)) == ['/', '/finance']
+    # Document links are never fetched; non-HTML and missing pages are fetched but not yielded
+    assert sorted(local_site.fetched()) == ['/', '/data', '/finance', '/missing']
+
+
+def test_crawl_stops_at_the_page_limit(local_site):
+    local_site.page('/', ''.join(f'<a href="/page-{i}">{i}</a>' for i in range(10)))
+    for i in range(10):
+        local_site.page(f'/page-{i}', '')
+
+    assert len(crawl(local_site, limit=4, concurrency=2)) == 4
+    assert len(local_site.fetched()) == 4
+
+
+def test_robots_txt_disallowed_pages_are_skipped(local_site):
+    local_site.file('/robots.txt', 'text/plain', b'User-agent: *\nDisallow: /private\n')
+    local_site.page('/', '<a href="/private/budget">P</a> <a href="/public">Q</a>')
+    local_site.page('/public', '')
+    local_site.page('/private/budget', '')
+
+    assert sorted(crawl(local_site, respect_robots=True)) == ['/', '/public']
+    assert '/private/budget' not in local_site.fetched()
+
+
+def test_forbidden_robots_txt_blocks_the_site(local_site):
+    local_site.file('/robots.txt', 'text/plain', status=403)
+    local_site.page('/', '<a href="/public">Q</a>')
+
+    assert crawl(local_site, respect_robots=True) == []
+    assert local_site.fetched() == ['/robots.txt']
+
+
+def test_requests_to_one_host_are_capped(local_site):
+    local_site.page('/', ''.join(f'<a href="/page-{i}">{i}</a>' for i in range(8)))
+    for i in range(8):
+        local_site.page(f'/page-{i}', '')
+    local_site.delay = 0.05
+
+    assert len(crawl(local_site, concurrency=8, per_host_concurrency=2)) == 9
+    assert local_site.max_in_flight == 2
@@ -0,0 +1,36 @@
+import pytest
+
+from src.config import HIGH_VALUE_KEYWORDS
+from src.crawler.keyword_matcher import KeywordMatcher
+from src.crawler.link_processor import LinkProcessor
+
+URLS = [
+    'https://city.gov/finance/budget-2023.pdf',
+    'https://www.city.org/Departments/Finance/Annual-Financial-Report',
+    'https://city.org/staff',
+    'https://city.org/news/item-1',
+    'https://city.org/contact-us?ref=footer',
+    'https://city.gov/a',
+    'https://city.org/',
+]
+
+
+def test_shipped_vocabulary_uses_substring_checks():
+    assert not LinkProcessor().matcher.compiled
+
+
+@pytest.mark.parametrize('trie_min_keywords', [10 ** 6, 0], ids=['substring', 'trie'])
+def test_matchers_agree_with_substring_semantics(trie_min_keywords):
+    keywords = [keyword.lower() for keyword in HIGH_VALUE_KEYWORDS] + ['fin', 'financial-report', 'port']
+    matcher = KeywordMatcher(keywords, trie_min_keywords=trie_min_keywords)
+    assert matcher.compiled == (trie_min_keywords == 0)
+
+    for url in URLS:
+        text = url.lower()
+        assert matcher.find_all(text) == {keyword for keyword in keywords if keyword in text}
+
+
+def test_score_urls_matches_initial_value_assessment():
+    processor = LinkProcessor()
+
+    assert processor.score_urls(URLS) == [processor.initial_value_assessment(url) for url in URLS]
@@ -0,0 +1,62 @@
+from src.crawler.link_clusterer import LinkClusterer, url_template
+from src.crawler.link_record import LinkRecord, PROPAGATED_RATIONALE_PREFIX
+from src.storage.models import Link
+
+SCORED = {
+    'contact_relevance': 0.0, 'financial_relevance': 0.1, 'official_relevance': 0.2,
+    'overall_relevance': 0.2, 'primary_category': 'other', 'rationale': 'Routine news item'
+}
+
+
+def cluster_links(count=6):
+    return [LinkRecord(url=f'https://city.gov/news/2023/05/item-{i}', initial_value=0.5) for i in range(count)]
+
+
+def test_numbers_and_ids_become_wildcards():
+    assert url_template('https://City.gov/news/2023/05/item-123') == 'city.gov/news/*/*/item-*'
+    assert url_template('https://city.gov/doc/5f3a9c0e1b2d?page=2') == 'city.gov/doc/*?page=*'
+
+
+def test_members_get_a_marked_copy_of_the_representative_score():
+    clusterer = LinkClusterer(min_size=4, representatives=2)
+    links = cluster_links()
+
+    to_score, clusters = clusterer.plan(links)
+    assert len(to_score) == 2
+    unresolved = clusterer.propagate(clusters, {id(link): dict(SCORED) for link in to_score})
+
+    assert unresolved == []
+    members = [link for link in links if link not in to_score]
+    assert all(link.overall_relevance == 0.2 for link in members)
+    assert all(link.rationale == f'{PROPAGATED_RATIONALE_PREFIX}Routine news item' for link in members)
+    assert all(link.metadata['scored_from'] in {to_score[0].url, to_score[1].url} for link in members)
+
+
+def test_disagreeing_representatives_leave_members_unscored():
+    clusterer = LinkClusterer(min_size=4, representatives=2, max_spread=0.1)
+    to_score, clusters = clusterer.plan(cluster_links())
+    scored = {id(to_score[0]): dict(SCORED), id(to_score[1]): dict(SCORED, overall_relevance=0.9)}
+
+    assert len(clusterer.propagate(clusters, scored)) == 4
+
+
+def test_propagated_copies_are_left_out_of_training(repo, website):
+    clusterer = LinkClusterer(min_size=4, representatives=2)
+    links = cluster_links()
+    to_score, clusters = clusterer.plan(links)
+    for link in to_score:
+        link.update(SCORED)
+    clusterer.propagate(clusters, {id(link): dict(SCORED) for link in to_score})
+    repo.bulk_upsert_links(links, website)
+
+    assert sorted(link.url for link in repo.get_scored_links()) == sorted(link.url for link in to_score)
+
+
+def test_update_stores_new_metadata(repo, website):
+    url = 'https://city.gov/news/2023/05/item-1'
+    repo.bulk_upsert_links([LinkRecord(url=url, rationale='Scored')], website)
+    repo.bulk_upsert_links([LinkRecord(url=url, rationale='Scored', metadata={'cluster_template': 't'})], website)
+    repo.bulk_upsert_links([LinkRecord(url=url, rationale='Scored')], website)
+
+    repo.session.expire_all()
+    assert repo.session.query(Link).filter_by(url=url).one().link_metadata == {'cluster_template': 't'}
@@ -0,0 +1,24 @@
+from types import SimpleNamespace
+
+from src.ai.llm_metrics import LLMMetricsRecorder, crawl_context
+from src.storage.write_queue import DatabaseWriter
+
+
+def test_flush_writes_calls_through_the_writer(repo):
+    writer = DatabaseWriter()
+    recorder = LLMMetricsRecorder(input_cost_per_million=1.0, output_cost_per_million=2.0, writer=writer)
+    usage = SimpleNamespace(prompt_tokens=1000, completion_tokens=500)
+
+    with crawl_context('crawl-1'):
+        recorder.record('gpt-test', links=10, latency=0.5, usage=usage)
+        recorder.record('gpt-test', links=5, latency=0.25, error=TimeoutError('timed out'))
+    recorder.flush().result()
+    writer.close()
+
+    assert recorder.flush() is None
+    [metrics] = repo.get_llm_metrics(group_by='crawl')
+    assert metrics['crawl_id'] == 'crawl-1'
+    assert metrics['calls'] == 2
+    assert metrics['links'] == 15
+    assert metrics['prompt_tokens'] == 1000
+    assert metrics['errors'] == 1
@@ -0,0 +1,61 @@
+from sqlalchemy import create_engine, text
+
+import src.storage.migrations as migrations
+from src.storage.migrations import LINK_QUERY_INDEXES, run_migrations
+from src.storage.models import Base, SchemaMigration
+from src.storage.search_index import drop_search_index
+
+
+def old_database(tmp_path):
+    """Database with today's tables but none of the indexes added by migrations"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        for index in LINK_QUERY_INDEXES:
+            connection.exec_driver_sql(f"DROP INDEX IF EXISTS {index}")
+        drop_search_index(connection)
+        connection.exec_driver_sql("INSERT INTO websites (domain) VALUES ('city.gov')")
+        connection.exec_driver_sql("INSERT INTO links (url, website_id) VALUES ('https://city.gov/citybudget2023', 1)")
+    return engine
+
+
+def schema_objects(engine):
+    with engine.connect() as connection:
+        return {row[0] for row in connection.execute(text("SELECT name FROM sqlite_master"))}
+
+
+def test_migrations_bring_an_old_database_up_to_date(tmp_path):
+    engine = old_database(tmp_path)
+
+    assert run_migrations(engine) == [version for version, _, _ in migrations.MIGRATIONS]
+
+    assert set(LINK_QUERY_INDEXES) | {'links_fts', 'links_fts_insert'} <= schema_objects(engine)
+    with engine.connect() as connection:
+        # Links stored before the migration are searchable
+        assert connection.execute(text("SELECT rowid FROM links_fts WHERE links_fts MATCH 'budget'")).all() == [(1,)]
+
+    assert run_migrations(engine) == []
+
+
+def test_skipped_migration_is_retried(tmp_path, monkeypatch):
+    engine = old_database(tmp_path)
+    attempts = []
+
+    def unsupported(connection):
+        attempts.append(connection)
+        return False
+
+    monkeypatch.setattr(migrations, 'MIGRATIONS', [(1, "Needs a newer database", unsupported)])
+
+    assert run_migrations(engine) == []
+    assert run_migrations(engine) == []
+
+    assert len(attempts) == 2
+    with engine.connect() as connection:
+        assert connection.execute(SchemaMigration.__table__.select()).all() == []
+
+
+def test_link_listing_queries_use_indexes(repo):
+    plans = repo.explain_link_queries()
+
+    assert {name: plan['indexed'] for name, plan in plans.items()} == dict.fromkeys(plans, True)
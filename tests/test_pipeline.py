@@ -0,0 +1,97 @@
+import pytest
+
+import src.crawler.pipeline as pipeline_module
+from src.ai.openai_service import OpenAIService
+from src.ai.scoring_budget import ScoringBudget, active_budget
+from src.crawler.link_processor import LinkProcessor
+from src.crawler.pipeline import CrawlPipeline
+from src.storage.models import Link
+
+RESULT = {
+    'contact_relevance': 0.1, 'financial_relevance': 0.9, 'official_relevance': 0.2,
+    'overall_relevance': 0.9, 'primary_category': 'financial', 'rationale': 'Budget document'
+}
+
+
+class StubService(OpenAIService):
+    """OpenAI service answering every batch without a request, charging the active budget"""
+
+    def __init__(self):
+        super().__init__(api_key='test-key')
+        self.scored = []
+
+    def _request_batch(self, links):
+        budget = active_budget()
+        if budget is not None:
+            budget.charge(1)
+        self.scored.extend(link.url for link in links)
+        return [dict(RESULT) for _ in links]
+
+    def _analyze_single(self, link):
+        return self._request_batch([link])[0]
+
+
+class StubCrawler:
+    """Crawler yielding fixed pages, recording how many links were stored before each one"""
+
+    cache = None
+
+    def __init__(self, pages, repo):
+        self.pages = pages
+        self.repo = repo
+        self.stored_before_page = []
+
+    def extract_links(self, page):
+        return [{'url': url} for url in page['links']]
+
+    def iter_crawl_pages(self, url, limit):
+        for page_url, links in self.pages:
+            self.stored_before_page.append(self.repo.session.query(Link).count())
+            yield {'metadata': {'sourceURL': page_url, 'title': page_url}, 'markdown': page_url, 'links': links}
+
+
+def test_budgeted_crawl_scores_best_links_first(repo):
+    pages = [
+        ('https://city.org/news', [f'https://city.org/news/item-{i}' for i in range(10)]),
+        ('https://city.org/finance', [f'https://city.org/finance/budget-report-{i}.pdf' for i in range(10)]),
+    ]
+    service = StubService()
+    pipeline = CrawlPipeline(StubCrawler(pages, repo), LinkProcessor(), service, repo,
+                             budget=ScoringBudget(max_calls=1))
+
+    summary = pipeline.run('https://city.org/')
+
+    # The finance documents arrived last but had the highest initial value
+    assert all('/finance/' in url for url in service.scored)
+    assert summary['links_stored'] == 20
+    assert summary['pages_incomplete'] == 1
+
+
+def test_budgeted_crawl_stores_links_during_the_crawl(repo, monkeypatch):
+    monkeypatch.setattr(pipeline_module, 'SCORING_QUEUE_MAX_LINKS', 5)
+    monkeypatch.setattr(pipeline_module, 'DEFERRED_CHUNK_SIZE', 5)
+    pages = [
+        ('https://city.org/a', [f'https://city.org/budget/a-{i}' for i in range(12)]),
+        ('https://city.org/b', [f'https://city.org/budget/b-{i}' for i in range(3)]),
+    ]
+    crawler = StubCrawler(pages, repo)
+    pipeline = CrawlPipeline(crawler, LinkProcessor(), StubService(), repo, budget=ScoringBudget(max_calls=100))
+
+    summary = pipeline.run('https://city.org/')
+
+    # Page a overfilled the queue, so its best links were stored before page b was crawled
+    assert crawler.stored_before_page == [0, 10]
+    assert summary['links_stored'] == 15
+    assert summary['pages_incomplete'] == 0
+
+
+@pytest.mark.parametrize('budget', [None, ScoringBudget(max_calls=100)])
+def test_rerun_skips_unchanged_pages(repo, budget):
+    pages = [('https://city.org/a', [f'https://city.org/budget/{i}' for i in range(3)])]
+    CrawlPipeline(StubCrawler(pages, repo), LinkProcessor(), StubService(), repo, budget=budget).run('https://city.org/')
+
+    rerun = ScoringBudget(max_calls=100) if budget is not None else None
+    summary = CrawlPipeline(StubCrawler(pages, repo), LinkProcessor(), StubService(), repo,
+                            budget=rerun).run('https://city.org/')
+
+    assert summary['pages_unchanged'] == 1
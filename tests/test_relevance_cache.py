@@ -0,0 +1,69 @@
+import time
+
+import pytest
+
+from src.ai.relevance_cache import RelevanceCache
+
+SCORE = {'overall_relevance': 0.8, 'rationale': 'Budget page'}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    relevance_cache = RelevanceCache(str(tmp_path / 'relevance.db'), ttl=3600, max_entries=10)
+    yield relevance_cache
+    relevance_cache.close()
+
+
+def test_stored_scores_are_returned_and_counted(cache):
+    cache.set_many([('a', SCORE), ('b', {**SCORE, 'overall_relevance': 0.2})])
+
+    assert cache.get_many(['a', 'b', 'c']) == {'a': SCORE, 'b': {**SCORE, 'overall_relevance': 0.2}}
+    assert cache.get('c') is None
+    assert cache.stats() == {'hits': 2, 'misses': 2, 'hit_rate': 0.5, 'entries': 2}
+
+
+def test_key_changes_with_model_and_prompt(cache):
+    key = cache.make_key('gpt-4o-mini', 'prompt-1', 'https://city.gov/budget', 'Finance', False)
+
+    assert key == cache.make_key('gpt-4o-mini', 'prompt-1', 'https://city.gov/budget', 'Finance', False)
+    assert key != cache.make_key('gpt-4o', 'prompt-1', 'https://city.gov/budget', 'Finance', False)
+    assert key != cache.make_key('gpt-4o-mini', 'prompt-2', 'https://city.gov/budget', 'Finance', False)
+    assert key != cache.make_key('gpt-4o-mini', 'prompt-1', 'https://city.gov/budget', 'Finance', True)
+
+
+def test_expired_entries_are_missed(tmp_path):
+    cache = RelevanceCache(str(tmp_path / 'relevance.db'), ttl=0.05, max_entries=10)
+    cache.set('a', SCORE)
+    time.sleep(0.06)
+
+    assert cache.get('a') is None
+    cache.close()
+
+
+def test_least_recently_used_entries_are_evicted(cache):
+    cache.set_many((f'old-{i}', SCORE) for i in range(5))
+    time.sleep(0.01)
+    cache.set_many((f'new-{i}', SCORE) for i in range(5))
+    time.sleep(0.01)
+    # Reading the old entries makes them the most recently used
+    assert len(cache.get_many(f'old-{i}' for i in range(5))) == 5
+
+    cache.set('extra', SCORE)
+
+    # 11 entries exceed max_entries, so the least recent are removed down to 9
+    assert cache.stats()['entries'] == 9
+    assert len(cache.get_many(f'old-{i}' for i in range(5))) == 5
+    assert cache.get('extra') == SCORE
+    assert len(cache.get_many(f'new-{i}' for i in range(5))) == 3
+
+
+def test_entries_survive_reopening(tmp_path):
+    path = str(tmp_path / 'relevance.db')
+    cache = RelevanceCache(path, ttl=3600, max_entries=10)
+    cache.set('a', SCORE)
+    cache.close()
+
+    reopened = RelevanceCache(path, ttl=3600, max_entries=10)
+    assert reopened.stats()['entries'] == 1
+    assert reopened.get('a') == SCORE
+    reopened.close()
@@ -0,0 +1,100 @@
+from src.crawler.link_record import LinkRecord, ANALYSIS_ERROR_RATIONALE, BUDGET_EXHAUSTED_RATIONALE
+from src.storage.models import Link
+
+SCORED = {
+    'contact_relevance': 0.1, 'financial_relevance': 0.9, 'official_relevance': 0.3,
+    'overall_relevance': 0.85, 'primary_category': 'financial', 'rationale': 'Annual budget document'
+}
+
+
+def stored(repo, url):
+    repo.session.expire_all()
+    return repo.session.query(Link).filter_by(url=url).one()
+
+
+def fallback(url, rationale):
+    return LinkRecord(url=url, initial_value=0.5, overall_relevance=0.5, rationale=rationale)
+
+
+def test_fallback_rescore_keeps_stored_llm_score(repo, website):
+    url = 'https://city.gov/finance/budget-2023.pdf'
+    repo.bulk_upsert_links([LinkRecord(url=url, **SCORED)], website)
+
+    for rationale in (BUDGET_EXHAUSTED_RATIONALE, ANALYSIS_ERROR_RATIONALE):
+        repo.bulk_upsert_links([fallback(url, rationale)], website)
+        repo.add_link(fallback(url, rationale), website)
+
+    link = stored(repo, url)
+    assert link.overall_relevance == 0.85
+    assert link.rationale == 'Annual budget document'
+
+
+def test_fallback_replaces_earlier_fallback(repo, website):
+    url = 'https://city.gov/finance/budget-2023.pdf'
+    repo.bulk_upsert_links([fallback(url, ANALYSIS_ERROR_RATIONALE)], website)
+    repo.bulk_upsert_links([fallback(url, BUDGET_EXHAUSTED_RATIONALE)], website)
+
+    assert stored(repo, url).rationale == BUDGET_EXHAUSTED_RATIONALE
+
+
+def test_new_score_replaces_stored_score(repo, website):
+    url = 'https://city.gov/finance/budget-2023.pdf'
+    repo.bulk_upsert_links([LinkRecord(url=url, **SCORED)], website)
+    repo.bulk_upsert_links([LinkRecord(url=url, **dict(SCORED, overall_relevance=0.4, rationale='Outdated'))],
+                           website)
+
+    link = stored(repo, url)
+    assert link.overall_relevance == 0.4
+    assert link.rationale == 'Outdated'
+
+
+def test_bulk_upsert_inserts_and_updates_per_chunk(repo, website):
+    urls = [f'https://city.gov/finance/report-{i}' for i in range(5)]
+    repo.bulk_upsert_links([LinkRecord(url=url) for url in urls[:2]], website)
+
+    stats = repo.bulk_upsert_links([LinkRecord(url=url, **SCORED) for url in urls], website, chunk_size=2)
+
+    assert stats == [{'links': 2, 'inserted': 0, 'updated': 2, 'failed': 0},
+                     {'links': 2, 'inserted': 2, 'updated': 0, 'failed': 0},
+                     {'links': 1, 'inserted': 1, 'updated': 0, 'failed': 0}]
+    assert all(stored(repo, url).overall_relevance == 0.85 for url in urls)
+
+
+def test_url_repeated_in_a_chunk_is_stored_once_with_its_last_data(repo, website):
+    url = 'https://city.gov/finance'
+    [stats] = repo.bulk_upsert_links([LinkRecord(url=url, page_title='Old'), LinkRecord(url=url, page_title='New')],
+                                     website)
+
+    assert stats['inserted'] == 1
+    assert stored(repo, url).page_title == 'New'
+
+
+def test_dictionary_update_keeps_fields_it_leaves_out(repo, website):
+    url = 'https://city.gov/finance'
+    repo.bulk_upsert_links([LinkRecord(url=url, source_url='https://city.gov/', page_title='Finance', **SCORED)],
+                           website)
+
+    repo.bulk_upsert_links([{'url': url, 'official_relevance': 0.7}], website)
+
+    link = stored(repo, url)
+    assert (link.source_url, link.page_title) == ('https://city.gov/', 'Finance')
+    assert link.official_relevance == 0.7
+    assert (link.overall_relevance, link.rationale) == (0.85, 'Annual budget document')
+
+
+def test_failed_chunk_is_retried_link_by_link(repo, website):
+    links = [LinkRecord(url='https://city.gov/a'), LinkRecord(url=None), LinkRecord(url='https://city.gov/b')]
+
+    [stats] = repo.bulk_upsert_links(links, website)
+
+    assert stats == {'links': 3, 'inserted': 2, 'updated': 0, 'failed': 1}
+    assert repo.session.query(Link).count() == 2
+
+
+def test_add_links_returns_stored_links_in_input_order(repo, website):
+    urls = ['https://city.gov/b', 'https://city.gov/a', 'https://city.gov/b']
+
+    links = repo.add_links([{'url': url, **SCORED} for url in urls], website)
+
+    assert [link.url for link in links] == ['https://city.gov/b', 'https://city.gov/a']
+    assert all(link.website_id == website.id for link in links)
@@ -0,0 +1,76 @@
+import time
+
+from src.ai.openai_service import OpenAIService
+from src.ai.scoring_budget import ScoringBudget, active_budget, budget_context, create_scoring_budget
+from src.crawler.link_record import BUDGET_EXHAUSTED_RATIONALE, LinkRecord
+
+RESULT = {
+    'contact_relevance': 0.1, 'financial_relevance': 0.9, 'official_relevance': 0.2,
+    'overall_relevance': 0.9, 'primary_category': 'financial', 'rationale': 'Budget document'
+}
+
+
+class StubService(OpenAIService):
+    """OpenAI service answering every batch without a request, charging one call and 100 tokens"""
+
+    def __init__(self):
+        super().__init__(api_key='test-key')
+        self.batches = []
+
+    def _request_batch(self, links):
+        active_budget().charge(1, tokens=100)
+        self.batches.append([link.url for link in links])
+        return [dict(RESULT) for _ in links]
+
+
+def test_each_limit_exhausts_the_budget():
+    calls = ScoringBudget(max_calls=2, max_tokens=0, max_seconds=0)
+    calls.charge(1)
+    assert not calls.exhausted()
+    calls.charge(1)
+    assert calls.exhausted()
+
+    tokens = ScoringBudget(max_calls=0, max_tokens=500, max_seconds=0)
+    tokens.charge(1, tokens=499)
+    assert not tokens.exhausted()
+    tokens.charge(1, tokens=1)
+    assert tokens.exhausted()
+
+    seconds = ScoringBudget(max_calls=0, max_tokens=0, max_seconds=0.05)
+    assert not seconds.exhausted()
+    seconds.start()
+    time.sleep(0.06)
+    assert seconds.exhausted()
+
+
+def test_no_limit_means_no_budget():
+    assert create_scoring_budget(0, 0, 0) is None
+    assert create_scoring_budget(10, 0, 0).max_calls == 10
+
+
+def test_budget_context_sets_and_restores_the_active_budget():
+    budget = ScoringBudget(max_calls=1, max_tokens=0, max_seconds=0)
+
+    with budget_context(budget):
+        assert active_budget() is budget
+        with budget_context(None):
+            assert active_budget() is None
+        assert active_budget() is budget
+    assert active_budget() is None
+    assert budget.started is not None
+
+
+def test_exhausted_budget_leaves_remaining_links_unscored():
+    links = [LinkRecord(url=f'https://city.gov/budget/{i}', initial_value=0.9 - i / 100) for i in range(6)]
+    service = StubService()
+    budget = ScoringBudget(max_calls=2, max_tokens=0, max_seconds=0)
+
+    service.batch_analyze_links(links, batch_size=2, budget=budget)
+
+    # The two most promising batches were scored, then the budget ran out
+    assert service.batches == [['https://city.gov/budget/0', 'https://city.gov/budget/1'],
+                               ['https://city.gov/budget/2', 'https://city.gov/budget/3']]
+    unscored = [link for link in links if link.rationale == BUDGET_EXHAUSTED_RATIONALE]
+    assert [link.url for link in unscored] == ['https://city.gov/budget/4', 'https://city.gov/budget/5']
+    assert all(link.overall_relevance == link.initial_value for link in unscored)
+    assert budget.stats()['calls'] == 2 and budget.stats()['tokens'] == 200
@@ -0,0 +1,69 @@
+from sqlalchemy import text
+
+from src.crawler.link_record import LinkRecord
+from src.storage.migrations import MIGRATIONS
+from src.storage.models import Link
+from src.storage.search_index import drop_search_index, match_expression
+
+
+def add(repo, website, url, title='', relevance=0.5):
+    repo.bulk_upsert_links([LinkRecord(url=url, page_title=title, overall_relevance=relevance)], website)
+
+
+def found(repo, query):
+    return [link.url for link in repo.search_links(query)]
+
+
+def test_word_matches_inside_longer_words(repo, website):
+    add(repo, website, 'https://city.gov/citybudget2023')
+    add(repo, website, 'https://city.gov/finance/budget-2023.pdf')
+    add(repo, website, 'https://city.gov/parks')
+
+    assert sorted(found(repo, 'budget')) == ['https://city.gov/citybudget2023',
+                                             'https://city.gov/finance/budget-2023.pdf']
+    assert sorted(found(repo, 'budget 2023')) == sorted(found(repo, 'budg*'))
+
+
+def test_title_and_relevance_rank_matches(repo, website):
+    add(repo, website, 'https://city.gov/a', title='Parks', relevance=0.9)
+    add(repo, website, 'https://city.gov/b', title='Annual Budget', relevance=0.9)
+    add(repo, website, 'https://city.gov/c', title='Budget', relevance=0.1)
+
+    assert found(repo, 'budget') == ['https://city.gov/b', 'https://city.gov/c']
+
+
+def test_short_words_are_not_looked_up():
+    assert match_expression('tx budget') == '"budget"'
+    assert match_expression('tx') == ''
+
+
+def test_index_follows_link_updates_and_deletes(repo, website):
+    add(repo, website, 'https://city.gov/reports', title='Reports')
+    link = repo.session.query(Link).one()
+
+    link.page_title = 'Audit Reports'
+    repo.session.commit()
+    assert found(repo, 'audit') == ['https://city.gov/reports']
+
+    repo.session.delete(link)
+    repo.session.commit()
+    assert found(repo, 'reports') == []
+
+
+def test_migration_replaces_word_index(repo, website, database):
+    add(repo, website, 'https://city.gov/citybudget2023')
+    with database.begin() as connection:
+        drop_search_index(connection)
+        connection.exec_driver_sql(
+            "CREATE VIRTUAL TABLE links_fts USING fts5(url, page_title, content='links', content_rowid='id')"
+        )
+        connection.exec_driver_sql("INSERT INTO links_fts(links_fts) VALUES ('rebuild')")
+
+    migrate = dict((version, step) for version, _, step in MIGRATIONS)[3]
+    with database.begin() as connection:
+        assert migrate(connection)
+
+    with database.connect() as connection:
+        definition = connection.execute(text("SELECT sql FROM sqlite_master WHERE name = 'links_fts'")).scalar()
+    assert 'trigram' in definition
+    assert found(repo, 'budget') == ['https://city.gov/citybudget2023']
@@ -0,0 +1,56 @@
+import pytest
+
+from src.crawler.seen_set import BloomSeenSet, DatabaseSeenSet, MemorySeenSet
+from src.storage.models import SeenUrl
+from src.storage.write_queue import DatabaseWriter
+
+URLS = [f'https://city.gov/page-{i}' for i in range(20)]
+
+
+@pytest.fixture
+def writer():
+    database_writer = DatabaseWriter()
+    yield database_writer
+    database_writer.close()
+
+
+@pytest.mark.parametrize('seen_set', [MemorySeenSet, BloomSeenSet], ids=['memory', 'bloom'])
+def test_seen_among_finds_added_urls(seen_set):
+    seen = seen_set()
+    for url in URLS[:10]:
+        seen.add(url)
+
+    assert seen.seen_among(URLS) == set(URLS[:10])
+
+
+def test_bloom_file_persists_across_runs(tmp_path):
+    path = str(tmp_path / 'seen.bloom')
+    seen = BloomSeenSet(capacity=1000, path=path)
+    seen.add(URLS[0])
+    seen.close()
+
+    reopened = BloomSeenSet(capacity=10, path=path)
+    # The file keeps the parameters it was created with
+    assert reopened.num_bits == seen.num_bits
+    assert URLS[0] in reopened
+    assert URLS[1] not in reopened
+    reopened.close()
+
+
+def test_database_seen_set_writes_through_the_writer(repo, writer):
+    seen = DatabaseSeenSet(flush_every=5, writer=writer)
+    for url in URLS[:7]:
+        seen.add(url)
+
+    # One full buffer was written, the rest is still pending
+    assert writer.jobs == 1
+    assert repo.session.query(SeenUrl).count() == 5
+    assert seen.seen_among(URLS) == set(URLS[:7])
+
+    seen.close()
+    assert writer.jobs == 2
+
+    reopened = DatabaseSeenSet(writer=writer)
+    assert reopened.seen_among(URLS) == set(URLS[:7])
+    assert URLS[0] in reopened and URLS[8] not in reopened
+    reopened.close()
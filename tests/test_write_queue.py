@@ -0,0 +1,68 @@
+import threading
+
+import pytest
+from sqlalchemy import text
+
+from src.crawler.link_record import LinkRecord
+from src.storage.write_queue import DatabaseWriter
+
+
+@pytest.fixture
+def writer():
+    database_writer = DatabaseWriter()
+    yield database_writer
+    database_writer.close()
+
+
+def test_connections_use_wal(database):
+    with database.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == 'wal'
+        assert connection.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+
+
+def test_jobs_run_in_order_on_one_thread(repo, writer):
+    threads, order = set(), []
+
+    def job(index):
+        def run(writer_repo):
+            threads.add(threading.current_thread().name)
+            order.append(index)
+        return run
+
+    futures = [writer.submit(job(index)) for index in range(20)]
+    for future in futures:
+        future.result()
+
+    assert order == list(range(20))
+    assert threads == {'database-writer'}
+    assert writer.jobs == 20
+
+
+def test_failed_job_is_rolled_back_and_later_jobs_still_run(repo, website, writer):
+    def fail(writer_repo):
+        writer_repo.session.execute(text("INSERT INTO websites (domain) VALUES ('other.gov')"))
+        raise RuntimeError('job failed')
+
+    with pytest.raises(RuntimeError):
+        writer.call(fail)
+
+    stats = writer.call(lambda writer_repo: writer_repo.bulk_upsert_links(
+        [LinkRecord(url='https://city.gov/a')], writer_repo.get_or_create_website('https://city.gov/')))
+    assert stats[0]['inserted'] == 1
+    assert writer.failures == 1
+    assert [site.domain for site in repo.get_all_websites()] == ['city.gov']
+
+
+def test_returned_records_stay_usable(repo, writer):
+    website = writer.call(lambda writer_repo: writer_repo.get_or_create_website('https://city.gov/'))
+
+    assert (website.id, website.domain) == (repo.get_all_websites()[0].id, 'city.gov')
+
+
+def test_close_finishes_queued_jobs(repo, writer):
+    done = []
+    for index in range(5):
+        writer.submit(lambda writer_repo, index=index: done.append(index))
+    writer.close()
+
+    assert done == list(range(5))